@@ -0,0 +1,70 @@
+"""Round-trip latency of `execute_script` through the available executors
+
+    > python benchmarks/latency.py [count]
+
+Requires Chrome, the driver is started headless by Selenium. The `GridExecutor`
+is measured against the local driver, which is a remote end like any Grid node.
+"""
+import statistics
+import sys
+import time
+
+from selenium.webdriver import Chrome, ChromeOptions
+
+from selenium_js2py.cdp import CDPExecutor
+from selenium_js2py.grid import GridExecutor
+
+SCRIPT = "return arguments[0] + 1"
+
+
+def percentiles(samples):
+    """p50 and p99 of `samples` in microseconds"""
+    quantiles = statistics.quantiles(samples, n=100)
+    return quantiles[49] * 1e6, quantiles[98] * 1e6
+
+
+def measure(call, count):
+    """Latency of each of `count` calls"""
+    samples = []
+    
+    for i in range(count):
+        start = time.perf_counter()
+        call(i)
+        samples.append(time.perf_counter() - start)
+    
+    return samples
+
+
+def measurepipelined(jsexec, count):
+    """Average latency per call of `count` pipelined calls"""
+    start = time.perf_counter()
+    jsexec.execute_many([(SCRIPT, i) for i in range(count)])
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def report(name, samples):
+    p50, p99 = percentiles(samples)
+    print(f"{name:<24}p50 {p50:>10.1f} us    p99 {p99:>10.1f} us")
+
+
+def main(count=1000):
+    options = ChromeOptions()
+    options.add_argument("--headless=new")
+    driver = Chrome(options=options)
+    
+    try:
+        report("WebDriver", measure(lambda i: driver.execute_script(SCRIPT, i), count))
+        
+        with GridExecutor.from_driver(driver) as grid:
+            report("Grid", measure(lambda i: grid.execute_script(SCRIPT, i), count))
+            print(f"{'Grid (overlapped)':<24}avg {measurepipelined(grid, count):>10.1f} us")
+        
+        with CDPExecutor.from_driver(driver) as cdp:
+            report("CDP", measure(lambda i: cdp.execute_script(SCRIPT, i), count))
+            print(f"{'CDP (pipelined)':<24}avg {measurepipelined(cdp, count):>10.1f} us")
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
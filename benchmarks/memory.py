@@ -0,0 +1,51 @@
+"""Per-instance memory of `JavaScriptObject` and `JQueryElement`
+    
+    > python benchmarks/memory.py [count]
+"""
+import sys
+import tracemalloc
+
+from selenium.webdriver.remote.webelement import WebElement
+
+from selenium_js2py import JavaScriptExecutor, JavaScriptObject, JQueryElement
+
+
+class NullExecutor(JavaScriptExecutor):
+    """Executes nothing"""
+    
+    def execute_script(self, script: str, *args):
+        return None
+
+
+def measure(factory, count):
+    """Average bytes allocated per object created by `factory`"""
+    objs = [None] * count
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    
+    for i in range(count):
+        objs[i] = factory(i)
+    
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return (after - before) / count
+
+
+def main(count=100_000):
+    jsexec = NullExecutor()
+    elements = [WebElement(jsexec, str(i)) for i in range(count)]
+    
+    results = {
+        "JavaScriptObject": measure(lambda i: JavaScriptObject("window", jsexec), count),
+        "JQueryElement"   : measure(lambda i: JQueryElement(elements[i], jsexec), count),
+    }
+    
+    for name, nbytes in results.items():
+        print(f"{name:<20}{nbytes:>10.1f} bytes/instance")
+    
+    return results
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,119 @@
+"""Python-side overhead per operation of `JavaScriptObject`, against an executor that
+returns at once
+    
+    > python benchmarks/overhead.py [count] [baseline]
+
+Reports the time per operation in microseconds, the number of memory blocks
+allocated by one operation and still held when it returns (its result
+included, from the `tracemalloc` snapshot statistics) and the peak bytes
+allocated while running it, which also covers the temporaries it freed. With
+a baseline file, the times are compared to it and the script exits with status
+1 if any operation is slower than `TOLERANCE` times its baseline; a missing
+baseline is written instead.
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from selenium_js2py import JavaScriptExecutor, JavaScriptObject, JavaScriptObjectFactory
+
+TOLERANCE = 1.25
+
+_UNTRACED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+
+class ZeroLatencyExecutor(JavaScriptExecutor):
+    """Describes `fn` as a function and any other attribute as a number, any other script returns `1`"""
+    
+    def execute_script(self, script: str, *args):
+        if "return (t => [t," in script:
+            return ["function", 2] if "fn" in script else ["number", None]
+        
+        return 1
+
+
+def operations():
+    """The measured operations by name"""
+    jsexec = ZeroLatencyExecutor()
+    factory = JavaScriptObjectFactory(jsexec)
+    shared = factory.init("app")
+    local = JavaScriptObject("app", jsexec)
+    lazy = JavaScriptObject("arguments[0]", jsexec, lambda: "app")
+    fn = shared.wrapfunction("fn")
+    
+    return {
+        "getattr property"  : lambda: shared.value,
+        "getattr function"  : lambda: shared.fn,
+        "invoke call"       : lambda: shared.invoke("fn", attrargs=(1, 2)),
+        "wrapped call"      : lambda: fn(1, 2),
+        "wrapproperty"      : lambda: shared.wrapproperty("value"),
+        "uncached getattr"  : lambda: local.value,
+        "lazy execargs"     : lambda: lazy.invoke("value"),
+        "JavaScriptObject()": lambda: JavaScriptObject("app", jsexec),
+    }
+
+
+def measure(op, count):
+    """Microseconds per call, blocks allocated and peak bytes of one call of `op`"""
+    for _ in range(min(count, 1000)):
+        op()
+    
+    start = time.perf_counter()
+    
+    for _ in range(count):
+        op()
+    
+    elapsed = (time.perf_counter() - start) / count * 1e6
+    
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(_UNTRACED)
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    res = op()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot().filter_traces(_UNTRACED)
+    tracemalloc.stop()
+    del res
+    
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return elapsed, blocks, peak - current
+
+
+def main(count=20_000, baseline=None):
+    results = {name: measure(op, int(count)) for name, op in operations().items()}
+    regressions = []
+    reference = {}
+    
+    if baseline and os.path.exists(baseline):
+        with open(baseline, "r", encoding="utf-8") as fp:
+            reference = json.load(fp)
+    elif baseline:
+        with open(baseline, "w", encoding="utf-8") as fp:
+            json.dump({name: us for name, (us, *_) in results.items()}, fp, indent=4)
+    
+    for name, (us, blocks, nbytes) in results.items():
+        line = f"{name:<24}{us:>8.2f} us/op{blocks:>6} blocks{nbytes:>8} bytes"
+        
+        if name in reference:
+            ratio = us / reference[name]
+            line += f"    x{ratio:.2f} of baseline"
+            
+            if ratio > TOLERANCE:
+                regressions.append(name)
+        
+        print(line)
+    
+    if regressions:
+        print(f"Slower than {TOLERANCE}x the baseline: {', '.join(regressions)}")
+        sys.exit(1)
+    
+    return results
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,9 +1,11 @@
 import textwrap
 
+from .cache import *
 from .javascript import *
 from .jquery import *
+from .runtime import *
 
-__version__ = "0.3.3"
+__version__ = "0.4.0"
 
 
 def track():
@@ -55,5 +57,69 @@ def track():
     * Simplified and stabilized attribute access across all classes
     * `__repr__`s follow standard format
     
+    ## 0.4.0
+    ---
+    
+    * `AttributeCache`
+    * `JavaScriptObjectFactory` shares attribute descriptors and function proxies
+        between the objects it creates
+    * Attributes are described (`typeof` and arity) in a single script
+    * Executor arguments were passed to scripts as a single nested argument
+    * `__slots__` for all `JavaScriptObject`s, global invoke options are shared
+        in a single immutable object
+    * `JavaScriptResponse.response` and `JQueryResponse.response`
+    * `JavaScriptObject.materialize`
+    * `JavaScriptObject.shape`
+    * `CDPExecutor` and `RemoteObject` (`selenium_js2py.cdp`)
+    * `GridExecutor` (`selenium_js2py.grid`)
+    * `FanOut` (`selenium_js2py.fanout`)
+    * `JavaScriptObjectFactory.javascript_executor`
+    * `MemoizedFunction` and `MemoEpoch`, `memoize` option of
+        `JavaScriptObject.wrapfunction` and `JavaScriptObject.invoke`
+    * `JavaScriptObject.refresh`, `JavaScriptObject.snapshot` and
+        `JavaScriptObject.clearsnapshot`
+    * `Subscription` and `drainall` (`selenium_js2py.subscription`),
+        `JavaScriptObject.subscribe`, `JQueryElement.subscribe` and
+        `JQueryResponse.subscribe`
+    * `runtime` invoke option and `installruntime`, introspection scripts call
+        helpers installed once per document
+    * `JavaScriptObject.properties` checked the type of the object rather than
+        of its properties
+    * `AdaptivePolicy`, `policy` of `JavaScriptObject` and `JavaScriptObjectFactory`
+        caches hot, stable attributes
+    * `JQueryResponse.where`, `select`, `reduce` and `count` evaluate JavaScript
+        expressions over the elements in the browser
+    * `ChunkedExecutor` and `Chunked` (`selenium_js2py.upload`), large arguments
+        are uploaded in bounded chunks
+    * `DescriptorStore` (`selenium_js2py.store`), descriptors of well-known
+        globals persisted on disk by browser-side fingerprint
+    * `JavaScriptObject.descriptors`
+    * Lazy executor arguments were resolved including the object itself, which
+        called `S` when introspecting it
+    * `QueuedExecutor` (`selenium_js2py.queued`), one session shared by many
+        threads, identical read-only scripts in flight share one call
+    * `AttributeCache` is thread-safe
+    * `RecordingExecutor` and `ReplayExecutor` (`selenium_js2py.recording`)
+    * `JavaScriptObject.readarray`, typed and numeric arrays transferred as packed
+        bytes into a `memoryview` or NumPy array
+    * `DOMSnapshot`, `DOMNode` and `snapshot` (`selenium_js2py.dom`), `S.snapshot`,
+        CSS selector queries answered locally from a serialized DOM subtree
+    * `querycache` of `S`, selector results cached until the document mutates
+    * `JavaScriptObjectFactory.preload`, descriptors and initial values of many
+        globals fetched in one script
+    * `batch` of wrapped functions and `MemoizedFunction.batch`, many calls run in
+        a browser-side loop with per-call errors
+    * Lower Python overhead of attribute access, definitions and executor arguments,
+        `benchmarks/overhead.py` gates it against a baseline
+    * `ObjectScope` (`selenium_js2py.scope`), objects created in a private namespace
+        and deleted in batches when garbage-collected or when the scope closes
+    * `JavaScriptObject`s support weak references
+    * `ReadCacheExecutor` (`selenium_js2py.readcache`), results of read-only scripts
+        cached until a write, a navigation or their TTL
+    * Introspection scripts of `JavaScriptObject` are marked read-only, `QueuedExecutor`
+        coalesces all of them
+    * `JavaScriptExpression` and `JavaScriptObject.chain`, deferred attribute access,
+        indexing and calls compiled into one script
+    
     
     """).strip("\n")
@@ -3,7 +3,7 @@ import re
 def enclosedby(string, pattern):
     return string.startswith(pattern) and string.endswith(pattern)
 
-def noneoremptystr(string): return string.strip() if string and string.strip() else ""
+def noneoremptystr(string): return string.strip() if string else ""
 
 def findargs(string): return re.findall(r"arguments\[\d+]", string)
 
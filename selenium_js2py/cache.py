@@ -0,0 +1,618 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+from ._algae import jio_repr
+
+__all__ = [
+    "AdaptivePolicy",
+    "AttributeCache",
+    "MemoEpoch",
+    "MemoizedFunction"
+]
+
+
+def _argkey(args, kwargs):
+    try:
+        return json.dumps([args, kwargs], sort_keys=True, default=_argdefault)
+    except (TypeError, ValueError):
+        return repr((args, sorted(kwargs.items())))
+
+
+def _argdefault(arg):
+    if (argid := getattr(arg, "id", None)) is not None:
+        return f"{type(arg).__name__}:{argid}"
+    elif isinstance(arg, (set, frozenset)):
+        return sorted(arg, key=repr)
+    
+    raise TypeError(type(arg).__name__)
+
+
+def _sizeof(*objs):
+    return sum(sys.getsizeof(obj) for obj in objs)
+
+
+def _same(a, b):
+    try:
+        return bool(a == b)
+    except Exception:
+        return a is b
+
+
+class _Tracked:
+    __slots__ = ("cached", "changes", "fetches", "hits", "last", "reads", "recent", "state", "value")
+    
+    def __init__(self, window, minreads):
+        self.changes = deque(maxlen=window)
+        self.recent = deque(maxlen=minreads)
+        self.reads = 0
+        self.fetches = 0
+        self.hits = 0
+        self.cached = 0
+        self.last = self.value = None
+        self.state = "observing"
+
+
+class AdaptivePolicy:
+    """Decides which attributes are worth caching from how often they are read and how often
+    their value changes
+        
+        
+        Every read of a tracked attribute is recorded, reads that reach the
+        browser also record whether the value differs from the previous one.
+        An attribute is promoted, its value then served without a round trip,
+        when it is
+            
+            * hot
+                
+                * read at least `minreads` times in the last `period` seconds
+            
+            * stable
+                
+                * its volatility, the ratio of changed values among its latest
+                    `window` fetches, is at most `maxvolatility`
+        
+        A promoted attribute is still fetched every `revalidate` reads, it is
+        demoted as soon as such a fetch returns a changed value. Functions are
+        tracked by their descriptor, so they are stable unless redefined.
+        
+        Attributes are keyed by the definition root of the object and the
+        attribute name, a policy given to a `JavaScriptObjectFactory` is shared
+        by its objects. Only objects that are defined by name are tracked, as
+        with `AttributeCache`.
+        
+        Decisions are kept in `decisions`, the current state of every
+        attribute in `attributes`.
+        
+        The policy is thread-safe.
+    """
+    
+    def __init__(self,
+                 minreads: int = 4,
+                 period: float = 10.0,
+                 maxvolatility: float = 0.1,
+                 window: int = 16,
+                 revalidate: int = 32,
+                 history: int = 256):
+        """Creates a policy without any tracked attribute
+        
+        Parameters:
+            minreads: The number of reads within `period` making an attribute hot
+            
+            period: The period in seconds over which reads are counted
+            
+            maxvolatility: The maximum ratio of changed values of a stable attribute
+            
+            window: The number of latest fetches over which volatility is measured
+            
+            revalidate: A promoted attribute is fetched again every `revalidate` reads,
+                `0` never revalidates
+            
+            history: The number of latest decisions kept
+        """
+        self._minreads = max(int(minreads), 1)
+        self.period = period
+        self.maxvolatility = maxvolatility
+        self.revalidate = max(int(revalidate), 0)
+        self._window = max(int(window), 1)
+        self._tracked = {}
+        self._decisions = deque(maxlen=history)
+        self._lock = threading.RLock()
+    
+    def __contains__(self, key):
+        return key in self._tracked
+    
+    def __len__(self):
+        return len(self._tracked)
+    
+    def __repr__(self):
+        with self._lock:
+            cached = sum(tracked.state == "cached" for tracked in self._tracked.values())
+            return jio_repr(AdaptivePolicy, f"{cached}/{len(self)}")
+    
+    @property
+    def attributes(self):
+        """The reads, fetches, hits, volatility and state of every tracked attribute, keyed by
+        `(root, name)`
+        """
+        with self._lock:
+            return {key: self._describe(tracked) for key, tracked in self._tracked.items()}
+    
+    @property
+    def decisions(self):
+        """The latest promotions and demotions as `dict`s, oldest first"""
+        with self._lock:
+            return list(self._decisions)
+    
+    @property
+    def minreads(self):
+        """The number of reads within `period` making an attribute hot"""
+        return self._minreads
+    
+    def cached(self, root: str, name: str):
+        """Records a read of the attribute
+        
+        Returns:
+            A `(value,)` tuple if the read is served from the cache, `None` if
+                the attribute must be fetched and reported with `observe`
+        """
+        with self._lock:
+            tracked = self._track(root, name)
+            
+            if tracked.state == "cached":
+                tracked.cached += 1
+                
+                if not self.revalidate or tracked.cached % self.revalidate:
+                    tracked.hits += 1
+                    return tracked.value,
+            
+            return None
+    
+    def discard(self, root: str, name: str = None):
+        """Stops tracking an attribute, or every attribute of `root` if `name` is `None`"""
+        with self._lock:
+            if name is None:
+                keys = [key for key in self._tracked if key[0] == root]
+            else:
+                keys = [(root, name)]
+            
+            for key in keys:
+                if self._tracked.pop(key, None) is not None:
+                    self._decide(key, "discarded", "discarded")
+    
+    def invalidate(self):
+        """Demotes every promoted attribute, e.g. after a navigation, statistics are kept"""
+        with self._lock:
+            for key, tracked in self._tracked.items():
+                if tracked.state == "cached":
+                    self._demote(key, tracked, "invalidated")
+    
+    def observe(self, root: str, name: str, value, fingerprint=None):
+        """Records a fetched value of the attribute and decides whether to cache it
+        
+        Parameters:
+            root: The definition root of the object
+            
+            name: The name of the attribute
+            
+            value: The value served while the attribute is promoted
+            
+            fingerprint: What is compared between fetches, `value` if `None`
+        
+        Returns:
+            The decision, `"promoted"`, `"demoted"` or `None`
+        """
+        key = root, name
+        fingerprint = value if fingerprint is None else fingerprint
+        
+        with self._lock:
+            tracked = self._track(root, name, False)
+            tracked.fetches += 1
+            
+            if tracked.fetches > 1:
+                tracked.changes.append(not _same(tracked.last, fingerprint))
+            
+            tracked.last, tracked.value = fingerprint, value
+            
+            if tracked.state == "cached":
+                if tracked.changes[-1]:
+                    return self._demote(key, tracked, "changed on revalidation")
+            elif len(tracked.recent) == self._minreads and tracked.changes:
+                if (volatility := self._volatility(tracked)) <= self.maxvolatility:
+                    tracked.state = "cached"
+                    tracked.cached = 0
+                    return self._decide(
+                        key,
+                        "promoted",
+                        f"{self._minreads} reads in {self.period}s, volatility {volatility:.2f}")
+            
+            return None
+    
+    def _decide(self, key, decision, reason):
+        self._decisions.append({
+            "time"    : time.time(),
+            "root"    : key[0],
+            "name"    : key[1],
+            "decision": decision,
+            "reason"  : reason
+        })
+        return decision
+    
+    def _demote(self, key, tracked, reason):
+        tracked.state = "observing"
+        tracked.value = None
+        tracked.recent.clear()
+        return self._decide(key, "demoted", reason)
+    
+    def _describe(self, tracked):
+        return {
+            "reads"     : tracked.reads,
+            "fetches"   : tracked.fetches,
+            "hits"      : tracked.hits,
+            "volatility": self._volatility(tracked),
+            "state"     : tracked.state
+        }
+    
+    def _track(self, root, name, read=True):
+        if (tracked := self._tracked.get(key := (root, name))) is None:
+            tracked = self._tracked[key] = _Tracked(self._window, self._minreads)
+        
+        if read:
+            now = time.monotonic()
+            tracked.reads += 1
+            tracked.recent.append(now)
+            
+            while tracked.recent[0] < now - self.period:
+                tracked.recent.popleft()
+        
+        return tracked
+    
+    @staticmethod
+    def _volatility(tracked):
+        return sum(tracked.changes) / len(tracked.changes) if tracked.changes else 0.0
+
+
+class AttributeCache:
+    """A size-bounded, least-recently-used cache of attribute descriptors and function proxies
+        
+        
+        The cache is shared by every object created through a `JavaScriptObjectFactory`,
+        entries are keyed by the definition root of the object and the attribute name
+            
+            * `descriptor`
+                
+                * `(typeof, arity)` of the attribute, `arity` is `None` unless it is a function
+            
+            * `proxy`
+                
+                * The `callable` produced by `JavaScriptObject.wrapfunction`
+            
+            * `memoized`
+                
+                * The `MemoizedFunction` of the proxy, per maximum size and `MemoEpoch`
+        
+        Only objects that are defined by name (e.g. `$`, `window`, `document`) share entries,
+        objects passed as arguments to the executor are never cached here.
+        
+        The cache is bounded by number of entries (`maxsize`) and optionally by an estimate of
+        the memory held by its entries (`maxbytes`), the least recently used entries are evicted
+        first.
+        
+        The cache is thread-safe.
+    """
+    
+    def __init__(self, maxsize: int = 1024, maxbytes: int = None):
+        """Creates an empty cache
+        
+        Parameters:
+            maxsize: The maximum number of entries
+            
+            maxbytes: The optional maximum estimated size of the entries in bytes
+        """
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._maxsize = max(int(maxsize), 0)
+        self._maxbytes = maxbytes
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __repr__(self):
+        return jio_repr(AttributeCache, f"{len(self)}/{self._maxsize}")
+    
+    @property
+    def maxbytes(self):
+        """The maximum estimated size of the entries in bytes, `None` if unbounded"""
+        return self._maxbytes
+    
+    @maxbytes.setter
+    def maxbytes(self, value: int):
+        with self._lock:
+            self._maxbytes = value
+            self._evict()
+    
+    @property
+    def maxsize(self):
+        """The maximum number of entries"""
+        return self._maxsize
+    
+    @maxsize.setter
+    def maxsize(self, value: int):
+        with self._lock:
+            self._maxsize = max(int(value), 0)
+            self._evict()
+    
+    @property
+    def nbytes(self):
+        """The estimated size of the entries in bytes"""
+        return self._nbytes
+    
+    @property
+    def stats(self):
+        """Hits, misses, evictions, entries and estimated bytes held by the cache"""
+        lookups = self._hits + self._misses
+        return {
+            "hits"     : self._hits,
+            "misses"   : self._misses,
+            "hitrate"  : self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "size"     : len(self._entries),
+            "nbytes"   : self._nbytes,
+        }
+    
+    def clear(self):
+        """Removes all entries, statistics are kept"""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+    
+    def descriptor(self, root: str, name: str):
+        """The cached `(typeof, arity)` of the attribute or `None`"""
+        return self._get(("descriptor", root, name))
+    
+    def discard(self, root: str, name: str = None):
+        """Removes the entries of an attribute, or of every attribute of `root` if `name` is
+        `None`
+        
+        Parameters:
+            root: The definition root of the object
+            
+            name: The optional name of the attribute
+        """
+        with self._lock:
+            if name is None:
+                keys = [key for key in self._entries if key[1] == root]
+            else:
+                keys = [key for key in self._entries if key[1] == root and key[2] == name]
+            
+            for key in keys:
+                if key in self._entries:
+                    self._nbytes -= self._entries.pop(key)[1]
+    
+    def memoized(self, root: str, name: str, maxsize: int, epoch):
+        """The cached `MemoizedFunction` of the attribute or `None`"""
+        return self._get(("memoized", root, name, maxsize, epoch))
+    
+    def proxy(self, root: str, name: str):
+        """The cached function proxy of the attribute or `None`"""
+        return self._get(("proxy", root, name))
+    
+    def resetstats(self):
+        """Resets hits, misses and evictions"""
+        self._hits = self._misses = self._evictions = 0
+    
+    def setdescriptor(self, root: str, name: str, descriptor: tuple):
+        """Caches the `(typeof, arity)` of the attribute"""
+        self._set(("descriptor", root, name), tuple(descriptor))
+    
+    def setmemoized(self, root: str, name: str, maxsize: int, epoch, function):
+        """Caches the `MemoizedFunction` of the attribute"""
+        self._set(("memoized", root, name, maxsize, epoch), function)
+    
+    def setproxy(self, root: str, name: str, proxy):
+        """Caches the function proxy of the attribute"""
+        self._set(("proxy", root, name), proxy)
+    
+    def _evict(self):
+        while self._entries and (
+                len(self._entries) > self._maxsize or
+                self._maxbytes is not None and self._nbytes > self._maxbytes):
+            
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= nbytes
+            self._evictions += 1
+    
+    def _get(self, key):
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                self._misses += 1
+                return None
+            
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def _set(self, key, value):
+        if not self._maxsize:
+            return
+        
+        nbytes = _sizeof(key, *key, value)
+        
+        if isinstance(value, tuple):
+            nbytes += _sizeof(*value)
+        
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            
+            self._entries[key] = value, nbytes
+            self._nbytes += nbytes
+            self._evict()
+
+
+class MemoEpoch:
+    """A counter shared by `MemoizedFunction`s, advancing it invalidates every result memoized
+    before, e.g. after a navigation
+    """
+    
+    __slots__ = ("_value",)
+    
+    def __init__(self):
+        self._value = 0
+    
+    def __repr__(self):
+        return jio_repr(MemoEpoch, self._value)
+    
+    @property
+    def value(self):
+        """The current epoch"""
+        return self._value
+    
+    def advance(self):
+        """Invalidates the results memoized in the current epoch"""
+        self._value += 1
+
+
+class MemoizedFunction:
+    """Memoizes the results of a wrapped, pure JavaScript function
+    
+    
+        Results are kept in a least-recently-used cache keyed by the
+        serialized arguments of the call, arguments that cannot be serialized
+        are keyed by their `repr`. `WebElement`s are keyed by their id.
+        
+        Results can be invalidated manually with `invalidate` or, for every
+        function sharing a `MemoEpoch`, by advancing the epoch.
+        
+        The function is thread-safe, the lock is not held while the wrapped
+        function runs, so concurrent misses of the same call may both run it.
+    """
+    
+    __slots__ = ("_epoch", "_evictions", "_function", "_hits", "_lock", "_maxsize", "_misses",
+                 "_results")
+    
+    def __init__(self, function, maxsize: int = 128, epoch: MemoEpoch = None):
+        """Wraps the function
+        
+        Parameters:
+            function: A `callable` returned by `JavaScriptObject.wrapfunction`
+            
+            maxsize: The maximum number of memoized results
+            
+            epoch: An optional `MemoEpoch` shared with other functions
+        """
+        self._function = function
+        self._maxsize = max(int(maxsize), 0)
+        self._epoch = epoch
+        self._results = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+    
+    def __call__(self, *args, **kwargs):
+        key = _argkey(args, kwargs)
+        epoch = self._epoch.value if self._epoch else 0
+        
+        with self._lock:
+            if (entry := self._results.get(key)) is not None and entry[0] == epoch:
+                self._hits += 1
+                self._results.move_to_end(key)
+                return entry[1]
+            
+            self._misses += 1
+        
+        res = self._function(*args, **kwargs)
+        self._store(key, epoch, res)
+        
+        return res
+    
+    def __repr__(self):
+        return jio_repr(MemoizedFunction, self._function)
+    
+    @property
+    def epoch(self):
+        """The `MemoEpoch` of the function or `None`"""
+        return self._epoch
+    
+    @property
+    def function(self):
+        """The wrapped function"""
+        return self._function
+    
+    @property
+    def hitrate(self):
+        """The ratio of calls answered from memoized results"""
+        with self._lock:
+            calls = self._hits + self._misses
+            return self._hits / calls if calls else 0.0
+    
+    @property
+    def stats(self):
+        """Hits, misses, hit rate, evictions and number of memoized results"""
+        with self._lock:
+            return {
+                "hits"     : self._hits,
+                "misses"   : self._misses,
+                "hitrate"  : self.hitrate,
+                "evictions": self._evictions,
+                "size"     : len(self._results),
+            }
+    
+    def batch(self, calls, maxbytes: int = 1 << 20):
+        """Calls the function once per item of `calls`, serving memoized results and sending
+        the other calls in batches, see the `batch` of `JavaScriptObject.wrapfunction`
+        """
+        calls = [tuple(call) if isinstance(call, (tuple, list)) else (call,) for call in calls]
+        keys = [_argkey(call, {}) for call in calls]
+        epoch = self._epoch.value if self._epoch else 0
+        results, missing = [None] * len(calls), []
+        
+        with self._lock:
+            for i, key in enumerate(keys):
+                if (entry := self._results.get(key)) is not None and entry[0] == epoch:
+                    self._hits += 1
+                    self._results.move_to_end(key)
+                    results[i] = entry[1]
+                else:
+                    missing.append(i)
+            
+            self._misses += len(missing)
+        
+        if missing:
+            for i, res in zip(missing, self._function.batch([calls[i] for i in missing], maxbytes)):
+                results[i] = res
+                
+                if not isinstance(res, Exception):
+                    self._store(keys[i], epoch, res)
+        
+        return results
+    
+    def invalidate(self, *args, **kwargs):
+        """Discards the result of a call with the given arguments, or all results if no
+        arguments are given
+        """
+        with self._lock:
+            if args or kwargs:
+                self._results.pop(_argkey(args, kwargs), None)
+            else:
+                self._results.clear()
+    
+    def _store(self, key, epoch, res):
+        if self._maxsize:
+            with self._lock:
+                self._results[key] = epoch, res
+                self._results.move_to_end(key)
+                
+                while len(self._results) > self._maxsize:
+                    self._results.popitem(last=False)
+                    self._evictions += 1
@@ -0,0 +1,363 @@
+import json
+import threading
+from concurrent.futures import Future
+from itertools import count
+from typing import Iterable
+from urllib.request import urlopen
+
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from .javascript import JS2PyException, JavaScriptExecutor
+
+__all__ = [
+    "CDPExecutor",
+    "RemoteObject"
+]
+
+
+class RemoteObject:
+    """A reference to a JavaScript object held by the browser through the
+    Chrome DevTools Protocol
+        
+        
+        Remote objects can be passed as arguments to `CDPExecutor.execute_script`
+        without serializing the object, they remain alive in the browser until
+        they are released or the document is unloaded.
+    """
+    
+    __slots__ = ("_cdp", "_description", "_objectid", "_subtype", "_type")
+    
+    def __init__(self, cdp: "CDPExecutor", remote: dict):
+        self._cdp = cdp
+        self._objectid = remote.get("objectId")
+        self._type = remote.get("type")
+        self._subtype = remote.get("subtype")
+        self._description = remote.get("description")
+    
+    def __repr__(self):
+        return f"@RemoteObject:{{{self._description or self._type}}}"
+    
+    @property
+    def description(self):
+        """The description of the object given by the browser"""
+        return self._description
+    
+    @property
+    def objectid(self):
+        """The id of the object in the browser"""
+        return self._objectid
+    
+    @property
+    def subtype(self):
+        """The subtype of the object, e.g. `node`, `array`"""
+        return self._subtype
+    
+    @property
+    def type(self):
+        """The `typeof` of the object"""
+        return self._type
+    
+    def release(self):
+        """Releases the object in the browser"""
+        if self._objectid:
+            self._cdp.send("Runtime.releaseObject", objectId=self._objectid)
+            self._objectid = None
+
+
+class CDPExecutor(JavaScriptExecutor):
+    """Executes JavaScript through the Chrome DevTools Protocol (CDP)
+        
+        
+        Scripts are run with `Runtime.callFunctionOn` over a single persistent
+        websocket to the page, bypassing the WebDriver HTTP protocol. Scripts
+        have the same semantics as `WebDriver.execute_script`: the script is
+        the body of a function whose `arguments` are the given arguments.
+        
+        Requests are pipelined, `submit` sends a script without waiting for
+        the response of the previous one and returns a `Future`.
+        
+        The `Runtime` domain is enabled so that the global object is looked up
+        again when the page navigates, a script that still reaches a stale
+        context is retried once.
+        
+        Arguments must be JSON serializable or `RemoteObject`s, `WebElement`s
+        cannot be resolved by the protocol.
+    """
+    
+    def __init__(self, url: str, timeout: float = 30.0):
+        """Connects to the page
+        
+        Parameters:
+            url: The websocket debugger url of the page
+            
+            timeout: Seconds to wait for the response of a script
+        """
+        from websocket import create_connection
+        
+        self._url = url
+        self._timeout = timeout
+        self._ids = count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._globalid = None
+        self._ws = create_connection(url, enable_multithread=True)
+        self._reader = threading.Thread(target=self._read, name="CDPExecutor", daemon=True)
+        self._reader.start()
+        self.send("Runtime.enable")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __repr__(self):
+        return f"@CDPExecutor:{{{self._url}}}"
+    
+    @classmethod
+    def from_driver(cls, driver, timeout: float = 30.0):
+        """Connects to the current window of a Chromium based `WebDriver`
+        
+        Parameters:
+            driver: A Chrome or Edge `WebDriver`
+            
+            timeout: Seconds to wait for the response of a script
+        """
+        caps = driver.capabilities
+        address = None
+        
+        for key in ("goog:chromeOptions", "ms:edgeOptions"):
+            if address := caps.get(key, {}).get("debuggerAddress"):
+                break
+        
+        if not address:
+            raise JS2PyException("The driver does not expose a debugger address.")
+        
+        with urlopen(f"http://{address}/json/list", timeout=timeout) as res:
+            targets = json.loads(res.read())
+        
+        handle = driver.current_window_handle
+        
+        for target in targets:
+            if target.get("type") == "page" and target.get("id") == handle:
+                return cls(target["webSocketDebuggerUrl"], timeout)
+        
+        raise JS2PyException(f"No page target for window {handle}.")
+    
+    @property
+    def url(self):
+        """The websocket debugger url of the page"""
+        return self._url
+    
+    def close(self):
+        """Closes the websocket, pending scripts fail"""
+        self._ws.close()
+        self._fail(JS2PyException("The connection was closed."))
+    
+    def evaluate(self, expression: str, byvalue: bool = True):
+        """Evaluates an expression in the global scope of the page
+        
+        Parameters:
+            expression: The JavaScript expression
+            
+            byvalue: Whether to return the value or a `RemoteObject`
+        """
+        res = self.send(
+            "Runtime.evaluate",
+            expression=expression,
+            returnByValue=byvalue).result(self._timeout)
+        
+        return self._result(res, byvalue)
+    
+    def execute_many(self, scripts: Iterable[tuple]):
+        """Pipelines scripts, sending all of them before waiting for any response
+        
+        Parameters:
+            scripts: `(script, *args)` tuples
+        
+        Returns:
+            The results in the order of `scripts`
+        """
+        futures = [self.submit(script, *args) for script, *args in scripts]
+        return [future.result(self._timeout) for future in futures]
+    
+    def execute_remote(self, script: str, *args):
+        """Executes JavaScript returning the result as a `RemoteObject`
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self.submit(script, *args, byvalue=False).result(self._timeout)
+    
+    def execute_script(self, script: str, *args):
+        """Executes JavaScript
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self.submit(script, *args).result(self._timeout)
+    
+    def send(self, method: str, **params):
+        """Sends a CDP command
+        
+        Parameters:
+            method: The name of the command, e.g. `Runtime.evaluate`
+            
+            params: The parameters of the command
+        
+        Returns:
+            A `Future` of the raw `result` of the command
+        """
+        future = Future()
+        msgid = next(self._ids)
+        
+        with self._lock:
+            self._pending[msgid] = future
+        
+        try:
+            self._ws.send(json.dumps({"id": msgid, "method": method, "params": params}))
+        except Exception as exc:
+            with self._lock:
+                self._pending.pop(msgid, None)
+            
+            future.set_exception(exc)
+        
+        return future
+    
+    def submit(self, script: str, *args, byvalue: bool = True):
+        """Sends a script without waiting for its response
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+            
+            byvalue: Whether to return the value or a `RemoteObject`
+        
+        Returns:
+            A `Future` of the result of the script
+        """
+        arguments = [self._argument(arg) for arg in args]
+        future = Future()
+        
+        def call(globalid, retry):
+            try:
+                globalid = globalid.result()
+            except Exception as exc:
+                future.set_exception(exc)
+                return
+            
+            self.send(
+                "Runtime.callFunctionOn",
+                functionDeclaration=f"function() {{\n{script}\n}}",
+                objectId=globalid,
+                arguments=arguments,
+                returnByValue=byvalue,
+                awaitPromise=False).add_done_callback(lambda res: done(res, globalid, retry))
+        
+        def done(res, globalid, retry):
+            try:
+                future.set_result(self._result(res.result(), byvalue))
+            except _StaleContext as exc:
+                if retry:
+                    self._global(globalid).add_done_callback(lambda gid: call(gid, False))
+                else:
+                    future.set_exception(exc)
+            except Exception as exc:
+                future.set_exception(exc)
+        
+        self._global().add_done_callback(lambda gid: call(gid, True))
+        return future
+    
+    def _argument(self, arg):
+        if isinstance(arg, RemoteObject):
+            return {"objectId": arg.objectid}
+        elif isinstance(arg, Element):
+            raise TypeError("`WebElement`s cannot be passed through CDP, use `RemoteObject`s.")
+        
+        return {"value": arg}
+    
+    def _fail(self, exc):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+    
+    def _global(self, stale: str = None):
+        with self._lock:
+            if (current := self._globalid) is not None and stale is not None:
+                if current.done() and not current.exception() and current.result() == stale:
+                    self._globalid = None
+            
+            if (globalid := self._globalid) is not None:
+                return globalid
+            
+            globalid = self._globalid = Future()
+        
+        def done(res):
+            try:
+                globalid.set_result(res.result()["result"]["objectId"])
+            except Exception as exc:
+                with self._lock:
+                    self._globalid = None if self._globalid is globalid else self._globalid
+                
+                globalid.set_exception(exc)
+        
+        self.send("Runtime.evaluate", expression="globalThis").add_done_callback(done)
+        return globalid
+    
+    def _read(self):
+        while True:
+            try:
+                msg = json.loads(self._ws.recv())
+            except Exception as exc:
+                self._fail(JS2PyException(f"The connection was lost: {exc}"))
+                return
+            
+            if (msgid := msg.get("id")) is None:
+                if msg.get("method") == "Runtime.executionContextsCleared":
+                    with self._lock:
+                        self._globalid = None
+                
+                continue
+            
+            with self._lock:
+                future = self._pending.pop(msgid, None)
+            
+            if future is None:
+                continue
+            elif "error" in msg:
+                future.set_exception(_cdperror(msg["error"]))
+            else:
+                future.set_result(msg.get("result", {}))
+    
+    def _result(self, res, byvalue):
+        if details := res.get("exceptionDetails"):
+            exc = details.get("exception", {})
+            raise JS2PyException(exc.get("description") or details.get("text"))
+        
+        remote = res.get("result", {})
+        
+        if not byvalue:
+            return RemoteObject(self, remote) if "objectId" in remote else remote.get("value")
+        
+        return remote.get("value")
+
+
+class _StaleContext(JS2PyException):
+    pass
+
+
+def _cdperror(error):
+    message = error.get("message", "")
+    
+    if "context" in message or "object with given id" in message:
+        return _StaleContext(message)
+    
+    return JS2PyException(message)
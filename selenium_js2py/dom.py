@@ -0,0 +1,484 @@
+import re
+import textwrap
+import weakref
+from itertools import count
+from typing import Iterable, Union
+
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from ._algae import jio_repr
+from .javascript import JS2PyException
+
+__all__ = [
+    "DOMNode",
+    "DOMSnapshot",
+    "snapshot"
+]
+
+_TOKENS = count()
+
+_STALEDOMS = {}
+
+_SERIALIZE = textwrap.dedent("""
+let [root, token, maxdepth, released] = arguments;
+let doms = window.__js2py_doms || (window.__js2py_doms = {});
+for (let t of released) delete doms[t];
+root = typeof(root) === "string" ? document.querySelector(root) : root || document.documentElement;
+if (!root) return null;
+let nodes = [], out = [];
+let walk = (el, parent, depth) => {
+    let index = nodes.length, attrs = {}, contents = [];
+    nodes.push(el);
+    for (let a of el.attributes || []) attrs[a.name] = a.value;
+    out.push([parent, el.tagName.toLowerCase(), attrs, contents]);
+    if (maxdepth === null || depth < maxdepth) {
+        for (let c of el.childNodes || []) {
+            if (c.nodeType === 1) contents.push(walk(c, index, depth + 1));
+            else if (c.nodeType === 3 && c.data) contents.push(c.data);
+        }
+    }
+    return index;
+};
+walk(root, null, 0);
+doms[token] = nodes;
+return out;
+""").strip("\n")
+
+_TOKEN = re.compile(r"""
+    \s*(?P<combinator>[>+~,])\s*
+    | (?P<space>\s+)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<cls>[\w-]+)
+    | \[\s*(?P<attr>[\w:-]+)\s*
+        (?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<uq>[\w-]+))\s*)?]
+    | :(?P<pseudo>[\w-]+)(?:\(\s*(?P<pseudoarg>[^)]*?)\s*\))?
+    | (?P<tag>\*|[\w-]+)
+""", re.VERBOSE)
+
+_ATTROPS = {
+    "=" : lambda value, expected: value == expected,
+    "~=": lambda value, expected: expected in value.split(),
+    "|=": lambda value, expected: value == expected or value.startswith(expected + "-"),
+    "^=": lambda value, expected: bool(expected) and value.startswith(expected),
+    "$=": lambda value, expected: bool(expected) and value.endswith(expected),
+    "*=": lambda value, expected: bool(expected) and expected in value,
+}
+
+
+def _nth(arg):
+    arg = arg.replace(" ", "").lower()
+    
+    if arg == "odd":
+        return 2, 1
+    elif arg == "even":
+        return 2, 0
+    elif match := re.fullmatch(r"([+-]?\d*)n([+-]\d+)?", arg):
+        a = match[1]
+        return int(a + "1" if a in ("", "+", "-") else a), int(match[2] or 0)
+    
+    return 0, int(arg)
+
+
+def _matchesnth(position, a, b):
+    if a == 0:
+        return position == b
+    
+    return (position - b) % a == 0 and (position - b) // a >= 0
+
+
+class _Compound:
+    __slots__ = ("attrs", "classes", "id", "pseudos", "tag")
+    
+    def __init__(self):
+        self.tag = None
+        self.id = None
+        self.classes = []
+        self.attrs = []
+        self.pseudos = []
+    
+    def matches(self, node):
+        if self.tag and node.tag != self.tag:
+            return False
+        elif self.id and node.id != self.id:
+            return False
+        elif self.classes and not all(cls in node.classes for cls in self.classes):
+            return False
+        
+        for name, op, expected in self.attrs:
+            if (value := node.attrs.get(name)) is None or op and not _ATTROPS[op](value, expected):
+                return False
+        
+        for pseudo, arg in self.pseudos:
+            if not self._matchespseudo(node, pseudo, arg):
+                return False
+        
+        return True
+    
+    @staticmethod
+    def _matchespseudo(node, pseudo, arg):
+        siblings = node.parent.children if node.parent else [node]
+        
+        if pseudo == "first-child":
+            return siblings[0] is node
+        elif pseudo == "last-child":
+            return siblings[-1] is node
+        elif pseudo == "only-child":
+            return len(siblings) == 1
+        elif pseudo == "nth-child":
+            return _matchesnth(siblings.index(node) + 1, *arg)
+        elif pseudo == "nth-last-child":
+            return _matchesnth(len(siblings) - siblings.index(node), *arg)
+        elif pseudo == "empty":
+            return not node.contents
+        elif pseudo == "not":
+            return not any(selector.matches(node) for selector in arg)
+        elif pseudo == "contains":
+            return arg in node.textcontent
+        
+        raise JS2PyException(f"Unsupported pseudo-class :{pseudo}.")
+
+
+class _Selector:
+    """A complex selector, compounds and the combinators between them, matched right to left"""
+    
+    __slots__ = ("compounds", "combinators")
+    
+    def __init__(self, compounds, combinators):
+        self.compounds = compounds
+        self.combinators = combinators
+    
+    def matches(self, node):
+        return self._matches(node, len(self.compounds) - 1)
+    
+    def _matches(self, node, index):
+        if not self.compounds[index].matches(node):
+            return False
+        elif index == 0:
+            return True
+        
+        combinator = self.combinators[index - 1]
+        
+        if combinator == ">":
+            return node.parent is not None and self._matches(node.parent, index - 1)
+        elif combinator == " ":
+            ancestor = node.parent
+            
+            while ancestor is not None:
+                if self._matches(ancestor, index - 1):
+                    return True
+                
+                ancestor = ancestor.parent
+            
+            return False
+        
+        siblings = node.parent.children if node.parent else [node]
+        position = siblings.index(node)
+        
+        if combinator == "+":
+            return position > 0 and self._matches(siblings[position - 1], index - 1)
+        
+        return any(self._matches(sibling, index - 1) for sibling in siblings[:position])
+
+
+def _parse(selector: str):
+    """Parses a selector list into `_Selector`s"""
+    selectors, compounds, combinators = [], [_Compound()], []
+    position, selector = 0, selector.strip()
+    
+    while position < len(selector):
+        if not (match := _TOKEN.match(selector, position)) or match.end() == position:
+            raise JS2PyException(f"Unsupported selector at {position}: {selector}")
+        
+        position = match.end()
+        compound = compounds[-1]
+        
+        if (combinator := match["combinator"]) or match["space"]:
+            if combinator == ",":
+                selectors.append(_Selector(compounds, combinators))
+                compounds, combinators = [_Compound()], []
+            else:
+                combinators.append(combinator or " ")
+                compounds.append(_Compound())
+        elif match["id"]:
+            compound.id = match["id"]
+        elif match["cls"]:
+            compound.classes.append(match["cls"])
+        elif match["attr"]:
+            expected = next(
+                (value for value in match.group("dq", "sq", "uq") if value is not None), None)
+            compound.attrs.append((match["attr"].lower(), match["op"], expected))
+        elif pseudo := match["pseudo"]:
+            pseudo, arg = pseudo.lower(), match["pseudoarg"]
+            
+            if pseudo in ("nth-child", "nth-last-child"):
+                arg = _nth(arg or "")
+            elif pseudo == "not":
+                arg = _parse(arg or "")
+            elif pseudo == "contains":
+                arg = arg.strip("\"'") if arg else ""
+            
+            compound.pseudos.append((pseudo, arg))
+        elif tag := match["tag"]:
+            compound.tag = None if tag == "*" else tag.lower()
+    
+    selectors.append(_Selector(compounds, combinators))
+    return selectors
+
+
+class DOMNode:
+    """An element of a `DOMSnapshot`
+        
+        
+        * `tag`, the lowercase tag name
+        * `attrs`, the attributes as of the snapshot
+        * `classes`, the class names
+        * `parent`, `children`, the parent and child `DOMNode`s
+        * `contents`, the child `DOMNode`s and text, in document order
+    """
+    
+    __slots__ = ("attrs", "children", "classes", "contents", "index", "parent", "snapshot", "tag")
+    
+    def __init__(self, snapshot, index, tag, attrs):
+        self.snapshot = snapshot
+        self.index = index
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = tuple(attrs.get("class", "").split())
+        self.parent = None
+        self.children = []
+        self.contents = []
+    
+    def __repr__(self):
+        selector = self.tag + (f"#{self.id}" if self.id else "")
+        return jio_repr(DOMNode, selector + "".join(f".{cls}" for cls in self.classes))
+    
+    @property
+    def id(self):
+        """The id of the element or `None`"""
+        return self.attrs.get("id")
+    
+    @property
+    def text(self):
+        """The text directly inside the element"""
+        return "".join(content for content in self.contents if isinstance(content, str))
+    
+    @property
+    def textcontent(self):
+        """The text of the element and its descendants, in document order"""
+        return "".join(
+            content if isinstance(content, str) else content.textcontent
+            for content in self.contents)
+    
+    def attr(self, name: str):
+        """The value of an attribute as of the snapshot or `None`"""
+        return self.attrs.get(name)
+    
+    def element(self):
+        """The live `WebElement` of the node, fetched from the browser"""
+        return self.snapshot.elements([self])[0]
+    
+    def jquery(self):
+        """The live `JQueryElement` of the node, fetched from the browser"""
+        from .jquery import JQueryElement
+        return JQueryElement(self.element(), self.snapshot.javascript_executor)
+    
+    def query(self, selector: str):
+        """The descendants of the node matching a CSS selector, see `DOMSnapshot.query`"""
+        return self.snapshot.query(selector, self)
+
+
+class DOMSnapshot:
+    """A copy of a DOM subtree answering CSS selector queries locally
+        
+        
+        The subtree (tags, attributes and text) is serialized in one script
+        into a tree of `DOMNode`s indexed by tag, id and class. Queries are
+        matched against the snapshot without any round trip, the snapshot is
+        not updated when the page changes.
+        
+        The browser keeps a handle on every element of the snapshot until it
+        is released (e.g. at the end of a `with` block) or the page is
+        unloaded, `DOMNode.element` and `DOMSnapshot.elements` fetch live
+        `WebElement`s on demand. The handles of a snapshot garbage-collected
+        without being released are deleted by the next `snapshot` taken with
+        the same executor.
+        
+        Supported selectors are type, universal, `#id`, `.class`, attribute
+        selectors (`[a]`, `=`, `~=`, `|=`, `^=`, `$=`, `*=`), the descendant,
+        child, adjacent and general sibling combinators, selector lists and
+        the pseudo-classes `:first-child`, `:last-child`, `:only-child`,
+        `:nth-child()`, `:nth-last-child()`, `:empty`, `:not()` and
+        `:contains()`.
+    """
+    
+    def __init__(self, jsexec, serialized: list, token: str):
+        """Builds the tree from the serialized subtree, see `snapshot`"""
+        self._jsexec = jsexec
+        self._token = token
+        self._nodes = []
+        self._tags = {}
+        self._ids = {}
+        self._classes = {}
+        self._selectors = {}
+        self._released = False
+        self._finalizer = weakref.finalize(
+            self, _STALEDOMS.setdefault(id(jsexec), []).append, token)
+        
+        for index, (parent, tag, attrs, contents) in enumerate(serialized):
+            node = DOMNode(self, index, tag, attrs)
+            self._nodes.append(node)
+            self._tags.setdefault(tag, []).append(node)
+            
+            if (id_ := attrs.get("id")) is not None:
+                self._ids.setdefault(id_, []).append(node)
+            
+            for cls in node.classes:
+                self._classes.setdefault(cls, []).append(node)
+        
+        for node, (parent, _, _, contents) in zip(self._nodes, serialized):
+            if parent is not None:
+                node.parent = self._nodes[parent]
+            
+            for content in contents:
+                if isinstance(content, str):
+                    node.contents.append(content)
+                else:
+                    child = self._nodes[content]
+                    node.contents.append(child)
+                    node.children.append(child)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+    
+    def __iter__(self):
+        return iter(self._nodes)
+    
+    def __len__(self):
+        return len(self._nodes)
+    
+    def __repr__(self):
+        return jio_repr(DOMSnapshot, f"{len(self)} element(s)")
+    
+    @property
+    def javascript_executor(self):
+        """The executor of the snapshot"""
+        return self._jsexec
+    
+    @property
+    def root(self):
+        """The root `DOMNode` of the subtree"""
+        return self._nodes[0]
+    
+    def bytag(self, tag: str):
+        """The nodes of a tag, from the index"""
+        return list(self._tags.get(tag.lower(), ()))
+    
+    def byid(self, id_: str):
+        """The first node with an id or `None`, from the index"""
+        return (self._ids.get(id_) or [None])[0]
+    
+    def byclass(self, cls: str):
+        """The nodes with a class name, from the index"""
+        return list(self._classes.get(cls, ()))
+    
+    def elements(self, nodes: Iterable[DOMNode]):
+        """Fetches the live `WebElement`s of nodes in one script
+        
+        Raises:
+            JS2PyException: The snapshot was released or the page was unloaded
+        """
+        if self._released:
+            raise JS2PyException("The snapshot was released.")
+        
+        res = self._jsexec.execute_script(
+            "let nodes = window.__js2py_doms && window.__js2py_doms[arguments[0]];"
+            "return nodes ? arguments[1].map(i => nodes[i]) : null",
+            self._token,
+            [node.index for node in nodes])
+        
+        if res is None:
+            raise JS2PyException("The elements of the snapshot are no longer in the browser.")
+        
+        return res
+    
+    def query(self, selector: str, within: DOMNode = None):
+        """The nodes matching a CSS selector, in document order
+        
+        Parameters:
+            selector: The CSS selector
+            within: Only match descendants of this node
+        
+        Returns:
+            A `list` of `DOMNode`s
+        """
+        if (selectors := self._selectors.get(selector)) is None:
+            selectors = self._selectors[selector] = _parse(selector)
+        
+        matched = set()
+        
+        for sel in selectors:
+            for node in self._candidates(sel.compounds[-1]):
+                if node.index not in matched and sel.matches(node):
+                    matched.add(node.index)
+        
+        if within is not None:
+            matched = {index for index in matched if self._isdescendant(self._nodes[index], within)}
+        
+        return [self._nodes[index] for index in sorted(matched)]
+    
+    def queryone(self, selector: str, within: DOMNode = None):
+        """The first node matching a CSS selector or `None`"""
+        return next(iter(self.query(selector, within)), None)
+    
+    def release(self):
+        """Releases the elements held by the browser for the snapshot"""
+        if not self._released:
+            self._released = True
+            self._finalizer.detach()
+            self._jsexec.execute_script(
+                "if (window.__js2py_doms) delete window.__js2py_doms[arguments[0]]", self._token)
+    
+    def _candidates(self, compound):
+        if compound.id is not None:
+            return self._ids.get(compound.id, ())
+        elif compound.classes:
+            return min((self._classes.get(cls, ()) for cls in compound.classes), key=len)
+        elif compound.tag is not None:
+            return self._tags.get(compound.tag, ())
+        
+        return self._nodes
+    
+    @staticmethod
+    def _isdescendant(node, ancestor):
+        while (node := node.parent) is not None:
+            if node is ancestor:
+                return True
+        
+        return False
+
+
+def snapshot(jsexec, root: Union[str, Element] = None, maxdepth: int = None):
+    """Serializes a DOM subtree into a `DOMSnapshot` in one script
+    
+    Parameters:
+        jsexec: The `JavaScriptExecutor` or `WebDriver` to run scripts
+        
+        root: The root element or a selector of it, the document element if `None`
+        
+        maxdepth: The optional maximum depth of the subtree below `root`
+    
+    Returns:
+        The `DOMSnapshot`
+    """
+    token = f"{next(_TOKENS)}:{id(jsexec):x}"
+    stale = _STALEDOMS.get(id(jsexec), [])
+    released, stale[:] = stale[:], []
+    serialized = jsexec.execute_script(_SERIALIZE, root, token, maxdepth, released)
+    
+    if serialized is None:
+        raise JS2PyException(f"No element matches {root!r}.")
+    
+    return DOMSnapshot(jsexec, serialized, token)
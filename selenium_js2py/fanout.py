@@ -0,0 +1,253 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from .javascript import JS2PyException, JavaScriptObjectFactory
+
+__all__ = [
+    "FanOut"
+]
+
+_FRAMEPATH = """let path = [], w = window;
+while (w !== w.parent) {
+    let p = w.parent;
+    for (let i = 0; i < p.frames.length; i++) {
+        if (p.frames[i] === w) { path.unshift(i); break; }
+    }
+    w = p;
+}
+return path;"""
+
+
+def _framekey(frame):
+    return str(getattr(frame, "id", frame))
+
+
+def _normalize(context):
+    if isinstance(context, str):
+        return context, ()
+    
+    window, *frames = context
+    
+    if len(frames) == 1:
+        frames = frames[0]
+        
+        if frames is None:
+            frames = ()
+        elif not isinstance(frames, (list, tuple)):
+            frames = frames,
+    
+    return window, tuple(frames)
+
+
+class FanOut:
+    """Runs the same operation in many windows and frames of one or more sessions
+        
+        
+        Contexts are window handles or `(window, frame)` tuples, where `frame`
+        is anything accepted by `switch_to.frame` (index, name or `WebElement`)
+        or a list of them for nested frames. Results are keyed by the normalized
+        `(window, frames)` context.
+        
+        Contexts are ordered so that context switches are kept to a minimum:
+        every window is switched to once, starting with the current window, and frames sharing parents are visited
+        one after another, switching to the parent frame rather than starting
+        from the top of the window when that is shorter.
+        
+        Each context keeps its own `JavaScriptObjectFactory` between runs, so the
+        descriptors and function proxies cached by its objects are reused.
+        
+        With several sessions, each context is run in the session owning its
+        window, sessions run concurrently, one thread per session.
+        
+        Each session is switched back to the window and frame it was in when
+        `run` was called.
+    """
+    
+    def __init__(self, *drivers, **invopts):
+        """Sets up the sessions
+        
+        Parameters:
+            drivers: The `WebDriver`s
+            
+            invopts: Global invoke options of the factories of the contexts
+        """
+        if not drivers:
+            raise JS2PyException("Expected at least one driver.")
+        
+        self._drivers = drivers
+        self._invopts = invopts
+        self._factories = {}
+        self._lock = threading.Lock()
+        self._switches = 0
+    
+    def __repr__(self):
+        return f"@FanOut:{{{len(self._drivers)} session(s)}}"
+    
+    @property
+    def switches(self):
+        """The number of context switches made"""
+        return self._switches
+    
+    def clearcache(self):
+        """Discards the factories of all contexts"""
+        with self._lock:
+            self._factories.clear()
+    
+    def factory(self, context, driver=None):
+        """The `JavaScriptObjectFactory` of a context
+        
+        Parameters:
+            context: A window handle or `(window, frame)` tuple
+            
+            driver: The session owning the window, the first session by default
+        """
+        driver = driver or self._drivers[0]
+        key = id(driver), *_normalize(context)
+        
+        with self._lock:
+            if (factory := self._factories.get(key)) is None:
+                factory = self._factories[key] = JavaScriptObjectFactory(driver, **self._invopts)
+        
+        return factory
+    
+    def order(self, contexts: Iterable):
+        """Orders contexts to minimize switches
+        
+        Parameters:
+            contexts: Window handles or `(window, frame)` tuples
+        
+        Returns:
+            The normalized `(window, frames)` contexts without duplicates
+        """
+        windows = {}
+        
+        for context in contexts:
+            window, frames = _normalize(context)
+            windows.setdefault(window, {})[frames] = None
+        
+        return [
+            (window, frames)
+            for window, paths in windows.items()
+            for frames in sorted(paths, key=lambda path: [_framekey(frame) for frame in path])
+        ]
+    
+    def run(self,
+            contexts: Iterable,
+            operation: Callable[[JavaScriptObjectFactory], object],
+            capture: bool = False):
+        """Runs an operation in each context
+        
+        Parameters:
+            contexts: Window handles or `(window, frame)` tuples
+            
+            operation: Called with the `JavaScriptObjectFactory` of each context
+            
+            capture: Whether to return exceptions raised by `operation` as results
+                instead of raising them
+        
+        Returns:
+            A `dict` of results keyed by `(window, frames)`
+        """
+        contexts = self.order(contexts)
+        
+        if len(self._drivers) == 1:
+            return self._run(self._drivers[0], contexts, operation, capture)
+        
+        owners = {}
+        
+        for driver in self._drivers:
+            for handle in driver.window_handles:
+                owners.setdefault(handle, driver)
+        
+        assigned = {id(driver): [] for driver in self._drivers}
+        
+        for context in contexts:
+            if (owner := owners.get(context[0])) is None:
+                raise JS2PyException(f"No session owns window {context[0]}.")
+            
+            assigned[id(owner)].append(context)
+        
+        results = {}
+        
+        with ThreadPoolExecutor(max_workers=len(self._drivers)) as workers:
+            futures = [
+                workers.submit(self._run, driver, assigned[id(driver)], operation, capture)
+                for driver in self._drivers if assigned[id(driver)]
+            ]
+            
+            for future in futures:
+                results.update(future.result())
+        
+        return {context: results[context] for context in contexts}
+    
+    def _run(self, driver, contexts, operation, capture):
+        results = {}
+        
+        if not contexts:
+            return results
+        
+        original = driver.current_window_handle
+        originalpath = tuple(driver.execute_script(_FRAMEPATH))
+        window, path = original, originalpath
+        
+        try:
+            for context in sorted(contexts, key=lambda ctx: ctx[0] != original):
+                window, path = self._switch(driver, window, path, *context)
+                
+                try:
+                    results[context] = operation(self.factory(context, driver))
+                except Exception as exc:
+                    if not capture:
+                        raise
+                    
+                    results[context] = exc
+        finally:
+            if window != original:
+                driver.switch_to.window(original)
+                self._switched()
+                path = ()
+            
+            if path != originalpath:
+                driver.switch_to.default_content()
+                self._switched()
+                
+                for index in originalpath:
+                    driver.switch_to.frame(index)
+                    self._switched()
+        
+        return results
+    
+    def _switched(self):
+        with self._lock:
+            self._switches += 1
+    
+    def _switch(self, driver, window, path, target, frames):
+        if target != window:
+            driver.switch_to.window(target)
+            self._switched()
+            path = ()
+        
+        common = 0
+        
+        for current, frame in zip(path, frames):
+            if current is not frame and current != frame:
+                break
+            
+            common += 1
+        
+        if common < len(path):
+            if len(path) - common <= common + 1:
+                for _ in range(len(path) - common):
+                    driver.switch_to.parent_frame()
+                    self._switched()
+            else:
+                driver.switch_to.default_content()
+                self._switched()
+                common = 0
+        
+        for frame in frames[common:]:
+            driver.switch_to.frame(frame)
+            self._switched()
+        
+        return target, frames
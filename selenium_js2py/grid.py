@@ -0,0 +1,276 @@
+import json
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from urllib.parse import urlparse
+
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from .javascript import JS2PyException, JavaScriptExecutor
+
+__all__ = [
+    "GridExecutor"
+]
+
+_ELEMENT = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class GridExecutor(JavaScriptExecutor):
+    """Executes JavaScript on a remote WebDriver session (e.g. Selenium Grid) over a tuned,
+    persistent connection pool
+        
+        
+        Every script is a `POST /session/{id}/execute/sync` sent over a
+        keep-alive connection with `TCP_NODELAY`, connections are reused for
+        the lifetime of the executor rather than per command.
+        
+        Independent scripts can be overlapped: `submit` sends a script on a
+        free pooled connection without waiting for the response of the previous
+        one and returns a `Future`. The remote session still runs scripts in the
+        order it receives them, only the network round trips overlap.
+        
+        `WebElement`s in arguments and results are converted as the driver
+        would, elements in results have the executor as their parent.
+    """
+    
+    def __init__(self,
+                 url: str,
+                 session: str,
+                 maxsize: int = 4,
+                 timeout: float = 30.0,
+                 headers: dict = None,
+                 samples: int = 4096):
+        """Opens the connection pool
+        
+        Parameters:
+            url: The url of the remote end, e.g. `http://grid:4444/wd/hub`
+            
+            session: The id of the WebDriver session
+            
+            maxsize: The number of persistent connections, and of scripts that can be in flight
+            
+            timeout: Seconds to wait for the response of a script
+            
+            headers: Optional extra headers sent with every request, e.g. authorization
+            
+            samples: The number of latest latencies kept for the metrics
+        """
+        from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+        from urllib3.connection import HTTPConnection
+        
+        parsed = urlparse(url)
+        pool = HTTPSConnectionPool if parsed.scheme == "https" else HTTPConnectionPool
+        
+        self._path = f"{parsed.path.rstrip('/')}/session/{session}/execute/sync"
+        self._url = url
+        self._session = session
+        self._timeout = timeout
+        self._headers = {
+            "Accept"      : "application/json",
+            "Connection"  : "keep-alive",
+            "Content-Type": "application/json;charset=UTF-8",
+            **(headers or {})
+        }
+        self._pool = pool(
+            parsed.hostname,
+            parsed.port,
+            maxsize=maxsize,
+            block=True,
+            retries=False,
+            timeout=timeout,
+            socket_options=[
+                *HTTPConnection.default_socket_options,
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ])
+        self._workers = ThreadPoolExecutor(max_workers=maxsize, thread_name_prefix="GridExecutor")
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=samples)
+        self._requests = 0
+        self._errors = 0
+        self._sent = 0
+        self._received = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __repr__(self):
+        return f"@GridExecutor:{{{self._url}, {self._session}}}"
+    
+    @classmethod
+    def from_driver(cls, driver, **options):
+        """Uses the remote end and session of a `WebDriver`
+        
+        Parameters:
+            driver: A remote `WebDriver`
+            
+            options: Any options of `GridExecutor`
+        """
+        connection = driver.command_executor
+        headers = options.pop("headers", {})
+        
+        if config := getattr(connection, "_client_config", None):
+            url = config.remote_server_addr
+            headers = {**(config.get_auth_header() or {}), **headers}
+        else:
+            url = connection._url
+        
+        return cls(url, driver.session_id, headers=headers, **options)
+    
+    @property
+    def metrics(self):
+        """Connection-level metrics
+            
+            
+            * `requests`, `errors`
+            * `connections`, number of connections opened
+            * `reused`, number of requests sent over an already open connection
+            * `sent`, `received`, body bytes
+            * `p50`, `p99`, latency in seconds of the latest requests
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            requests = self._requests
+            metrics = {
+                "requests": requests,
+                "errors"  : self._errors,
+                "sent"    : self._sent,
+                "received": self._received,
+            }
+        
+        connections = self._pool.num_connections
+        
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p99 = quantiles[49], quantiles[98]
+        else:
+            p50 = p99 = latencies[0] if latencies else None
+        
+        return {
+            **metrics,
+            "connections": connections,
+            "reused"     : max(requests - connections, 0),
+            "p50"        : p50,
+            "p99"        : p99
+        }
+    
+    @property
+    def session_id(self):
+        """The id of the WebDriver session"""
+        return self._session
+    
+    def close(self):
+        """Waits for scripts in flight and closes the connections"""
+        self._workers.shutdown(wait=True)
+        self._pool.close()
+    
+    def create_web_element(self, element_id: str):
+        """Creates a `WebElement` whose parent is the executor"""
+        return Element(self, element_id)
+    
+    def execute_many(self, scripts: Iterable[tuple]):
+        """Overlaps independent scripts over the pooled connections
+        
+        Parameters:
+            scripts: `(script, *args)` tuples
+        
+        Returns:
+            The results in the order of `scripts`
+        """
+        futures = [self.submit(script, *args) for script, *args in scripts]
+        return [future.result() for future in futures]
+    
+    def execute_script(self, script: str, *args):
+        """Executes JavaScript
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        body = json.dumps({"script": script, "args": self._wrap(list(args))}).encode("utf-8")
+        start = time.perf_counter()
+        
+        try:
+            res = self._pool.urlopen(
+                "POST",
+                self._path,
+                body=body,
+                headers=self._headers,
+                preload_content=True,
+                assert_same_host=False)
+        except Exception:
+            self._record(start, len(body), 0, True)
+            raise
+        
+        data = res.data
+        self._record(start, len(body), len(data), res.status >= 400)
+        
+        try:
+            value = json.loads(data)["value"] if data else None
+        except (KeyError, ValueError):
+            raise JS2PyException(f"Unexpected response ({res.status}): {data[:200]!r}")
+        
+        if res.status >= 400:
+            if isinstance(value, dict):
+                raise JS2PyException(value.get("message") or value.get("error"))
+            
+            raise JS2PyException(f"{res.status}: {value}")
+        
+        return self._unwrap(value)
+    
+    def resetmetrics(self):
+        """Resets the request counters and latencies"""
+        with self._lock:
+            self._latencies.clear()
+            self._requests = self._errors = self._sent = self._received = 0
+    
+    def submit(self, script: str, *args):
+        """Sends a script on a free connection without waiting for the previous responses
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        
+        Returns:
+            A `Future` of the result of the script
+        """
+        return self._workers.submit(self.execute_script, script, *args)
+    
+    def _record(self, start, sent, received, error):
+        latency = time.perf_counter() - start
+        
+        with self._lock:
+            self._latencies.append(latency)
+            self._requests += 1
+            self._errors += error
+            self._sent += sent
+            self._received += received
+    
+    def _unwrap(self, value):
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        elif isinstance(value, dict):
+            if _ELEMENT in value:
+                return self.create_web_element(value[_ELEMENT])
+            
+            return {key: self._unwrap(val) for key, val in value.items()}
+        
+        return value
+    
+    def _wrap(self, value):
+        if isinstance(value, Element):
+            return {_ELEMENT: value.id}
+        elif isinstance(value, (list, tuple)):
+            return [self._wrap(item) for item in value]
+        elif isinstance(value, dict):
+            return {key: self._wrap(val) for key, val in value.items()}
+        
+        return value
@@ -1,15 +1,23 @@
+import binascii
+import json
 import textwrap
+import weakref
 from abc import ABC, abstractmethod
-from functools import partial, wraps
-from typing import Iterable, Union
+from functools import lru_cache, partial, wraps
+from itertools import count
+from types import MappingProxyType
+from typing import Iterable, Mapping, Union
 
 from selenium.webdriver.remote.webdriver import WebDriver as Driver
 
 from ._algae import enclosedby, findargs, jio_repr, noneoremptystr, setupargs
+from .cache import AdaptivePolicy, AttributeCache, MemoEpoch, MemoizedFunction, _argkey
+from .runtime import _runtimeexec
 
 __all__ = [
     "InvokeOption",
     "JavaScriptExecutor",
+    "JavaScriptExpression",
     "JavaScriptObject",
     "JavaScriptObjectFactory",
     "JavaScriptResponse"
@@ -27,6 +35,8 @@ class JS2PyException(Exception):
 class JavaScriptExecutor(ABC):
     """Abstract class for objects that execute javascript."""
     
+    __slots__ = ()
+    
     @abstractmethod
     def execute_script(self, script: str, *args):
         """Executes javascript
@@ -51,6 +61,7 @@ def _configureglobalopts(**invopts):
         InvokeOption.cachefuncs: invopts.get(InvokeOption.cachefuncs, True),
         InvokeOption.overwrite : invopts.get(InvokeOption.overwrite, True),
         InvokeOption.strobj    : invopts.get(InvokeOption.strobj, False),
+        InvokeOption.runtime   : invopts.get(InvokeOption.runtime, False),
     }
 
 
@@ -72,16 +83,60 @@ def _resolveargnames(argnames, arity):
     return names
 
 
+def _memoize(function, memoize, epoch):
+    if not memoize:
+        return function
+    
+    return MemoizedFunction(function, 128 if memoize is True else memoize, epoch)
+
+
+def _batchcall(jsexec, jsdef, leading, calls, maxbytes):
+    script = textwrap.dedent(f"""
+    return arguments[{len(leading)}].map(a => {{
+        try {{
+            return [true, {jsdef}(...a)];
+        }} catch (e) {{
+            return [false, String(e)];
+        }}
+    }});
+    """).strip("\n")
+    
+    results, chunk, size = [], [], 0
+    
+    def flush():
+        for ok, res in jsexec.execute_script(script, *leading, chunk):
+            results.append(res if ok else JS2PyException(res))
+    
+    for call in calls:
+        call = list(call) if isinstance(call, (tuple, list)) else [call]
+        callsize = len(_argkey(call, {}))
+        
+        if chunk and size + callsize > maxbytes:
+            flush()
+            chunk, size = [], 0
+        
+        chunk.append(call)
+        size += callsize
+    
+    if chunk:
+        flush()
+    
+    return results
+
+
 def _resolveargs(*execargs):
-    return tuple(arg() if callable(arg) else arg for arg in execargs)
+    return tuple(arg() if callable(arg) else arg for arg in execargs) if execargs else ()
 
 
 def _resolveexecargs(resolver, arity=0):
     def decorator(method):
         @wraps(method)
-        def wrapper(*args, **kwargs):
+        def wrapper(self, *args, **kwargs):
+            if len(args) <= arity:
+                return method(self, *args, **kwargs)
+            
             execargs = resolver(*args[arity:])
-            return method(*args[:arity], *execargs, **kwargs)
+            return method(self, *args[:arity], *execargs, **kwargs)
         
         return wrapper
     
@@ -96,6 +151,7 @@ class InvokeOption:
     iffunc = "iffunc"
     ifprop = "ifprop"
     overwrite = "overwrite"
+    runtime = "runtime"
     strobj = "strobj"
     
     @staticmethod
@@ -110,7 +166,8 @@ class InvokeOption:
             InvokeOption.cacheattrs: False,
             InvokeOption.cachefuncs: True,
             InvokeOption.cacheprops: True,
-            InvokeOption.overwrite : True
+            InvokeOption.overwrite : True,
+            InvokeOption.runtime   : False
         }
     
     @staticmethod
@@ -156,6 +213,7 @@ class InvokeOption:
             InvokeOption.cachefuncs,
             InvokeOption.cacheprops,
             InvokeOption.overwrite,
+            InvokeOption.runtime,
         ]
     
     @staticmethod
@@ -165,6 +223,7 @@ class InvokeOption:
             InvokeOption.cachefuncs,
             InvokeOption.cacheprops,
             InvokeOption.overwrite,
+            InvokeOption.runtime,
             InvokeOption.strobj
         ]
     
@@ -205,6 +264,193 @@ class InvokeOption:
         ]
 
 
+class _GlobalOptions:
+    """Immutable global invoke options, interned so that every object with the same
+    options shares a single instance
+    """
+    
+    __slots__ = (
+        InvokeOption.cacheattrs,
+        InvokeOption.cachefuncs,
+        InvokeOption.cacheprops,
+        InvokeOption.overwrite,
+        InvokeOption.runtime,
+        InvokeOption.strobj
+    )
+    
+    _interned = {}
+    
+    def __new__(cls, cacheattrs=False, cachefuncs=True, cacheprops=True, overwrite=True,
+                runtime=False, strobj=False):
+        key = (bool(cacheattrs), bool(cachefuncs), bool(cacheprops), bool(overwrite),
+               bool(runtime), bool(strobj))
+        
+        if (opts := cls._interned.get(key)) is None:
+            opts = object.__new__(cls)
+            
+            for slot, value in zip(cls.__slots__, key):
+                object.__setattr__(opts, slot, value)
+            
+            opts = cls._interned.setdefault(key, opts)
+        
+        return opts
+    
+    def __reduce__(self):
+        return _GlobalOptions, tuple(self.asdict().values())
+    
+    def __repr__(self):
+        return jio_repr(_GlobalOptions, self.asdict())
+    
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{_GlobalOptions.__name__} is immutable.")
+    
+    def asdict(self):
+        return {slot: getattr(self, slot) for slot in _GlobalOptions.__slots__}
+    
+    def replace(self, **invopts):
+        return _GlobalOptions(**{**self.asdict(), **invopts})
+
+
+def _globaloption(name):
+    def fget(self):
+        return getattr(self._opts, name)
+    
+    def fset(self, value):
+        self._opts = self._opts.replace(**{name: value})
+    
+    return property(fget, fset, doc=f"Global invoke option `{name}`")
+
+
+_NOATTRS = MappingProxyType({})
+
+_READONLY = "/* js2py:readonly */ "
+
+_SNAPSHOTS = count()
+
+_STALESNAPSHOTS = {}
+
+_ARRAYS = count()
+
+_TYPECODES = {
+    "Int8Array"        : "b",
+    "Uint8Array"       : "B",
+    "Uint8ClampedArray": "B",
+    "Int16Array"       : "h",
+    "Uint16Array"      : "H",
+    "Int32Array"       : "i",
+    "Uint32Array"      : "I",
+    "Float32Array"     : "f",
+    "Float64Array"     : "d",
+    "BigInt64Array"    : "q",
+    "BigUint64Array"   : "Q"
+}
+
+_PACKARRAY = textwrap.dedent("""
+(v, token, chunk) => {
+    if (v instanceof ArrayBuffer) v = new Uint8Array(v);
+    else if (typeof ImageData !== "undefined" && v instanceof ImageData) v = v.data;
+    else if (Array.isArray(v)) v = Float64Array.from(v);
+    if (!ArrayBuffer.isView(v) || v instanceof DataView) throw new TypeError("Expected a numeric array.");
+    let bytes = new Uint8Array(v.buffer, v.byteOffset, v.byteLength);
+    let pack = (start, end) => {
+        let out = "";
+        for (let i = start; i < end; i += 0x8000) {
+            out += String.fromCharCode.apply(null, bytes.subarray(i, Math.min(i + 0x8000, end)));
+        }
+        return btoa(out);
+    };
+    let kind = Object.prototype.toString.call(v).slice(8, -1);
+    if (bytes.length <= chunk) return [kind, bytes.length, pack(0, bytes.length)];
+    (window.__js2py_arrays || (window.__js2py_arrays = {}))[token] = pack;
+    return [kind, bytes.length, null];
+}
+""").strip("\n")
+
+
+@lru_cache(maxsize=4096)
+def _member(oname, name):
+    if not name:
+        return oname
+    elif name.isdecimal() or not name.isidentifier():
+        return f"""{oname}["{name}"]"""
+    elif name.startswith("["):
+        return f"""{oname}{name}"""
+    
+    return f"""{oname}.{name}"""
+
+
+@lru_cache(maxsize=1024)
+def _hasargs(obj):
+    return bool(findargs(obj))
+
+
+class _PropertyGetter:
+    __slots__ = ("_args", "_jsexec", "_script")
+    
+    def __init__(self, jsexec, script, args):
+        self._jsexec = jsexec
+        self._script = script
+        self._args = args
+    
+    def __call__(self, *args):
+        return self._jsexec.execute_script(self._script, *self._args, *args)
+
+
+def _shapekey(descriptors):
+    return tuple(sorted(
+        (name, "function", arity) if type_ == "function" else (name, "property", None)
+        for name, type_, arity in descriptors))
+
+
+def _shapemethod(name):
+    scripts = {}
+    
+    def method(self, *attrargs):
+        jsdef, passobj = self._define()
+        args = (*_resolveargs(*self._execargs), *attrargs)
+        
+        if (script := scripts.get(key := (jsdef, passobj, len(args), len(attrargs)))) is None:
+            argind = len(args) - len(attrargs) + passobj
+            argsstr = ", ".join(setupargs(lambda i: i + argind, 0, len(attrargs)))
+            script = scripts[key] = f"""return {jsdef}[{json.dumps(name)}]({argsstr})"""
+        
+        return self._jsexec.execute_script(script, *((self._obj,) if passobj else ()), *args)
+    
+    method.__name__ = method.__qualname__ = name
+    method.__doc__ = f"Calls the JavaScript function `{name}`"
+    return method
+
+
+def _shapeproperty(name):
+    scripts = {}
+    
+    def fget(self):
+        jsdef, passobj = self._define()
+        
+        if (script := scripts.get(key := (jsdef, passobj))) is None:
+            script = scripts[key] = f"""return {jsdef}[{json.dumps(name)}]"""
+        
+        args = _resolveargs(*self._execargs)
+        return self._jsexec.execute_script(script, *((self._obj,) if passobj else ()), *args)
+    
+    return property(fget, doc=f"The JavaScript property `{name}`")
+
+
+@lru_cache(maxsize=256)
+def _shapeclass(cls, shape):
+    namespace = {"__slots__": (), "__jsshape__": shape}
+    reserved = set(dir(cls))
+    
+    for name, kind, _ in shape:
+        if name.isidentifier() and not (name.startswith("__") or name in reserved):
+            if kind == "function":
+                namespace[name] = _shapemethod(name)
+            else:
+                namespace[name] = _shapeproperty(name)
+    
+    return type(f"{cls.__name__}Shape", (cls,), namespace)
+
+
 class JavaScriptObject:
     """A wrapper for a JavaScript object
     
@@ -240,6 +486,10 @@ class JavaScriptObject:
             * `overwrite`
             
                 * Whether to overwrite attribute if previously cached
+        
+        With the `runtime` keyword, introspection scripts (attribute listings,
+        descriptors and shapes) are short calls into a runtime of helpers
+        installed once per document, see `installruntime`.
                     
         When caching is enabled, `jsobject[attr]` returns the cached function of
         the attribute if it exists, if it does not exist, the attribute must
@@ -254,9 +504,40 @@ class JavaScriptObject:
             * `iffunc`
             * `overwrite`
             
+        The global options of an object are held in a single immutable
+        object shared by every object with the same options, and objects
+        have no instance `__dict__`, subclasses should declare `__slots__`.
+            
+        Objects defined by name (e.g. `$`, `window`) can additionally share the
+        descriptors and function proxies of their attributes with other objects
+        through an `AttributeCache`, see `JavaScriptObjectFactory`.
+            
+        Rather than choosing the caching options by hand, an `AdaptivePolicy`
+        can decide which attributes to cache from how often they are read and
+        how often their value changes, reads through `invoke` (and attribute
+        access) without explicit invoke options are then served from the
+        values it promoted.
+    
     """
     
-    def __init__(self, obj, jsexec: JSExecType, *execargs, **invopts: bool):
+    __slots__ = (
+        "_attrcache", "_attrs", "_execargs", "_jsexec", "_obj", "_opts", "_policy", "_snapshot",
+        "__weakref__")
+    
+    cacheattrs = _globaloption(InvokeOption.cacheattrs)
+    cachefuncs = _globaloption(InvokeOption.cachefuncs)
+    cacheprops = _globaloption(InvokeOption.cacheprops)
+    overwrite = _globaloption(InvokeOption.overwrite)
+    runtime = _globaloption(InvokeOption.runtime)
+    strobj = _globaloption(InvokeOption.strobj)
+    
+    def __init__(self,
+                 obj,
+                 jsexec: JSExecType,
+                 *execargs,
+                 attrcache: AttributeCache = None,
+                 policy: AdaptivePolicy = None,
+                 **invopts: bool):
         """Wraps the object and sets up global caching options
         
         Parameters:
@@ -267,6 +548,10 @@ class JavaScriptObject:
             execargs: Arguments required by the object
                 if it is a string with placeholder arguments
                 
+            attrcache: An optional `AttributeCache` shared with other objects
+                
+            policy: An optional `AdaptivePolicy` deciding which attributes to cache
+            
             invopts: Global invoke options:
                 {`cacheattrs`, `cachefuncs`, `cacheprops`, `overwrite`, `strobj`}
         """
@@ -274,28 +559,37 @@ class JavaScriptObject:
         self._obj = obj
         self._jsexec = jsexec
         self._execargs = execargs
-        self._attrs = {}
+        self._attrs = _NOATTRS
+        self._attrcache = attrcache
+        self._policy = policy
         
         invopts = _configureglobalopts(**invopts)
         
-        for key, value in invopts.items():
-            setattr(self, key, value)
-        
-        if isinstance(obj, str) and not self.strobj:
+        if isinstance(obj, str) and not invopts[InvokeOption.strobj]:
             if enclosedby(obj, '"') or enclosedby(obj, "'"):
                 self._obj = obj[1:-1]
-                self.strobj = True
+                invopts[InvokeOption.strobj] = True
             elif obj := noneoremptystr(obj):
                 self._obj = obj
             else:
                 self._obj = None
-                self.strobj = True
+                invopts[InvokeOption.strobj] = True
+        
+        self._opts = _GlobalOptions(**invopts)
+        self._snapshot = None
     
     def __contains__(self, attr):
-        return noneoremptystr(attr) in self._attrs
+        if (attr := noneoremptystr(attr)) in self._attrs:
+            return True
+        elif root := self._sharedroot():
+            return ("proxy", root, attr) in self._attrcache
+        
+        return False
     
     def __getattr__(self, name):
-        if (name := noneoremptystr(name)) in self._attrs:
+        if name in self._attrs:
+            return self._attrs[name]
+        elif (name := noneoremptystr(name)) in self._attrs:
             return self._attrs[name]
         elif not name.isidentifier():
             raise InvalidJavaScriptAttribute(f"{name} must be invoked via `invoke` or ['{name}'].")
@@ -343,6 +637,12 @@ class JavaScriptObject:
         
         args = setupargs(lambda i: i, 0, len(ctorargs)) if ctorargs else ()
         
+        if attrcache := invopts.get("attrcache"):
+            attrcache.discard(name)
+        
+        if policy := invopts.get("policy"):
+            policy.discard(name)
+        
         if args:
             jsexec.execute_script(
                 f"""{name} = new {obj}({",".join(args)})""",
@@ -365,6 +665,16 @@ class JavaScriptObject:
         else:
             return "arguments[0]"
     
+    @property
+    def adaptive_policy(self):
+        """The `AdaptivePolicy` of the object or `None`"""
+        return self._policy
+    
+    @property
+    def attribute_cache(self):
+        """The `AttributeCache` shared with other objects or `None`"""
+        return self._attrcache
+    
     @property
     def javascript_executor(self):
         """The executor for the object"""
@@ -375,6 +685,11 @@ class JavaScriptObject:
         """The wrapped object"""
         return self._obj
     
+    @property
+    def snapshot(self):
+        """The values of the properties of the object as of the last `refresh`"""
+        return self._snapshot[1] if self._snapshot else {}
+    
     @_resolveexecargs(_resolveargs)
     def allattributes(self, *execargs):
         """All functions and properties of the object and its prototype(s)
@@ -383,6 +698,10 @@ class JavaScriptObject:
             execargs: Any extra arguments required by the `JavaScriptExecutor`
         """
         jsdef, passobj = self._define()
+        
+        if self.runtime:
+            return self._rtexec(f"""__js2py.walk({jsdef}, 1)""", passobj, *execargs)
+        
         stmt = textwrap.dedent(f"""
         (() => {{
             let props = new Set();
@@ -396,7 +715,7 @@ class JavaScriptObject:
         }})();
         """).strip("\n")
         
-        return self._exec(stmt, passobj, *execargs)
+        return self._exec(stmt, passobj, *execargs, readonly=True)
     
     @_resolveexecargs(_resolveargs)
     def allfunctions(self, *execargs):
@@ -406,6 +725,10 @@ class JavaScriptObject:
             execargs: Any extra arguments required by the `JavaScriptExecutor`
         """
         jsdef, passobj = self._define()
+        
+        if self.runtime:
+            return self._rtexec(f"""__js2py.walk({jsdef}, 1, "f")""", passobj, *execargs)
+        
         stmt = textwrap.dedent(f"""
         (() => {{
             let props = new Set();
@@ -419,7 +742,7 @@ class JavaScriptObject:
         }})();
         """).strip("\n")
         
-        return self._exec(stmt, passobj, *execargs)
+        return self._exec(stmt, passobj, *execargs, readonly=True)
     
     @_resolveexecargs(_resolveargs)
     def allproperties(self, *execargs):
@@ -429,6 +752,10 @@ class JavaScriptObject:
             execargs: Any extra arguments required by the `JavaScriptExecutor`
         """
         jsdef, passobj = self._define()
+        
+        if self.runtime:
+            return self._rtexec(f"""__js2py.walk({jsdef}, 1, "p")""", passobj, *execargs)
+        
         stmt = textwrap.dedent(f"""
         (() => {{
             let props = new Set();
@@ -442,7 +769,7 @@ class JavaScriptObject:
         }})();
         """).strip("\n")
         
-        return self._exec(stmt, passobj, *execargs)
+        return self._exec(stmt, passobj, *execargs, readonly=True)
     
     @_resolveexecargs(_resolveargs)
     def attributes(self, *execargs):
@@ -452,13 +779,44 @@ class JavaScriptObject:
             execargs: Any extra arguments required by the `JavaScriptExecutor`
         """
         jsdef, passobj = self._define()
+        
+        if self.runtime:
+            return self._rtexec(f"""__js2py.walk({jsdef}, 0)""", passobj, *execargs)
+        
         stmt = f"""Object.getOwnPropertyNames({jsdef})"""
         
-        return self._exec(stmt, passobj, *execargs)
+        return self._exec(stmt, passobj, *execargs, readonly=True)
+    
+    def chain(self):
+        """Starts a deferred expression on the object, see `JavaScriptExpression`
+        
+        e.g. `app.chain().store.items[0].format("%d").value()` is a single script
+        """
+        return JavaScriptExpression(self)
+    
+    def clearsnapshot(self):
+        """Discards the snapshot of the object, in Python and in the browser"""
+        if self._snapshot:
+            (token, _, finalizer), self._snapshot = self._snapshot, None
+            
+            if finalizer is not None:
+                finalizer.detach()
+            
+            self._jsexec.execute_script(
+                """if (window.__js2py_snapshots) delete window.__js2py_snapshots[arguments[0]]""",
+                token)
     
     def clearcache(self):
-        """Clears the attribute cache"""
-        self._attrs.clear()
+        """Clears the attribute cache, including the entries of the object in
+        the shared `AttributeCache`
+        """
+        self._attrs = _NOATTRS
+        
+        if root := self._sharedroot():
+            self._attrcache.discard(root)
+    
+        if self._policy is not None and (root := self._namedroot()):
+            self._policy.discard(root)
     
     @_resolveexecargs(_resolveargs)
     def functions(self, *execargs):
@@ -468,10 +826,14 @@ class JavaScriptObject:
             execargs: Any extra arguments required by the `JavaScriptExecutor`
         """
         jsdef, passobj = self._define()
+        
+        if self.runtime:
+            return self._rtexec(f"""__js2py.walk({jsdef}, 0, "f")""", passobj, *execargs)
+        
         stmt = f"""Object.getOwnPropertyNames({jsdef}).filter(p => typeof({jsdef}[p]) ===
         "function")"""
         
-        return self._exec(stmt, passobj, *execargs)
+        return self._exec(stmt, passobj, *execargs, readonly=True)
     
     def get(self, name: str):
         """Gets the value of a global variable
@@ -488,6 +850,8 @@ class JavaScriptObject:
                name: str = None,
                *execargs,
                attrargs: tuple = None,
+               memoize: Union[bool, int] = False,
+               epoch: MemoEpoch = None,
                **invopts: bool):
         """Retrieves the value of the JavaScript attribute
 
@@ -497,6 +861,10 @@ class JavaScriptObject:
             attrargs: Supplied to the `name` if it represents a function
 
             execargs: Any extra arguments necessary to the executor
+            
+            memoize: Whether to memoize the results of the function, see `wrapfunction`
+            
+            epoch: An optional `MemoEpoch` of the memoized function
 
             invopts: Invocation options: {`cacheattr`, `iffunc`, `ifprop`, `overwrite`}
 
@@ -510,9 +878,13 @@ class JavaScriptObject:
             InvalidJavaScriptAttribute: `attrargs` is not `None` and `name` does
                 not represent a function
         """
-        prop = None
+        prop = root = None
+        
+        if self._policy is not None and attrargs is None and not (execargs or memoize or invopts):
+            if (root := self._namedroot()) and (cached := self._policy.cached(root, name)):
+                return cached[0]
         
-        if f := self.wrapfunction(name, *execargs):
+        if f := self.wrapfunction(name, *execargs, memoize=memoize, epoch=epoch):
             if attrargs is None:
                 res = f
             elif isinstance(attrargs, tuple):
@@ -526,6 +898,9 @@ class JavaScriptObject:
         else:
             return None
         
+        if root:
+            self._policy.observe(root, name, res, ("function",) if f else None)
+        
         if self._getopt(InvokeOption.cacheattr, InvokeOption.cacheattrs, **invopts):
             attr = None
             
@@ -537,10 +912,54 @@ class JavaScriptObject:
             overwrite = self._getopt(InvokeOption.overwrite, InvokeOption.overwrite, **invopts)
             
             if attr and name not in self._attrs or overwrite:
+                if self._attrs is _NOATTRS:
+                    self._attrs = {}
+                
                 self._attrs[name] = attr
         
         return res
     
+    def materialize(self, *execargs, shape: tuple = None):
+        """Creates a copy of the object whose class has its JavaScript attributes
+        as Python descriptors
+        
+        
+            Functions become methods and properties become Python `property`s
+            of a class generated from a single introspection of the object and
+            its prototype(s). The same class is reused for every object of the
+            same shape (the classes of the 256 most recently used shapes are
+            kept), so attribute access is a native Python lookup rather than
+            `__getattr__` followed by introspection.
+            
+            Attributes whose names are not identifiers, are dunder names or
+            collide with the attributes of the class itself remain available
+            through `invoke` or `obj[name]`.
+        
+        Parameters:
+            execargs: Any extra arguments required by the `JavaScriptExecutor`
+            
+            shape: An optional shape, as returned by `shape`, to skip introspection
+            
+        Returns:
+            An instance of a generated subclass of the class of the object
+        """
+        shape = _shapekey(shape) if shape is not None else self.shape(*execargs)
+        obj = object.__new__(_shapeclass(type(self), shape))
+        
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                try:
+                    value = object.__getattribute__(self, slot)
+                    
+                    if slot == "_attrs" and value is not _NOATTRS:
+                        value = dict(value)
+                    
+                    object.__setattr__(obj, slot, value)
+                except AttributeError:
+                    pass
+        
+        return obj
+    
     def populate(self, *execargs, **invopts: bool):
         """Populates a dictionary with the attributes of the object
         
@@ -603,10 +1022,173 @@ class JavaScriptObject:
             execargs: Any extra arguments required by the `JavaScriptExecutor`
         """
         jsdef, passobj = self._define()
-        stmt = f"""Object.getOwnPropertyNames({jsdef}).filter(p => typeof({jsdef})[p] !==
+        
+        if self.runtime:
+            return self._rtexec(f"""__js2py.walk({jsdef}, 0, "p")""", passobj, *execargs)
+        
+        stmt = f"""Object.getOwnPropertyNames({jsdef}).filter(p => typeof({jsdef}[p]) !==
             "function")"""
         
-        return self._exec(stmt, passobj, *execargs)
+        return self._exec(stmt, passobj, *execargs, readonly=True)
+    
+    @_resolveexecargs(_resolveargs, 1)
+    def readarray(self,
+                  name: str = None,
+                  *execargs,
+                  asnumpy: bool = False,
+                  chunksize: int = 1 << 20):
+        """Transfers a typed or numeric array as packed bytes rather than a list of numbers
+        
+        
+            Typed arrays (e.g. `Float32Array`, `Uint8ClampedArray`), `ArrayBuffer`s,
+            `ImageData` (canvas pixels) and arrays of numbers, read as `Float64Array`,
+            are packed into base64 in the browser and decoded straight into a
+            single buffer, in chunks of `chunksize` bytes when they are larger.
+            Values are in the byte order of the browser, little-endian in practice.
+        
+        Parameters:
+            name: The name of the attribute holding the array, the object itself if `None`
+            
+            execargs: Any extra arguments required by the `JavaScriptExecutor`
+            
+            asnumpy: Whether to return a NumPy array, requires `numpy`
+            
+            chunksize: The maximum number of bytes transferred per script
+        
+        Returns:
+            A `memoryview` of the typecode of the array (e.g. `f` for `Float32Array`),
+                or a NumPy array of the same dtype if `asnumpy`
+        """
+        jsdef, passobj = self._define(name)
+        token = f"{next(_ARRAYS)}:{id(self):x}"
+        chunksize = max(int(chunksize) // 3 * 3, 3)
+        index = self._argindex(passobj, execargs)
+        
+        stmt = f"""({_PACKARRAY})({jsdef}, arguments[{index}], arguments[{index + 1}])"""
+        kind, nbytes, data = self._exec(stmt, passobj, *execargs, token, chunksize)
+        buffer = bytearray(nbytes)
+        
+        try:
+            if (typecode := _TYPECODES.get(kind)) is None:
+                raise JS2PyException(f"Unsupported array {kind}.")
+            elif data is not None:
+                buffer[:] = binascii.a2b_base64(data)
+            else:
+                for start in range(0, nbytes, chunksize):
+                    end = min(start + chunksize, nbytes)
+                    buffer[start:end] = binascii.a2b_base64(self._jsexec.execute_script(
+                        """return window.__js2py_arrays[arguments[0]](arguments[1], arguments[2])""",
+                        token,
+                        start,
+                        end))
+        finally:
+            if data is None:
+                self._jsexec.execute_script(
+                    """delete window.__js2py_arrays[arguments[0]]""", token)
+        
+        if asnumpy:
+            try:
+                import numpy
+            except ImportError:
+                raise JS2PyException("`asnumpy` requires numpy.")
+            
+            return numpy.frombuffer(buffer, dtype=f"<{typecode}")
+        
+        return memoryview(buffer).cast(typecode)
+    
+    @_resolveexecargs(_resolveargs)
+    def refresh(self, *execargs):
+        """Refreshes the snapshot of the properties of the object, transferring only
+        what changed since the last refresh
+        
+        
+            The browser keeps a fingerprint of every property of the last
+            snapshot and only sends the properties that were added, changed
+            or removed, which are merged into `snapshot`. The first refresh,
+            or one after the page was reloaded, sends every property.
+            
+            Properties are the own, non-function properties of the object,
+            as in `populate` with `iffunc=False`. Properties that cannot be
+            serialized to JSON are only sent when added.
+            
+            The browser-side snapshot is freed by `clearsnapshot`, or with
+            the next refresh of any object on the same executor once the
+            object is garbage-collected.
+        
+        Parameters:
+            execargs: Any extra arguments required by the `JavaScriptExecutor`
+        
+        Returns:
+            A `dict` of `added` and `changed` properties and their values and
+                the names of the `removed` properties
+        """
+        if self._snapshot is None:
+            self._snapshot = f"{next(_SNAPSHOTS)}:{id(self):x}", {}, None
+        
+        token, values, finalizer = self._snapshot
+        
+        if finalizer is None:
+            stale = _STALESNAPSHOTS.setdefault(id(self._jsexec), [])
+            finalizer = weakref.finalize(self, stale.append, token)
+            self._snapshot = token, values, finalizer
+        
+        stale = _STALESNAPSHOTS.get(id(self._jsexec), [])
+        released, stale[:] = stale[:], []
+        jsdef, passobj = self._define()
+        index = self._argindex(passobj, execargs)
+        stmt = textwrap.dedent(f"""
+        (() => {{
+            let obj = {jsdef};
+            let store = (window.__js2py_snapshots = window.__js2py_snapshots || {{}});
+            let token = arguments[{index + 1}];
+            for (let t of arguments[{index}]) delete store[t];
+            let prev = store[token];
+            let next = {{}}, added = {{}}, changed = {{}};
+            
+            let hash = s => {{
+                let h = 0x811c9dc5;
+                for (let i = 0; i < s.length; i++) {{
+                    h = Math.imul(h ^ s.charCodeAt(i), 0x01000193);
+                }}
+                return h >>> 0;
+            }};
+            
+            for (let p of Object.getOwnPropertyNames(obj)) {{
+                let v, fp;
+                try {{
+                    v = obj[p];
+                    if (typeof(v) === "function") continue;
+                    fp = typeof(v) + ":" + hash(String(JSON.stringify(v)));
+                }} catch (e) {{
+                    fp = typeof(v) + ":?";
+                }}
+                next[p] = fp;
+                if (!prev || !(p in prev)) added[p] = v;
+                else if (prev[p] !== fp) changed[p] = v;
+            }}
+            
+            store[token] = next;
+            return [!prev, added, changed, prev ? Object.keys(prev).filter(p => !(p in next)) : []];
+        }})();
+        """).strip("\n")
+        
+        try:
+            full, added, changed, removed = self._exec(stmt, passobj, *execargs, released, token)
+        except BaseException:
+            stale.extend(released)
+            raise
+        
+        if full:
+            removed = [prop for prop in values if prop not in added]
+            values.clear()
+        
+        for prop in removed:
+            values.pop(prop, None)
+        
+        values.update(added)
+        values.update(changed)
+        
+        return {"added": added, "changed": changed, "removed": removed}
     
     def run(self, *execargs):
         return self.invoke(None, *execargs)
@@ -621,8 +1203,107 @@ class JavaScriptObject:
         if not ((name := noneoremptystr(name)) or name.isidentifier()):
             raise JS2PyException("Expected valid identifier.")
         
+        if self._attrcache is not None:
+            self._attrcache.discard(name)
+        
+        if self._policy is not None:
+            self._policy.discard(name)
+        
         self._jsexec.execute_script(f"{name} = arguments[0]", expr)
     
+    @_resolveexecargs(_resolveargs)
+    def descriptors(self, *execargs):
+        """The `(name, typeof, arity)` of every attribute of the object and its prototype(s)
+        
+        
+            `arity` is `None` unless the attribute is a function. The
+            descriptors are also shared through the `AttributeCache` of the
+            object, if it has one.
+        
+        Parameters:
+            execargs: Any extra arguments required by the `JavaScriptExecutor`
+        """
+        jsdef, passobj = self._define()
+        
+        if self.runtime:
+            descriptors = self._rtexec(f"""__js2py.shape({jsdef})""", passobj, *execargs)
+        else:
+            stmt = textwrap.dedent(f"""
+            (() => {{
+                let props = new Set();
+                let root = {jsdef};
+                let current = root;
+                
+                do {{
+                    Object.getOwnPropertyNames(current).map(p => props.add(p));
+                }} while ((current = Object.getPrototypeOf(current)));
+                
+                return [...props.keys()].map(p => {{
+                    try {{
+                        let t = typeof(root[p]);
+                        return [p, t, t === "function" ? root[p].length : null];
+                    }} catch (e) {{
+                        return [p, "undefined", null];
+                    }}
+                }});
+            }})();
+            """).strip("\n")
+            
+            descriptors = self._exec(stmt, passobj, *execargs, readonly=True)
+        
+        descriptors = [tuple(descriptor) for descriptor in descriptors]
+        
+        if (root := None if execargs else self._sharedroot()) is not None:
+            for name, type_, arity in descriptors:
+                self._attrcache.setdescriptor(root, name, (type_, arity))
+        
+        return descriptors
+    
+    @_resolveexecargs(_resolveargs)
+    def shape(self, *execargs):
+        """The `(name, kind, arity)` of every attribute of the object and its prototype(s)
+        
+        
+            `kind` is either `"function"` or `"property"`, `arity` is `None`
+            for properties. The descriptors are also shared through the
+            `AttributeCache` of the object, if it has one.
+        
+        Parameters:
+            execargs: Any extra arguments required by the `JavaScriptExecutor`
+        """
+        return _shapekey(self.descriptors(*execargs))
+    
+    def subscribe(self, names: Iterable[str] = None, *execargs, capacity: int = 1024):
+        """Watches properties of the object, buffering their changes in the browser
+        
+        
+            Each watched property is replaced by an accessor recording every
+            assignment that changes its value as an event
+            `{name, value, oldValue, time}` in a browser-side ring buffer, which
+            replaces polling the properties with draining the buffer in one call.
+            Properties that are not configurable are not watched.
+        
+        Parameters:
+            names: The names of the properties, all own, non-function properties if `None`
+            
+            execargs: Any extra arguments required by the `JavaScriptExecutor`
+            
+            capacity: The maximum number of buffered events
+        
+        Returns:
+            A `Subscription`, closing it restores the properties
+        """
+        from .subscription import _propertywatcher, _subscribe
+        
+        jsdef, passobj = self._define()
+        args = (*((self._obj,) if passobj else ()), *_resolveargs(*self._execargs, *execargs))
+        
+        return _subscribe(
+            self._jsexec,
+            _propertywatcher(jsdef, names),
+            *args,
+            capacity=capacity)
+    
     def tryinvoke(self,
                   name: str,
                   attrargs: tuple = None,
@@ -704,7 +1385,9 @@ class JavaScriptObject:
     def wrapfunction(self,
                      name: str,
                      *execargs,
-                     argnames: Union[str, Iterable[str]] = None):
+                     argnames: Union[str, Iterable[str]] = None,
+                     memoize: Union[bool, int] = False,
+                     epoch: MemoEpoch = None):
         """Wraps a JavaScript function with a Python function
 
         Parameters:
@@ -714,57 +1397,53 @@ class JavaScriptObject:
 
             argnames: A list of names for some or all of the arguments
                         of the produced function
+            
+            memoize: Whether to memoize the results of a pure function by its
+                        arguments, an `int` sets the maximum number of results
+                        (`128` if `True`)
+            
+            epoch: An optional `MemoEpoch` whose advance invalidates the
+                        memoized results
 
         Returns:
-            A `callable` representation of the JavaScript function
+            A `callable` representation of the JavaScript function, a
+                `MemoizedFunction` if `memoize`, the same one for every call
+                with the same `memoize` and `epoch` unless `execargs` or
+                `argnames` are given
 
         Raises:
             InvalidJavaScriptAttribute: If this is a '*global*' object
             (`self.name` is `None`) and `name` is empty, `None` or whitespace
         """
         
+        root = None if execargs or argnames else self._sharedroot()
+        memokey = None
+        
+        if memoize and not (execargs or argnames):
+            memokey = name, 128 if memoize is True else int(memoize), epoch
+            
+            if root:
+                memo = self._attrcache.memoized(root, *memokey)
+            else:
+                memo = self._attrs.get(("memoized", *memokey))
+            
+            if memo is not None:
+                return memo
+        
+        if root and (proxy := self._attrcache.proxy(root, name)):
+            return self._memoizeproxy(proxy, root, memokey, memoize, epoch)
+        
         jsdef, passobj = self._define(name)
-        stmt = f"""typeof({jsdef})"""
-        res_type = self._exec(stmt, passobj, *execargs)
-        args = (_resolveargs(*self._execargs), *execargs)
+        res_type, arity = self._describe(name, *execargs)
+        args = (*_resolveargs(*self._execargs), *execargs)
         
         if res_type == "function":
-            arity = self._exec(f"""{jsdef}.length""", passobj, *execargs)
-            
-            if arity == 0:
-                script = f"""return {jsdef}()"""
-                if passobj:
-                    return lambda: self._jsexec.execute_script(
-                        script,
-                        self._obj,
-                        *args)
-                else:
-                    return lambda: self._jsexec.execute_script(script, *args)
-            else:
-                if argnames:
-                    names = _resolveargnames(argnames, arity)
-                else:
-                    names = [f"arg{i}" for i in range(arity)]
-                
-                argind = len(findargs(jsdef))
-                arguments = [f"arguments[{i + argind}]" for i in range(arity)]
-                argsstr = ", ".join(arguments)
-                namesstr = ", ".join(names)
-                
-                if passobj:
-                    lamb = f"""lambda jsexec, obj, execargs, {namesstr}: jsexec.execute_script(
-                    \"\"\"return {jsdef}({argsstr})\"\"\", obj, *execargs, {namesstr}) """
-                    
-                    return partial(
-                        eval(lamb),
-                        self._jsexec,
-                        self._obj,
-                        args)
-                else:
-                    lamb = f"""lambda jsexec, execargs, {namesstr}: jsexec.execute_script(
-                    \"\"\"return {jsdef}({argsstr})\"\"\", *execargs, {namesstr})"""
-                    
-                    return partial(eval(lamb), self._jsexec, args)
+            proxy = self._wrapfunction(jsdef, passobj, args, arity, argnames)
+            
+            if root:
+                self._attrcache.setproxy(root, name, proxy)
+            
+            return self._memoizeproxy(proxy, root, memokey, memoize, epoch)
     
     @_resolveexecargs(_resolveargs, 1)
     def wrapproperty(self,
@@ -789,40 +1468,21 @@ class JavaScriptObject:
         """
         
         jsdef, passobj = self._define(name)
-        stmt = f"""typeof({jsdef})"""
-        res_type = self._exec(stmt, passobj, *execargs)
+        res_type, _ = self._describe(name, *execargs)
         
         if res_type not in ("function", "undefined"):
-            stmt = f"""return {jsdef}"""
-            execargs = (_resolveargs(*self._execargs), *execargs)
+            if self._execargs:
+                execargs = (*_resolveargs(*self._execargs), *execargs)
             
-            if passobj:
-                lamb = lambda jsexec, obj, *args: jsexec.execute_script(f"{stmt}", obj, *args)
-                f = partial(lamb, self._jsexec, self._obj, *execargs)
-                
-                return f if as_function else property(fget=f)
-            else:
-                lamb = lambda jsexec, *args: jsexec.execute_script(f"""{stmt}""", *args)
-                f = partial(lamb, self._jsexec, *execargs)
-                
-                return f if as_function else property(fget=f)
+            args = (self._obj, *execargs) if passobj else execargs
+            f = _PropertyGetter(self._jsexec, f"""return {jsdef}""", args)
+            
+            return f if as_function else property(fget=f)
     
     def _define(self, name=None):
-        def stringify(oname, pobj):
-            if not name:
-                obj_ = oname, pobj
-            elif name.isdecimal() or not name.isidentifier():
-                obj_ = f"""{oname}["{name}"]""", pobj
-            elif name.startswith("["):
-                obj_ = f"""{oname}{name}""", pobj
-            else:
-                obj_ = f"""{oname}.{name}""", pobj
-            
-            return obj_
-        
         name = noneoremptystr(name)
         
-        if not isinstance(self._obj, str) or self.__getattribute__("strobj"):
+        if not isinstance(self._obj, str) or self._opts.strobj:
             if self._obj is None:
                 if not name:
                     raise InvalidJavaScriptAttribute("Expected attribute name.")
@@ -834,23 +1494,46 @@ class JavaScriptObject:
                 if self._obj is None:
                     if not name:
                         raise InvalidJavaScriptAttribute("Expected attribute name.")
-                obj = stringify("arguments[0]", True)
+                obj = _member("arguments[0]", name), True
         else:
-            obj = stringify(self._obj, False)
+            obj = _member(self._obj, name), False
         
         return obj
     
-    def _exec(self, stmt, passobj, *args):
-        args = (_resolveargs(*self._execargs), *args)
+    def _describe(self, name, *execargs):
+        root = None if execargs else self._sharedroot()
+        
+        if root and (descriptor := self._attrcache.descriptor(root, name)):
+            return descriptor
+        
+        jsdef, passobj = self._define(name)
+        
+        if self.runtime:
+            descriptor = self._rtexec(f"""__js2py.describe(() => {jsdef})""", passobj, *execargs)
+        else:
+            stmt = f"""(t => [t, t === "function" ? {jsdef}.length : null])(typeof({jsdef}))"""
+            descriptor = self._exec(stmt, passobj, *execargs, readonly=True)
+        
+        descriptor = tuple(descriptor)
+        
+        if root:
+            self._attrcache.setdescriptor(root, name, descriptor)
+        
+        return descriptor
+    
+    def _argindex(self, passobj, execargs):
+        return (1 if passobj else 0) + len(self._execargs) + len(execargs)
+    
+    def _exec(self, stmt, passobj, *args, readonly=False):
+        if self._execargs:
+            args = (*_resolveargs(*self._execargs), *args)
+        
+        script = f"""{_READONLY}return {stmt}""" if readonly else f"""return {stmt}"""
+        
         if passobj:
-            return self._jsexec.execute_script(
-                f"""return {stmt}""",
-                self._obj,
-                *args)
+            return self._jsexec.execute_script(script, self._obj, *args)
         else:
-            return self._jsexec.execute_script(
-                f"""return {stmt}""",
-                *args)
+            return self._jsexec.execute_script(script, *args)
     
     def _getopt(self, lcl, glbl, **opts):
         gopt = getattr(self, glbl)
@@ -859,15 +1542,244 @@ class JavaScriptObject:
         return gopt if lopt is None else lopt
     
     def _globalinvopts(self):
-        return {glbl: getattr(self, glbl) for glbl in InvokeOption.globalsonly()}
+        return {glbl: getattr(self._opts, glbl) for glbl in InvokeOption.globalsonly()}
+    
+    def _rtexec(self, stmt, passobj, *args):
+        execute = lambda guarded: self._exec(guarded, passobj, *args, readonly=True)
+        return _runtimeexec(execute, stmt, self._jsexec)
+    
+    def _memoizeproxy(self, proxy, root, memokey, memoize, epoch):
+        if memokey is None:
+            return _memoize(proxy, memoize, epoch)
+        
+        memo = MemoizedFunction(proxy, memokey[1], epoch)
+        
+        if root:
+            self._attrcache.setmemoized(root, *memokey, memo)
+        else:
+            if self._attrs is _NOATTRS:
+                self._attrs = {}
+            
+            self._attrs["memoized", *memokey] = memo
+        
+        return memo
+    
+    def _namedroot(self):
+        if self._execargs or not isinstance(self._obj, str) or self._opts.strobj:
+            return None
+        
+        return None if _hasargs(self._obj) else self._obj
+    
+    def _sharedroot(self):
+        return None if self._attrcache is None else self._namedroot()
+    
+    def _wrapfunction(self, jsdef, passobj, args, arity, argnames):
+        proxy = self._proxyfunction(jsdef, passobj, args, arity, argnames)
+        leading = (self._obj, *args) if passobj else args
+        
+        def batch(calls: Iterable, maxbytes: int = 1 << 20):
+            """Calls the function once per item of `calls` in a browser-side loop
+            
+            Parameters:
+                calls: The arguments of each call, a `tuple` (or `list`) per call,
+                    any other item is the single argument of its call
+                
+                maxbytes: The approximate size of the arguments sent per script,
+                    calls are sent in as many scripts as needed
+            
+            Returns:
+                A `list` of the results in the order of `calls`, a call that threw
+                    has a `JS2PyException` as its result
+            """
+            return _batchcall(self._jsexec, jsdef, leading, calls, maxbytes)
+        
+        proxy.batch = batch
+        return proxy
+    
+    def _proxyfunction(self, jsdef, passobj, args, arity, argnames):
+        if arity == 0:
+            script = f"""return {jsdef}()"""
+            if passobj:
+                return lambda: self._jsexec.execute_script(
+                    script,
+                    self._obj,
+                    *args)
+            else:
+                return lambda: self._jsexec.execute_script(script, *args)
+        else:
+            if argnames:
+                names = _resolveargnames(argnames, arity)
+            else:
+                names = [f"arg{i}" for i in range(arity)]
+            
+            argind = len(args) + 1 if passobj else len(args)
+            arguments = [f"arguments[{i + argind}]" for i in range(arity)]
+            argsstr = ", ".join(arguments)
+            namesstr = ", ".join(names)
+            
+            if passobj:
+                lamb = f"""lambda jsexec, obj, execargs, {namesstr}: jsexec.execute_script(
+                \"\"\"return {jsdef}({argsstr})\"\"\", obj, *execargs, {namesstr}) """
+                
+                return partial(
+                    eval(lamb),
+                    self._jsexec,
+                    self._obj,
+                    args)
+            else:
+                lamb = f"""lambda jsexec, execargs, {namesstr}: jsexec.execute_script(
+                \"\"\"return {jsdef}({argsstr})\"\"\", *execargs, {namesstr})"""
+                
+                return partial(eval(lamb), self._jsexec, args)
+
+
+class JavaScriptExpression:
+    """A deferred JavaScript expression on an object, compiled into a single script
+    
+    
+        Attribute access, indexing and calls build up the expression instead
+        of running scripts, the expression is run by `value` (or by
+        iterating it or testing its truth) as one script. Indices that are
+        not integers, attribute names that are not identifiers and call
+        arguments are bound as arguments of the script, never inlined.
+        
+        Attributes named like those of the expression itself (e.g. `value`)
+        or starting with an underscore are reached by indexing, e.g.
+        `expr["value"]`.
+    """
+    
+    __slots__ = ("_obj", "_steps")
+    
+    def __init__(self, obj: "JavaScriptObject", steps: tuple = ()):
+        """Starts an expression
+        
+        Parameters:
+            obj: The `JavaScriptObject` the expression starts from
+            
+            steps: The `("attr", name)`, `("item", key)` and `("call", args)` steps
+        """
+        self._obj = obj
+        self._steps = steps
+    
+    def __bool__(self):
+        return bool(self.value())
+    
+    def __call__(self, *args):
+        return JavaScriptExpression(self._obj, (*self._steps, ("call", args)))
+    
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        
+        return JavaScriptExpression(self._obj, (*self._steps, ("attr", name)))
+    
+    def __getitem__(self, key):
+        return JavaScriptExpression(self._obj, (*self._steps, ("item", key)))
+    
+    def __iter__(self):
+        return iter(self.value() or ())
+    
+    def __repr__(self):
+        try:
+            expr = self._expression()[0]
+        except Exception:
+            expr = f"{self._obj.definition_root}: {self._steps}"
+        
+        return jio_repr(JavaScriptExpression, expr)
+    
+    @property
+    def steps(self):
+        """The steps of the expression"""
+        return self._steps
+    
+    def compile(self):
+        """The script of the expression and its arguments, as run by `value`
+        
+        Raises:
+            InvalidJavaScriptAttribute: The expression starts from the global
+                object without an attribute name
+        """
+        expr, passobj, bound = self._expression()
+        obj = (self._obj._obj,) if passobj else ()
+        
+        return f"""return {expr}""", (*obj, *_resolveargs(*self._obj._execargs), *bound)
+    
+    def value(self):
+        """Runs the expression as one script
+        
+        Returns:
+            The value of the expression
+        """
+        script, args = self.compile()
+        return self._obj._jsexec.execute_script(script, *args)
+    
+    def _expression(self):
+        steps = self._steps
+        
+        if steps and steps[0][0] == "attr" and steps[0][1].isidentifier():
+            jsdef, passobj = self._obj._define(steps[0][1])
+            steps = steps[1:]
+        else:
+            jsdef, passobj = self._obj._define()
+        
+        offset = len(self._obj._execargs) + (1 if passobj else 0)
+        expr, bound = [jsdef], []
+        
+        def bind(value):
+            bound.append(value)
+            return f"arguments[{offset + len(bound) - 1}]"
+        
+        for kind, step in steps:
+            if kind == "call":
+                expr.append(f"""({", ".join(bind(arg) for arg in step)})""")
+            elif kind == "attr" and step.isidentifier():
+                expr.append(f".{step}")
+            elif isinstance(step, int) and not isinstance(step, bool):
+                expr.append(f"[{step}]")
+            else:
+                expr.append(f"[{bind(step)}]")
+        
+        return "".join(expr), passobj, bound
 
 
 class JavaScriptObjectFactory:
-    """A factory for creating JavaScript objects using a set executor"""
+    """A factory for creating JavaScript objects using a set executor
+    
+    
+        Objects created by the factory share an `AttributeCache`, objects
+        wrapping the same global (e.g. `$`, `window`, `document`) reuse the
+        descriptors and function proxies of its attributes instead of
+        reintrospecting them.
+    """
     
-    def __init__(self, jsexec: JSExecType, *execargs, **invopts):
+    def __init__(self,
+                 jsexec: JSExecType,
+                 *execargs,
+                 cachesize: int = 1024,
+                 cachebytes: int = None,
+                 policy: AdaptivePolicy = None,
+                 **invopts):
+        """Sets up the executor, shared cache and global caching options
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` to run scripts
+            
+            execargs: Arguments given to every object created by the factory
+            
+            cachesize: The maximum number of entries of the shared cache,
+                `0` disables it
+            
+            cachebytes: The optional maximum estimated size of the shared cache in bytes
+            
+            policy: An optional `AdaptivePolicy` shared by the objects of the factory
+            
+            invopts: Global invoke options:
+                {`cacheattrs`, `cachefuncs`, `cacheprops`, `overwrite`, `strobj`}
+        """
         self._jsexec = jsexec
         self._execargs = execargs
+        self._attrcache = AttributeCache(cachesize, cachebytes)
+        self._policy = policy
         
         invopts = _configureglobalopts(**invopts)
         
@@ -877,6 +1789,33 @@ class JavaScriptObjectFactory:
     def __repr__(self):
         return jio_repr(JavaScriptObjectFactory, self._jsexec)
     
+    @property
+    def adaptive_policy(self):
+        """The `AdaptivePolicy` shared by the objects of the factory or `None`"""
+        return self._policy
+    
+    @property
+    def attribute_cache(self):
+        """The `AttributeCache` shared by the objects of the factory"""
+        return self._attrcache
+    
+    @property
+    def cachestats(self):
+        """Hits, misses, evictions, entries and estimated bytes of the shared cache"""
+        return self._attrcache.stats
+    
+    @property
+    def javascript_executor(self):
+        """The executor of the factory"""
+        return self._jsexec
+    
+    def clearcache(self):
+        """Clears the shared cache and demotes the attributes promoted by the policy"""
+        self._attrcache.clear()
+    
+        if self._policy is not None:
+            self._policy.invalidate()
+    
     def init(self, obj, *execargs, **invopts):
         """Wraps the object and sets up global caching options
         
@@ -891,7 +1830,13 @@ class JavaScriptObjectFactory:
         """
         opts = {**self._globalinvopts(), **_configureglobalopts(**invopts)}
         args = (*self._execargs, *execargs)
-        return JavaScriptObject(obj, self._jsexec, *args, **opts)
+        return JavaScriptObject(
+            obj,
+            self._jsexec,
+            *args,
+            attrcache=self._attrcache,
+            policy=self._policy,
+            **opts)
     
     def new(self, obj, name, *ctorargs, **invopts):
         """Creates a new JavaScript object and stores it in the global space of the executor
@@ -907,7 +1852,142 @@ class JavaScriptObjectFactory:
                 {`cacheattrs`, `cachefuncs`, `cacheprops`, `overwrite`}
         """
         opts = {**self._globalinvopts(), **_configureglobalopts(**invopts)}
-        return JavaScriptObject.new(obj, name, self._jsexec, *ctorargs, **opts)
+        return JavaScriptObject.new(
+            obj,
+            name,
+            self._jsexec,
+            *ctorargs,
+            attrcache=self._attrcache,
+            policy=self._policy,
+            **opts)
+    
+    def preload(self, manifest, materialize: bool = False, **invopts):
+        """Wraps many globals at once, fetching their descriptors and the initial values
+        of some of their properties in a single script
+            
+            
+            The descriptors of every root are seeded into the shared cache,
+            its functions are wrapped without further scripts and the values
+            of its listed properties become the `snapshot` of the object.
+            Roots that are not defined are wrapped without being seeded.
+            
+            With `cacheattrs` on, the listed attributes are put in the
+            attribute cache of the object as `invoke` would, functions with
+            `cachefuncs` and property getters with `cacheprops`.
+            
+            The descriptors of the listed attributes are always seeded, the
+            other descriptors only while they fit in the free room of the
+            shared cache, so preloading a large root such as `window` does not
+            evict the rest of the cache.
+            
+            e.g. `jq, app = factory.preload({"$": None, "app": ["state", "add"]}).values()`
+        
+        Parameters:
+            manifest: The names of the globals, or a mapping of the names of the
+                globals to the names of the attributes to fetch
+            
+            materialize: Whether to materialize the objects, see `JavaScriptObject.materialize`
+            
+            invopts: Global invoke options:
+                {`cacheattrs`, `cachefuncs`, `cacheprops`, `overwrite`}
+        
+        Returns:
+            A `dict` of the objects keyed by name, in the order of the manifest
+        """
+        if not isinstance(manifest, Mapping):
+            manifest = dict.fromkeys(manifest)
+        
+        objs = {name: self.init(name, **invopts) for name in manifest}
+        
+        if not objs:
+            return objs
+        
+        for obj in objs.values():
+            if obj._sharedroot() is None:
+                raise JS2PyException(f"Only objects defined by name can be preloaded, not {obj}.")
+        
+        entries = ", ".join(
+            f"""[() => {name}, {json.dumps(list(manifest[name] or ()))}]""" for name in objs)
+        stmt = textwrap.dedent(f"""
+        [{entries}].map(([get, names]) => {{
+            let root, props = new Set(), values = {{}};
+            
+            try {{
+                root = get();
+            }} catch (e) {{
+                return null;
+            }}
+            
+            if (root === undefined || root === null) return null;
+            
+            let current = root;
+            
+            do {{
+                Object.getOwnPropertyNames(current).map(p => props.add(p));
+            }} while ((current = Object.getPrototypeOf(current)));
+            
+            let descriptors = [...props.keys()].map(p => {{
+                try {{
+                    let t = typeof(root[p]);
+                    return [p, t, t === "function" ? root[p].length : null];
+                }} catch (e) {{
+                    return [p, "undefined", null];
+                }}
+            }});
+            
+            for (let p of names.filter(p => props.has(p))) {{
+                try {{
+                    let v = root[p];
+                    if (typeof(v) !== "function") values[p] = v === undefined ? null : v;
+                }} catch (e) {{}}
+            }}
+            
+            return [descriptors, values];
+        }});
+        """).strip("\n")
+        
+        res = self._jsexec.execute_script(f"""return {stmt}""")
+        
+        listed = sum(len(manifest[name] or ()) for name, entry in zip(objs, res) if entry)
+        room = self._attrcache.maxsize - len(self._attrcache) - listed
+        
+        for (name, obj), entry in zip(objs.items(), res):
+            if entry is None:
+                continue
+            
+            descriptors, values = [tuple(descriptor) for descriptor in entry[0]], entry[1]
+            known = {descriptor[0]: descriptor for descriptor in descriptors}
+            attrs = manifest[name] or ()
+            
+            for attr, type_, arity in descriptors:
+                if room > 0 and attr not in attrs:
+                    self._attrcache.setdescriptor(name, attr, (type_, arity))
+                    room -= 1
+            
+            for attr in attrs:
+                _, type_, arity = known.get(attr, (attr, "undefined", None))
+                self._attrcache.setdescriptor(name, attr, (type_, arity))
+                
+                if attr in values:
+                    cached = obj.cacheattrs and obj.cacheprops and obj.wrapproperty(
+                        attr, as_function=True)
+                elif attr in known:
+                    cached = obj.wrapfunction(attr) if obj.cachefuncs else None
+                else:
+                    continue
+                
+                if cached and obj.cacheattrs:
+                    if obj._attrs is _NOATTRS:
+                        obj._attrs = {}
+                    
+                    obj._attrs.setdefault(attr, cached)
+            
+            obj._snapshot = f"{next(_SNAPSHOTS)}:{id(obj):x}", values, None
+            
+            if materialize:
+                objs[name] = obj.materialize(shape=descriptors)
+        
+        return objs
     
     def _globalinvopts(self):
         return {glbl: getattr(self, glbl) for glbl in InvokeOption.globalsonly()}
@@ -924,6 +2004,8 @@ class JavaScriptResponse(JavaScriptObject):
     responses, i.e. `if response`vs.`if response.exception is None`.
     """
     
+    __slots__ = ("_exc", "_raw", "_res")
+    
     def __init__(self,
                  response,
                  jsexec: JSExecType = None,
@@ -936,6 +2018,7 @@ class JavaScriptResponse(JavaScriptObject):
             _res, _exc = JavaScriptObject(response, jsexec, **invopts), None
         
         self._raw = response
+        self._res = _res
         self._exc = _exc
         
         if isinstance(response, str):
@@ -985,7 +2068,7 @@ class JavaScriptResponse(JavaScriptObject):
 
         * `raw_response is Iterable[Element]`, `response is List[JQueryElement]`
         """
-        return self._r
+        return self._res
     
     @property
     def success(self):
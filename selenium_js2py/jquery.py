@@ -1,3 +1,5 @@
+import re
+from collections import OrderedDict
 from functools import singledispatchmethod as overloaded
 from time import sleep
 from typing import Iterable, Union
@@ -8,6 +10,8 @@ from . import InvokeOption
 from . import JavaScriptExecutor, JavaScriptObject
 from ._algae import jio_repr, noneoremptystr
 from .javascript import JSExecType, JS2PyException
+from .dom import snapshot
+from .subscription import _mutationwatcher, _subscribe
 
 __all__ = [
     "JQueryElement",
@@ -15,10 +19,46 @@ __all__ = [
     "S"
 ]
 
+_NOSEED = object()
+
+
+def _observe(jqobj, attributes, children, subtree, text, attributefilter, capacity):
+    options = {
+        "attributes"           : attributes,
+        "attributeOldValue"    : attributes,
+        "childList"            : children,
+        "subtree"              : subtree,
+        "characterData"        : text,
+        "characterDataOldValue": text
+    }
+    
+    if attributefilter:
+        options["attributeFilter"] = list(attributefilter)
+    
+    return _subscribe(
+        jqobj.javascript_executor,
+        _mutationwatcher("arguments[0]", options),
+        jqobj._execargs[0],
+        capacity=capacity)
+
+
+def _overelements(jqobj, stmt: str, *args):
+    jsexec = jqobj.javascript_executor
+    
+    if isinstance(jsexec, S):
+        jsexec = jsexec.javascript_executor
+    
+    return jsexec.execute_script(
+        f"""let elements = [].concat(arguments[0]), args = [...arguments].slice(1);\n{stmt}""",
+        jqobj._execargs[0],
+        *args)
+
 
 class JQueryElement(JavaScriptObject):
     """Wraps a `WebElement` that is treated as an argument to the `jquery` (`$`) function"""
     
+    __slots__ = ("_element",)
+    
     def __init__(self, element: Element, jsexec: JSExecType = None, **invopts):
         self._element = element
         jsexec = jsexec or element._parent
@@ -87,6 +127,32 @@ class JQueryElement(JavaScriptObject):
             fp: File path for the image
         """
         return self._execargs[0].screenshot(fp)
+    
+    def subscribe(self,
+                  attributes: bool = True,
+                  children: bool = True,
+                  subtree: bool = False,
+                  text: bool = False,
+                  attributefilter: Iterable[str] = None,
+                  capacity: int = 1024):
+        """Observes mutations of the element with a `MutationObserver`, buffering them in the
+        browser
+        
+        Events are `{type, target, name, value, oldValue, added, removed, time}`,
+        `target` is the mutated element.
+        
+        Parameters:
+            attributes: Whether to observe attributes
+            children: Whether to observe added and removed child nodes
+            subtree: Whether to observe the descendants as well
+            text: Whether to observe text (character data)
+            attributefilter: The names of the attributes to observe, all if `None`
+            capacity: The maximum number of buffered events
+            
+        Returns:
+            A `Subscription`, closing it disconnects the observer
+        """
+        return _observe(self, attributes, children, subtree, text, attributefilter, capacity)
 
 
 class JQueryResponse(JavaScriptObject):
@@ -104,6 +170,8 @@ class JQueryResponse(JavaScriptObject):
     `if response.exception is None`.
     """
     
+    __slots__ = ("_exc", "_raw", "_res")
+    
     def __init__(self,
                  response: Union[Element, Iterable[Element]],
                  jsexec: JSExecType = None,
@@ -143,6 +211,7 @@ class JQueryResponse(JavaScriptObject):
                             _res = [JQueryElement(elmt, _jsexec, **invopts) for elmt in _res]
         
         self._raw = response
+        self._res = _res
         self._exc = _exc
         
         super().__init__(
@@ -193,7 +262,7 @@ class JQueryResponse(JavaScriptObject):
         
         * `raw_response is Iterable[Element]`, `response is List[JQueryElement]`
         """
-        return self._r
+        return self._res
     
     @property
     def success(self):
@@ -215,13 +284,158 @@ class JQueryResponse(JavaScriptObject):
             return self._exec(f"""$({args0}).attr("{name}")""", False)
         else:
             self._exec(f"""$({args0}).attr("{name}", {args1})""", False, value)
+    
+    def count(self, expr: str = None, *args):
+        """Counts the elements for which a JavaScript expression is truthy, in the browser
+        
+        Parameters:
+            expr: The expression, with the element `e`, its index `i` and `args` in scope,
+                every element is counted if `None`
+            args: Extra arguments of the expression
+            
+        Returns:
+            The number of elements
+        """
+        if expr is None:
+            return len(self._res) if isinstance(self._res, list) else 1
+        
+        return _overelements(self, f"""return elements.reduce((n, e, i) => n + !!({expr}), 0)""",
+                             *args)
+    
+    def where(self, expr: str, *args):
+        """Keeps the elements for which a JavaScript expression is truthy, in the browser
+        
+        Unlike jQuery's `.filter`, which is forwarded as any other attribute, `expr`
+        is always an expression, e.g. `response.where("e.offsetParent !== null")`
+        
+        Parameters:
+            expr: The expression, with the element `e`, its index `i` and `args` in scope
+            args: Extra arguments of the expression
+            
+        Returns:
+            A `JQueryResponse` of the remaining elements
+        """
+        res = _overelements(self, f"""return elements.filter((e, i) => ({expr}))""", *args)
+        return JQueryResponse(res, self._jsexec, **self._globalinvopts())
+    
+    def select(self, expr: str, *args):
+        """Evaluates a JavaScript expression for every element, in the browser
+        
+        Unlike jQuery's `.map`, the values are returned as a `list`,
+        e.g. `response.select("e.textContent.trim()")`
+        
+        Parameters:
+            expr: The expression, with the element `e`, its index `i` and `args` in scope
+            args: Extra arguments of the expression
+            
+        Returns:
+            A `list` of the values of the expression, in the order of the elements
+        """
+        return _overelements(self, f"""return elements.map((e, i) => ({expr}))""", *args)
+    
+    def reduce(self, expr: str, *args, initial=_NOSEED):
+        """Folds the elements with a JavaScript expression, in the browser
+        
+        e.g. `response.reduce("acc + e.value.length", initial=0)`
+        
+        Parameters:
+            expr: The expression, with the accumulated value `acc`, the element `e`,
+                its index `i` and `args` in scope
+            args: Extra arguments of the expression
+            initial: The optional initial accumulated value, the first element if omitted
+            
+        Returns:
+            The accumulated value
+        """
+        if initial is _NOSEED:
+            return _overelements(self, f"""return elements.reduce((acc, e, i) => ({expr}))""", *args)
+        
+        return _overelements(
+            self,
+            f"""return elements.reduce((acc, e, i) => ({expr}), args.shift())""",
+            initial,
+            *args)
+    
+    def subscribe(self,
+                  attributes: bool = True,
+                  children: bool = True,
+                  subtree: bool = False,
+                  text: bool = False,
+                  attributefilter: Iterable[str] = None,
+                  capacity: int = 1024):
+        """Observes mutations of the elements with a `MutationObserver`, buffering them in the
+        browser
+        
+        Events are `{type, target, name, value, oldValue, added, removed, time}`,
+        `target` is the mutated element.
+        
+        Parameters:
+            attributes: Whether to observe attributes
+            children: Whether to observe added and removed child nodes
+            subtree: Whether to observe the descendants as well
+            text: Whether to observe text (character data)
+            attributefilter: The names of the attributes to observe, all if `None`
+            capacity: The maximum number of buffered events
+            
+        Returns:
+            A `Subscription`, closing it disconnects the observer
+        """
+        return _observe(self, attributes, children, subtree, text, attributefilter, capacity)
+
+
+_STATEFUL = re.compile(
+    r":(?:active|animated|checked|disabled|enabled|focus(?:-visible|-within)?|hidden|hover|"
+    r"indeterminate|in-range|invalid|out-of-range|placeholder-shown|selected|target|user-invalid|"
+    r"user-valid|valid|visible)(?![\w-])")
+
+_CACHEDQUERY = """
+let w = window.__js2py_domw;
+if (!w) {
+    w = window.__js2py_domw = {v: Math.floor(Math.random() * 2 ** 40)};
+    w.observer = new MutationObserver(() => w.v++);
+    w.observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+if (w.observer.takeRecords().length) w.v++;
+if (w.v === arguments[1]) return [w.v];
+return [w.v, $(arguments[0])];
+""".strip("\n")
 
 
 class S(JavaScriptObject, JavaScriptExecutor):
-    """A wrapper of the `jquery` (`$`) function"""
+    """A wrapper of the `jquery` (`$`) function
+        
+        
+        With `querycache`, the results of `query` are cached by selector. A
+        `MutationObserver` installed in the page counts the mutations of the
+        document, a cached result is checked against the count in the same
+        script that would run the query, `$(selector)` is only run and its
+        elements only transferred when the document changed.
+        
+        States that change without a mutation of the document (checked
+        boxes, selected options, focus, hover, visibility, validity of
+        inputs) are not seen by the observer, selectors using the matching
+        pseudo-classes (e.g. `:checked`, `:focus`, `:visible`) are never cached.
+    """
+    
+    __slots__ = ("_queries", "_querycache", "_queryhits", "_querymisses")
     
-    def __init__(self, jsexec: JSExecType, **invopts):
+    def __init__(self, jsexec: JSExecType, querycache: int = 0, **invopts):
+        """Wraps the `$` function of the page
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` to run scripts
+            
+            querycache: The maximum number of cached selector results, `0` disables the cache,
+                selectors with state pseudo-classes (e.g. `:checked`) are never cached
+            
+            invopts: Global invoke options:
+                {`cacheattrs`, `cachefuncs`, `cacheprops`, `overwrite`}
+        """
         super().__init__("$", jsexec, **{**invopts, InvokeOption.strobj: False})
+        self._querycache = max(int(querycache), 0)
+        self._queries = OrderedDict()
+        self._queryhits = 0
+        self._querymisses = 0
     
     def __call__(self, jquery: str):
         return self.query(jquery)
@@ -232,21 +446,35 @@ class S(JavaScriptObject, JavaScriptExecutor):
     def __str__(self):
         return "$"
     
+    @property
+    def querystats(self):
+        """Hits, misses and size of the selector cache"""
+        return {"hits": self._queryhits, "misses": self._querymisses, "size": len(self._queries)}
+    
+    def clearquerycache(self):
+        """Discards the cached selector results"""
+        self._queries.clear()
+    
     def execute_script(self, script, *args):
         try:
             res = self._jsexec.execute_script(script, *args)
         except Exception as exc:
             return JQueryResponse([], self, exc)
         else:
-            if isinstance(res, Element):
-                return JQueryElement(res, self)
-            elif isinstance(res, list) and len(res) > 0:
-                if isinstance(res[0], Element):
-                    return JQueryResponse(res, self)
-                else:
-                    return res
-            else:
-                return res
+            return self._wrapresult(res)
+    
+    def snapshot(self, root: Union[str, Element] = None, maxdepth: int = None):
+        """Serializes a DOM subtree in one script to answer selector queries locally, see
+        `DOMSnapshot`
+        
+        Parameters:
+            root: The root element or a selector of it, the document element if `None`
+            maxdepth: The optional maximum depth of the subtree below `root`
+            
+        Returns:
+            The `DOMSnapshot`
+        """
+        return snapshot(self._jsexec, root, maxdepth)
     
     @overloaded
     def query(self, jquery: Union[str, Element, Iterable[Element]]):
@@ -274,8 +502,12 @@ class S(JavaScriptObject, JavaScriptExecutor):
                 `JQueryResponse` if it is a list of `Element`s,
                 the value of the function otherwise.
         """
-        if jquery := noneoremptystr(jquery):
-            return self.execute_script(f"""return $(arguments[0])""", jquery)
+        if not (jquery := noneoremptystr(jquery)):
+            return None
+        elif self._querycache and not _STATEFUL.search(jquery):
+            return self._cachedquery(jquery)
+        
+        return self.execute_script(f"""return $(arguments[0])""", jquery)
     
     @query.register
     def _(self, jquery: Element):
@@ -290,3 +522,36 @@ class S(JavaScriptObject, JavaScriptExecutor):
                 the value of the function otherwise.
         """
         return JQueryElement(jquery)
+    
+    def _cachedquery(self, selector):
+        version, res = self._queries.get(selector, (None, None))
+        
+        try:
+            current, *queried = self._jsexec.execute_script(_CACHEDQUERY, selector, version)
+        except Exception as exc:
+            return JQueryResponse([], self, exc)
+        
+        if not queried:
+            self._queryhits += 1
+            self._queries.move_to_end(selector)
+            return res
+        
+        self._querymisses += 1
+        self._queries[selector] = current, (res := self._wrapresult(queried[0]))
+        self._queries.move_to_end(selector)
+        
+        while len(self._queries) > self._querycache:
+            self._queries.popitem(last=False)
+        
+        return res
+    
+    def _wrapresult(self, res):
+        if isinstance(res, Element):
+            return JQueryElement(res, self)
+        elif isinstance(res, list) and len(res) > 0:
+            if isinstance(res[0], Element):
+                return JQueryResponse(res, self)
+            else:
+                return res
+        else:
+            return res
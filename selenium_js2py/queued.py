@@ -0,0 +1,247 @@
+import re
+import threading
+from concurrent.futures import Future
+from functools import partial
+from queue import SimpleQueue
+from typing import Callable
+
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from ._algae import jio_repr
+from .cache import _argkey
+from .javascript import _READONLY, JS2PyException, JavaScriptExecutor
+
+__all__ = [
+    "QueuedExecutor"
+]
+
+_MEMBER = re.compile(r"""return [\w$]+(?:\.[\w$]+|\[(?:\d+|"[^"\\]*"|'[^'\\]*')])*""")
+
+_DESCRIBE = re.compile(r"""return \(t => \[t, t === "function" \? [^;]*\]\)\(typeof\([^;]*\)\)""")
+
+_PLAIN = (str, bytes, int, float, bool, list, tuple, dict, type(None), Element)
+
+
+def _readonly(script: str):
+    """Whether a script is a plain member read or an introspection script of `JavaScriptObject`"""
+    return bool(
+        script.startswith(_READONLY) or _MEMBER.fullmatch(script) or _DESCRIBE.fullmatch(script))
+
+
+class QueuedExecutor(JavaScriptExecutor):
+    """Wraps an executor so that it can be shared by many threads
+        
+        
+        Scripts are put in a queue and run one at a time, in order, by a
+        single worker thread, the wrapped executor (e.g. a `WebDriver`
+        session) is never used concurrently.
+        
+        Identical read-only scripts (same script and arguments) that are
+        queued or running at the same time are coalesced, they share one call
+        to the wrapped executor and its result. Scripts are read-only when
+        run with `execute_readonly` or when the `readonly` predicate accepts
+        them, by default plain member reads (e.g. `return app.state`) and the
+        introspection scripts (attribute listings and descriptors) of
+        `JavaScriptObject`.
+        
+        Each caller gets its own `Future`, cancelling it does not affect the
+        other callers of a coalesced script, which is only skipped when every
+        caller cancelled before it ran.
+        
+        Any other attribute of the wrapped executor is read, and any method
+        called, through the queue as well, e.g. `get`, `title`,
+        `switch_to.frame(...)` or `find_element(...)`, until the executor is
+        closed. Methods of the returned `WebElement`s call the session
+        directly, pass elements to scripts rather than using them from several
+        threads.
+    """
+    
+    def __init__(self, jsexec, readonly: Callable[[str], bool] = _readonly):
+        """Wraps the executor and starts the worker thread
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` or `WebDriver` to run scripts
+            
+            readonly: A predicate of the scripts that are read-only, `None` marks none
+        """
+        self._jsexec = jsexec
+        self._readonly = readonly
+        self._queue = SimpleQueue()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._calls = 0
+        self._coalesced = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="QueuedExecutor", daemon=True)
+        self._worker.start()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        
+        return _queued(self, self._call(getattr, self._jsexec, name))
+    
+    def __repr__(self):
+        return jio_repr(QueuedExecutor, self._jsexec)
+    
+    @property
+    def javascript_executor(self):
+        """The wrapped executor"""
+        return self._jsexec
+    
+    @property
+    def stats(self):
+        """Calls made to the wrapped executor, coalesced scripts and scripts in flight"""
+        with self._lock:
+            return {
+                "calls"    : self._calls,
+                "coalesced": self._coalesced,
+                "inflight" : len(self._inflight)
+            }
+    
+    def close(self):
+        """Runs the queued scripts and stops the worker thread"""
+        with self._lock:
+            if self._closed:
+                return
+            
+            self._closed = True
+            self._queue.put(None)
+        
+        self._worker.join()
+    
+    def execute_async_script(self, script: str, *args):
+        """Queues asynchronous JavaScript and waits for its result
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self._submit(self._jsexec.execute_async_script, script, args, None).result()
+    
+    def execute_readonly(self, script: str, *args):
+        """Queues JavaScript that does not modify the page and waits for its result, sharing
+        the call of an identical script in flight
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self._submit(self._jsexec.execute_script, script, args, True).result()
+    
+    def execute_script(self, script: str, *args):
+        """Queues JavaScript and waits for its result
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self.submit(script, *args).result()
+    
+    def submit(self, script: str, *args):
+        """Queues JavaScript without waiting for its result
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        
+        Returns:
+            A `Future` of the result of the script
+        """
+        return self._submit(self._jsexec.execute_script, script, args, None)
+    
+    def _call(self, function, *args, **kwargs):
+        if threading.current_thread() is self._worker or not self._worker.is_alive():
+            return function(*args, **kwargs)
+        
+        return self._submit(partial(function, **kwargs), None, args, False).result()
+    
+    def _run(self):
+        while (request := self._queue.get()) is not None:
+            execute, script, args, callers, key = request
+            
+            with self._lock:
+                if skip := all(future.cancelled() for future in callers):
+                    self._inflight.pop(key, None)
+            
+            if skip:
+                continue
+            
+            try:
+                res, exc = (execute(*args) if script is None else execute(script, *args)), None
+            except BaseException as error:
+                res, exc = None, error
+            
+            with self._lock:
+                self._inflight.pop(key, None)
+            
+            for future in callers:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                elif exc is not None:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(res)
+    
+    def _submit(self, execute, script, args, readonly):
+        if readonly is None:
+            readonly = self._readonly is not None and self._readonly(script)
+        
+        key = (script, _argkey(args, {})) if readonly else None
+        
+        with self._lock:
+            if self._closed:
+                raise JS2PyException("The executor is closed.")
+            
+            future = Future()
+            
+            if key is not None and (callers := self._inflight.get(key)) is not None:
+                self._coalesced += 1
+                callers.append(future)
+                return future
+            
+            callers = [future]
+            self._calls += 1
+            
+            if key is not None:
+                self._inflight[key] = callers
+            
+            self._queue.put((execute, script, args, callers, key))
+        
+        return future
+
+
+class _QueuedAttribute:
+    """Runs the methods of an attribute of the wrapped executor through the queue"""
+    
+    __slots__ = ("_attr", "_queued")
+    
+    def __init__(self, queued, attr):
+        self._queued = queued
+        self._attr = attr
+    
+    def __call__(self, *args, **kwargs):
+        return _queued(self._queued, self._queued._call(self._attr, *args, **kwargs))
+    
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        
+        return _queued(self._queued, self._queued._call(getattr, self._attr, name))
+    
+    def __repr__(self):
+        return jio_repr(_QueuedAttribute, self._attr)
+
+
+def _queued(queued, attr):
+    return attr if isinstance(attr, _PLAIN) else _QueuedAttribute(queued, attr)
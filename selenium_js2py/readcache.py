@@ -0,0 +1,235 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from ._algae import jio_repr
+from .cache import _argkey
+from .javascript import _READONLY, JavaScriptExecutor
+from .queued import _MEMBER
+
+__all__ = [
+    "ReadCacheExecutor"
+]
+
+_INVALIDATING = frozenset(("back", "close", "execute_many", "forward", "get", "refresh", "switch_to"))
+
+_DOCUMENT = """return window.__js2py_doc || null"""
+
+_MARKDOCUMENT = """let __js2py_doc = window.__js2py_doc ||
+    (window.__js2py_doc = Math.random().toString(36).slice(2) + Date.now().toString(36));
+return [__js2py_doc, (() => {
+"""
+
+
+def _marked(script: str):
+    """Whether a script is marked read-only, e.g. the introspection scripts of `JavaScriptObject`"""
+    return script.startswith(_READONLY)
+
+
+class ReadCacheExecutor(JavaScriptExecutor):
+    """Wraps an executor, caching the results of read-only scripts
+        
+        
+        Results are keyed by the script and its serialized arguments and
+        kept in a least-recently-used cache of `maxsize` results, each for at
+        most `ttl` seconds. Scripts are read-only when run with
+        `execute_readonly` or when the `readonly` predicate accepts them, by
+        default the scripts marked read-only by `JavaScriptObject` (its
+        introspection scripts). Plain member reads (e.g. `return app.state`)
+        are only cached with `memberreads`.
+        
+        The cache is cleared by any other script (e.g. `JavaScriptObject.set`,
+        `JavaScriptObject.new` or calls of wrapped functions), by navigation
+        through the wrapped driver (`get`, `back`, `forward`, `refresh`,
+        `switch_to`) and by `invalidate`. Changes the page makes by itself
+        are only seen once the `ttl` expires.
+        
+        Navigations that do not go through the wrapper (links, redirects,
+        scripts of the page) are detected with a random marker stored in the
+        document by every uncached read. A cached result is only served
+        while the marker was seen within the last `navcheck` seconds,
+        otherwise the marker is read first and the cache is cleared if the
+        document changed.
+        
+        e.g. `JavaScriptObjectFactory(ReadCacheExecutor(driver))` shares the
+        cache between every object of the factory.
+    """
+    
+    def __init__(self,
+                 jsexec,
+                 maxsize: int = 1024,
+                 ttl: float = 5.0,
+                 readonly: Callable[[str], bool] = _marked,
+                 memberreads: bool = False,
+                 navcheck: float = 1.0):
+        """Wraps the executor
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` or `WebDriver` to run scripts
+            
+            maxsize: The maximum number of cached results
+            
+            ttl: The number of seconds a result is served, `None` serves it until invalidated
+            
+            readonly: A predicate of the scripts that are read-only, `None` marks none
+            
+            memberreads: Whether plain member reads are read-only as well
+            
+            navcheck: The number of seconds a cached result is served without checking the
+                document for a navigation, `None` never checks
+        """
+        self._jsexec = jsexec
+        self._maxsize = max(int(maxsize), 0)
+        self._ttl = ttl
+        self._readonly = readonly
+        self._memberreads = memberreads
+        self._navcheck = navcheck
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._generation = 0
+        self._document = None
+        self._seen = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+    
+    def __getattr__(self, name):
+        attr = getattr(self._jsexec, name)
+        
+        if name in _INVALIDATING:
+            self.invalidate()
+        
+        return attr
+    
+    def __len__(self):
+        return len(self._results)
+    
+    def __repr__(self):
+        return jio_repr(ReadCacheExecutor, self._jsexec)
+    
+    @property
+    def javascript_executor(self):
+        """The wrapped executor"""
+        return self._jsexec
+    
+    @property
+    def stats(self):
+        """Hits, misses, invalidations and number of cached results"""
+        with self._lock:
+            return {
+                "hits"         : self._hits,
+                "misses"       : self._misses,
+                "invalidations": self._invalidations,
+                "size"         : len(self._results)
+            }
+    
+    def execute_async_script(self, script: str, *args):
+        """Executes asynchronous JavaScript, clearing the cache
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        self.invalidate()
+        return self._jsexec.execute_async_script(script, *args)
+    
+    def execute_readonly(self, script: str, *args):
+        """Executes JavaScript that does not modify the page, serving a cached result if
+        there is one
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        key = (script, _argkey(args, {}))
+        now = time.monotonic()
+        
+        with self._lock:
+            if (entry := self._results.get(key)) is not None:
+                if entry[0] is not None and entry[0] <= now:
+                    del self._results[key]
+                    entry = None
+                elif self._current(now):
+                    self._hits += 1
+                    self._results.move_to_end(key)
+                    return entry[1]
+        
+        if entry is not None:
+            document = self._jsexec.execute_script(_DOCUMENT)
+            
+            with self._lock:
+                if self._seendocument(document) and self._results.get(key) is entry:
+                    self._hits += 1
+                    self._results.move_to_end(key)
+                    return entry[1]
+        
+        with self._lock:
+            self._misses += 1
+            generation = self._generation
+        
+        document, res = self._jsexec.execute_script(f"{_MARKDOCUMENT}{script}\n}})()];", *args)
+        expires = None if self._ttl is None else time.monotonic() + self._ttl
+        
+        with self._lock:
+            if not self._seendocument(document):
+                generation = self._generation
+            
+            if self._maxsize and generation == self._generation:
+                self._results[key] = expires, res
+                self._results.move_to_end(key)
+                
+                while len(self._results) > self._maxsize:
+                    self._results.popitem(last=False)
+        
+        return res
+    
+    def execute_script(self, script: str, *args):
+        """Executes JavaScript, serving read-only scripts from the cache and clearing it
+        for any other script
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        if self._readonly is not None and (
+                self._readonly(script) or self._memberreads and _MEMBER.fullmatch(script)):
+            return self.execute_readonly(script, *args)
+        
+        self.invalidate()
+        
+        try:
+            return self._jsexec.execute_script(script, *args)
+        finally:
+            with self._lock:
+                self._generation += 1
+    
+    def invalidate(self):
+        """Clears the cache"""
+        with self._lock:
+            self._results.clear()
+            self._generation += 1
+            self._invalidations += 1
+    
+    def _current(self, now):
+        if self._navcheck is None:
+            return True
+        
+        return self._seen is not None and now - self._seen < self._navcheck
+    
+    def _seendocument(self, document):
+        self._seen = time.monotonic()
+        
+        if document == self._document:
+            return True
+        
+        if self._document is not None:
+            self._results.clear()
+            self._generation += 1
+            self._invalidations += 1
+        
+        self._document = document
+        return False
@@ -0,0 +1,270 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from ._algae import jio_repr
+from .javascript import JS2PyException, JavaScriptExecutor
+
+__all__ = [
+    "RecordingExecutor",
+    "ReplayExecutor"
+]
+
+_ELEMENT = "element-6066-11e4-a52e-4f735466cecf"
+
+
+def _encode(value):
+    if isinstance(value, Element):
+        return {_ELEMENT: value.id}
+    elif isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    elif isinstance(value, dict):
+        return {key: _encode(val) for key, val in value.items()}
+    elif value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    
+    return repr(value)
+
+
+def _decode(value, parent):
+    if isinstance(value, list):
+        return [_decode(item, parent) for item in value]
+    elif isinstance(value, dict):
+        if _ELEMENT in value:
+            return parent.create_web_element(value[_ELEMENT])
+        
+        return {key: _decode(val, parent) for key, val in value.items()}
+    
+    return value
+
+
+class RecordingExecutor(JavaScriptExecutor):
+    """Wraps an executor, appending every script, its arguments, its result and its latency
+    to a file
+        
+        
+        The file has one JSON record per line, scripts are written once and
+        then referred to by their index, `WebElement`s are written as their
+        id. Records are appended as scripts complete, a recording can be
+        extended by later sessions. See `ReplayExecutor`.
+    """
+    
+    def __init__(self, jsexec, path: str):
+        """Wraps the executor and opens the file for appending
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` or `WebDriver` to run scripts
+            
+            path: The path of the recording
+        """
+        self._jsexec = jsexec
+        self._path = path
+        self._lock = threading.Lock()
+        self._scripts = {}
+        self._records = 0
+        
+        for record in _read(path):
+            if "d" in record:
+                self._scripts[record["script"]] = record["d"]
+        
+        self._fp = open(path, "a", encoding="utf-8")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._jsexec, name)
+    
+    def __repr__(self):
+        return jio_repr(RecordingExecutor, self._path)
+    
+    @property
+    def javascript_executor(self):
+        """The wrapped executor"""
+        return self._jsexec
+    
+    @property
+    def records(self):
+        """The number of scripts recorded by the executor"""
+        return self._records
+    
+    def close(self):
+        """Closes the file"""
+        with self._lock:
+            self._fp.close()
+    
+    def execute_async_script(self, script: str, *args):
+        """Executes and records asynchronous JavaScript
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self._record(self._jsexec.execute_async_script, script, args, True)
+    
+    def execute_script(self, script: str, *args):
+        """Executes and records JavaScript
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self._record(self._jsexec.execute_script, script, args, False)
+    
+    def _record(self, execute, script, args, isasync):
+        start = time.perf_counter()
+        
+        try:
+            res = execute(script, *args)
+        except Exception as exc:
+            self._write(script, {"e": f"{type(exc).__name__}: {exc}"}, start, args, isasync)
+            raise
+        
+        self._write(script, {"r": _encode(res)}, start, args, isasync)
+        return res
+    
+    def _write(self, script, record, start, args, isasync):
+        record["t"] = round(time.perf_counter() - start, 6)
+        record["a"] = _encode(args)
+        
+        if isasync:
+            record["async"] = True
+        
+        with self._lock:
+            if (index := self._scripts.get(script)) is None:
+                index = self._scripts[script] = len(self._scripts)
+                definition = {"d": index, "script": script}
+                self._fp.write(json.dumps(definition, separators=(",", ":")) + "\n")
+            
+            record["s"] = index
+            self._fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._fp.flush()
+            self._records += 1
+
+
+class ReplayExecutor(JavaScriptExecutor):
+    """Serves the results of a recording without a browser
+        
+        
+        Results are served in the order they were recorded and every script
+        must match the recorded one (`ordered`), or by script and arguments in
+        any order, each recorded result being served once. Recorded errors
+        are raised as `JS2PyException`s and recorded `WebElement`s have the
+        executor as their parent.
+        
+        With `latency`, the recorded latency of each script, multiplied by
+        `latency`, is slept before serving its result.
+    """
+    
+    def __init__(self, path: str, ordered: bool = True, latency: float = 0.0):
+        """Loads the recording
+        
+        Parameters:
+            path: The path of the recording
+            
+            ordered: Whether scripts must be run in the recorded order
+            
+            latency: The factor of the recorded latencies to replay, `0` serves results at once
+        """
+        scripts = {}
+        self._path = path
+        self._ordered = ordered
+        self._latency = latency
+        self._records = deque()
+        self._keyed = defaultdict(deque)
+        self._calls = 0
+        self._recorded = 0.0
+        
+        for record in _read(path):
+            if "d" in record:
+                scripts[record["d"]] = record["script"]
+            else:
+                record["s"] = scripts[record["s"]]
+                
+                if ordered:
+                    self._records.append(record)
+                else:
+                    self._keyed[self._key(record["s"], record["a"])].append(record)
+    
+    def __repr__(self):
+        return jio_repr(ReplayExecutor, self._path)
+    
+    @property
+    def remaining(self):
+        """The number of recorded results not served yet"""
+        return len(self._records) + sum(len(records) for records in self._keyed.values())
+    
+    @property
+    def stats(self):
+        """The number of scripts served and the sum of their recorded latencies in seconds"""
+        return {"calls": self._calls, "recorded": self._recorded, "remaining": self.remaining}
+    
+    def create_web_element(self, element_id: str):
+        """Creates a `WebElement` whose parent is the executor"""
+        return Element(self, element_id)
+    
+    def execute_async_script(self, script: str, *args):
+        """Serves the recorded result of asynchronous JavaScript"""
+        return self._serve(script, args)
+    
+    def execute_script(self, script: str, *args):
+        """Serves the recorded result of JavaScript
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        
+        Raises:
+            JS2PyException: The script was not recorded (at this point)
+        """
+        return self._serve(script, args)
+    
+    @staticmethod
+    def _key(script, args):
+        return script, json.dumps(args, sort_keys=True)
+    
+    def _serve(self, script, args):
+        if self._ordered:
+            if not self._records:
+                raise JS2PyException("The recording is exhausted.")
+            elif (record := self._records[0])["s"] != script:
+                raise JS2PyException(
+                    f"Script {self._calls} diverges from the recording, expected:\n{record['s']}")
+            
+            self._records.popleft()
+        elif records := self._keyed.get(self._key(script, _encode(args))):
+            record = records.popleft()
+        else:
+            raise JS2PyException(f"Script was not recorded:\n{script}")
+        
+        self._calls += 1
+        self._recorded += record["t"]
+        
+        if self._latency:
+            time.sleep(record["t"] * self._latency)
+        
+        if "e" in record:
+            raise JS2PyException(record["e"])
+        
+        return _decode(record["r"], self)
+
+
+def _read(path):
+    try:
+        with open(path, "r", encoding="utf-8") as fp:
+            for line in fp:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
@@ -0,0 +1,81 @@
+import textwrap
+
+__all__ = [
+    "RUNTIME_VERSION",
+    "installruntime"
+]
+
+RUNTIME_VERSION = 1
+
+_RUNTIME = textwrap.dedent(f"""
+window.__js2py = {{
+    v: {RUNTIME_VERSION},
+    names(o, all) {{
+        if (!all) return Object.getOwnPropertyNames(o);
+        let props = new Set();
+        do {{
+            Object.getOwnPropertyNames(o).forEach(p => props.add(p));
+        }} while ((o = Object.getPrototypeOf(o)));
+        return [...props];
+    }},
+    walk(o, all, kind) {{
+        let names = this.names(o, all);
+        if (!kind) return names;
+        return names.filter(p => {{
+            try {{
+                return (typeof(o[p]) === "function") === (kind === "f");
+            }} catch (e) {{
+                return kind !== "f";
+            }}
+        }});
+    }},
+    describe(f) {{
+        let v;
+        try {{
+            v = f();
+        }} catch (e) {{
+            if (e instanceof ReferenceError) return ["undefined", null];
+            throw e;
+        }}
+        let t = typeof(v);
+        return [t, t === "function" ? v.length : null];
+    }},
+    shape(o) {{
+        return this.names(o, true).map(p => {{
+            try {{
+                let t = typeof(o[p]);
+                return [p, t, t === "function" ? o[p].length : null];
+            }} catch (e) {{
+                return [p, "undefined", null];
+            }}
+        }});
+    }}
+}};
+""").strip("\n")
+
+
+def installruntime(jsexec):
+    """Installs the runtime of helpers in the current document of the executor
+        
+        
+        The runtime is installed automatically by objects using the `runtime`
+        invoke option, the first time it is missing from the document, e.g.
+        after a navigation.
+    
+    Parameters:
+        jsexec: The `JavaScriptExecutor` to run scripts
+    """
+    jsexec.execute_script(_RUNTIME)
+
+
+def _runtimeexec(execute, stmt, jsexec):
+    """Runs `stmt`, a call to a helper returning an `Array`, through `execute`, installing
+    the runtime and retrying if it is missing
+    """
+    guarded = f"""(window.__js2py?.v === {RUNTIME_VERSION} ? {stmt} : 0)"""
+    
+    if (res := execute(guarded)) == 0:
+        installruntime(jsexec)
+        res = execute(guarded)
+    
+    return res
@@ -0,0 +1,197 @@
+import threading
+import weakref
+from itertools import count
+
+from ._algae import jio_repr, noneoremptystr, setupargs
+from .javascript import InvalidJavaScriptAttribute, JS2PyException, JavaScriptObject, _resolveargs
+
+__all__ = [
+    "ObjectScope"
+]
+
+_SCOPES = count()
+
+_RELEASE = """let ns = window.__js2py_objs || (window.__js2py_objs = {});
+for (let key of arguments[0]) delete ns[key];"""
+
+_HEAP = """let m = window.performance && performance.memory;
+return [m ? [m.usedJSHeapSize, m.totalJSHeapSize, m.jsHeapSizeLimit] : null,
+    Object.keys(window.__js2py_objs || {}).length];"""
+
+
+class ObjectScope:
+    """Creates JavaScript objects in a private namespace of the page and deletes them
+    when they are no longer used
+        
+        
+        Unlike `JavaScriptObject.new`, which assigns a global that lives as
+        long as the page, objects created by a scope are held in
+        `window.__js2py_objs` and deleted
+            
+            * When their `JavaScriptObject` is garbage-collected
+                
+                * Deletions are queued by a finalizer and sent with the next
+                  object created by the scope, or by `release`, once `batch`
+                  are pending
+            
+            * When the scope is closed (e.g. at the end of a `with` block)
+                
+                * Every object created by the scope is deleted, even if its
+                  `JavaScriptObject` is still referenced
+        
+        Copies made by `JavaScriptObject.materialize` do not keep an object
+        alive, only the `JavaScriptObject` returned by `new` does.
+        
+        e.g.
+            
+            with ObjectScope(driver) as scope:
+                fmt = scope.new("Intl.NumberFormat", "en-US")
+                fmt.format(1234.5)
+    """
+    
+    def __init__(self, jsexec, batch: int = 64, **invopts: bool):
+        """Sets up the scope
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` to run scripts
+            
+            batch: The number of pending deletions sent together
+            
+            invopts: Global invoke options of the objects:
+                {`cacheattrs`, `cachefuncs`, `cacheprops`, `overwrite`, `runtime`}
+        """
+        self._jsexec = jsexec
+        self._batch = max(int(batch), 1)
+        self._invopts = invopts
+        self._prefix = f"s{next(_SCOPES)}_"
+        self._keys = count()
+        self._lock = threading.Lock()
+        self._live = {}
+        self._pending = []
+        self._created = 0
+        self._released = 0
+        self._closed = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __len__(self):
+        return self.stats["live"]
+    
+    def __repr__(self):
+        return jio_repr(ObjectScope, self._prefix[:-1])
+    
+    @property
+    def stats(self):
+        """Objects created and released by the scope, those alive and those pending deletion"""
+        with self._lock:
+            return {
+                "created" : self._created,
+                "released": self._released,
+                "live"    : len(self._live) - len(self._pending),
+                "pending" : len(self._pending)
+            }
+    
+    def close(self):
+        """Deletes every object created by the scope"""
+        with self._lock:
+            if self._closed:
+                return
+            
+            self._closed = True
+            keys = list(self._live)
+            
+            for finalizer in self._live.values():
+                finalizer.detach()
+            
+            self._live.clear()
+            self._pending.clear()
+        
+        if keys:
+            self._jsexec.execute_script(_RELEASE, keys)
+            self._released += len(keys)
+    
+    def heap(self):
+        """The JavaScript heap of the page and the number of objects held by every scope
+        
+        Returns:
+            A `dict` of the `used`, `total` and `limit` heap sizes in bytes, `None`
+                where the browser does not report them (`performance.memory`),
+                and the number of `objects` held in the namespace
+        """
+        sizes, objects = self._jsexec.execute_script(_HEAP)
+        used, total, limit = sizes or (None, None, None)
+        return {"used": used, "total": total, "limit": limit, "objects": objects}
+    
+    def new(self, obj: str, *ctorargs, **invopts: bool):
+        """Creates a new JavaScript object held by the scope
+        
+        Parameters:
+            obj: The name of the constructor, e.g. `Map` or `Intl.NumberFormat`
+            
+            ctorargs: Arguments to be given to the constructor of the object
+            
+            invopts: Global invoke options, overriding those of the scope
+        
+        Returns:
+            A `JavaScriptObject` of the new object
+        """
+        if not ((obj := noneoremptystr(obj)) and all(p.isidentifier() for p in obj.split("."))):
+            raise InvalidJavaScriptAttribute(f"Invalid object {obj}.")
+        
+        with self._lock:
+            if self._closed:
+                raise JS2PyException("The scope is closed.")
+            
+            key = f"{self._prefix}{next(self._keys)}"
+            released = self._takepending(self._batch)
+        
+        args = ",".join(setupargs(lambda i: i + 1, 0, len(ctorargs)))
+        script = f"""{_RELEASE}\nns["{key}"] = new {obj}({args});"""
+        self._send(script, released, *_resolveargs(*ctorargs))
+        
+        jsobj = JavaScriptObject(
+            f"""window.__js2py_objs["{key}"]""",
+            self._jsexec,
+            **{**self._invopts, **invopts})
+        
+        with self._lock:
+            self._live[key] = weakref.finalize(jsobj, self._pending.append, key)
+            self._created += 1
+        
+        return jsobj
+    
+    def release(self):
+        """Deletes the objects whose `JavaScriptObject` was garbage-collected"""
+        with self._lock:
+            released = self._takepending(1)
+        
+        if released:
+            self._send(_RELEASE, released)
+        
+        return len(released)
+    
+    def _send(self, script, released, *args):
+        try:
+            self._jsexec.execute_script(script, released, *args)
+        except BaseException:
+            with self._lock:
+                self._pending.extend(released)
+            
+            raise
+        
+        with self._lock:
+            for key in released:
+                self._live.pop(key, None)
+            
+            self._released += len(released)
+    
+    def _takepending(self, threshold):
+        if len(self._pending) < threshold:
+            return []
+        
+        released, self._pending[:] = self._pending[:], []
+        return released
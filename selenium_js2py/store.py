@@ -0,0 +1,191 @@
+import json
+import os
+import textwrap
+
+from ._algae import jio_repr
+from .javascript import JS2PyException, _shapekey
+
+__all__ = [
+    "DescriptorStore"
+]
+
+STORE_FORMAT = 1
+
+
+class DescriptorStore:
+    """A versioned, on-disk store of the attribute descriptors of well-known globals
+        
+        
+        Descriptors (name, `typeof` and arity of every attribute of the object
+        and its prototype(s)) are stored per definition root (e.g. `$`,
+        `window`) and per fingerprint of the object computed in the browser
+            
+            * With a version expression for the root (e.g. `{"$": "$.fn.jquery"}`)
+                
+                * The value of the expression
+            
+            * Otherwise
+                
+                * A hash of the names, types and arities of the attributes
+        
+        `warm` checks the fingerprint in one script, when it is known the
+        stored descriptors seed the `AttributeCache` of the object instead of
+        reintrospecting it. The store is a single compact JSON file, read once
+        when the store is opened and rewritten atomically by `save`.
+        
+        Only objects that are defined by name can be stored, e.g. with
+        `jq = S(driver, attrcache=AttributeCache())`, `store.warm(jq)` replaces
+        the introspection of every jQuery function with one fingerprint check.
+    """
+    
+    def __init__(self, path: str, versions: dict = None, keep: int = 4, autosave: bool = True):
+        """Opens the store, an unreadable store or one of another format is treated as empty
+        
+        Parameters:
+            path: The path of the file
+            
+            versions: Optional JavaScript expressions of the version of a root, keyed by root
+            
+            keep: The number of fingerprints kept per root, the oldest are discarded first
+            
+            autosave: Whether to save the store when descriptors are added
+        """
+        self._path = path
+        self._versions = dict(versions or {})
+        self._keep = max(int(keep), 1)
+        self._autosave = autosave
+        self._entries = {}
+        self._hits = 0
+        self._misses = 0
+        
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return
+        
+        if isinstance(data, dict) and data.get("format") == STORE_FORMAT:
+            self._entries = data.get("entries", {})
+    
+    def __contains__(self, root):
+        return root in self._entries
+    
+    def __len__(self):
+        return sum(len(fingerprints) for fingerprints in self._entries.values())
+    
+    def __repr__(self):
+        return jio_repr(DescriptorStore, self._path)
+    
+    @property
+    def path(self):
+        """The path of the file"""
+        return self._path
+    
+    @property
+    def stats(self):
+        """Hits and misses of `warm`, and the number of stored fingerprints"""
+        return {"hits": self._hits, "misses": self._misses, "size": len(self)}
+    
+    def descriptors(self, root: str, fingerprint: str):
+        """The stored `(name, typeof, arity)` descriptors or `None`"""
+        if (descriptors := self._entries.get(root, {}).get(fingerprint)) is not None:
+            return [tuple(descriptor) for descriptor in descriptors]
+    
+    def discard(self, root: str = None):
+        """Removes the descriptors of a root, or of every root if `root` is `None`"""
+        if root is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(root, None)
+    
+    def fingerprint(self, jsobj):
+        """Computes the fingerprint of a `JavaScriptObject` in the browser
+        
+        Parameters:
+            jsobj: A `JavaScriptObject` defined by name
+        """
+        jsdef, passobj = jsobj._define()
+        
+        if (version := self._versions.get(jsobj.definition_root)) is not None:
+            return "v:" + str(jsobj._exec(f"""String({version})""", passobj))
+        
+        stmt = textwrap.dedent(f"""
+        (() => {{
+            let root = {jsdef}, props = new Set(), current = root, h = 0x811c9dc5;
+            
+            do {{
+                Object.getOwnPropertyNames(current).forEach(p => props.add(p));
+            }} while ((current = Object.getPrototypeOf(current)));
+            
+            for (let p of [...props].sort()) {{
+                let d;
+                try {{
+                    let t = typeof(root[p]);
+                    d = `${{p}}:${{t}}:${{t === "function" ? root[p].length : ""}};`;
+                }} catch (e) {{
+                    d = `${{p}}:undefined:;`;
+                }}
+                for (let i = 0; i < d.length; i++) h = Math.imul(h ^ d.charCodeAt(i), 0x01000193) >>> 0;
+            }}
+            
+            return `h:${{props.size}}:${{h.toString(16)}}`;
+        }})()
+        """).strip("\n")
+        
+        return jsobj._exec(stmt, passobj)
+    
+    def materialize(self, jsobj):
+        """Materializes a `JavaScriptObject` from its stored descriptors, see `warm`
+        
+        e.g. `jq = store.materialize(S(driver))`
+        """
+        return jsobj.materialize(shape=self.warm(jsobj))
+    
+    def save(self):
+        """Writes the store to its file"""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        tmp = f"{self._path}.{os.getpid()}.tmp"
+        
+        os.makedirs(directory, exist_ok=True)
+        
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump({"format": STORE_FORMAT, "entries": self._entries}, fp, separators=(",", ":"))
+        
+        os.replace(tmp, self._path)
+    
+    def warm(self, jsobj):
+        """Seeds the descriptors of a `JavaScriptObject` from the store, introspecting and
+        storing them if its fingerprint is unknown
+        
+        Parameters:
+            jsobj: A `JavaScriptObject` defined by name
+        
+        Returns:
+            The shape of the object, as returned by `JavaScriptObject.shape`
+        """
+        if (root := jsobj._namedroot()) is None:
+            raise JS2PyException(f"Only objects defined by name can be stored, not {jsobj}.")
+        
+        fingerprint = self.fingerprint(jsobj)
+        
+        if (descriptors := self.descriptors(root, fingerprint)) is not None:
+            self._hits += 1
+            
+            if (attrcache := jsobj.attribute_cache) is not None:
+                for name, type_, arity in descriptors:
+                    attrcache.setdescriptor(root, name, (type_, arity))
+            
+            return _shapekey(descriptors)
+        
+        self._misses += 1
+        descriptors = jsobj.descriptors()
+        fingerprints = self._entries.setdefault(root, {})
+        fingerprints[fingerprint] = [list(descriptor) for descriptor in descriptors]
+        
+        while len(fingerprints) > self._keep:
+            del fingerprints[next(iter(fingerprints))]
+        
+        if self._autosave:
+            self.save()
+        
+        return _shapekey(descriptors)
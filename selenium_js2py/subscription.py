@@ -0,0 +1,264 @@
+import json
+import textwrap
+from typing import Iterable
+
+from ._algae import jio_repr
+from .javascript import JS2PyException
+
+__all__ = [
+    "Subscription",
+    "drainall"
+]
+
+_HUB = textwrap.dedent("""
+let hub = window.__js2py_subs || (window.__js2py_subs = {
+    seq: 0,
+    subs: {},
+    create(cap) {
+        let s = {buf: new Array(cap), head: 0, len: 0, cap: cap, dropped: 0, waiter: null, undo: []};
+        s.push = e => {
+            e.time = Date.now();
+            s.buf[(s.head + s.len) % s.cap] = e;
+            if (s.len < s.cap) s.len++;
+            else { s.head = (s.head + 1) % s.cap; s.dropped++; }
+            if (s.waiter) { let w = s.waiter; s.waiter = null; w(); }
+        };
+        s.take = () => {
+            let out = [];
+            for (let i = 0; i < s.len; i++) {
+                out.push(s.buf[(s.head + i) % s.cap]);
+                s.buf[(s.head + i) % s.cap] = undefined;
+            }
+            let dropped = s.dropped;
+            s.head = s.len = s.dropped = 0;
+            return [out, dropped];
+        };
+        let id = ++this.seq;
+        this.subs[id] = s;
+        return [id, s];
+    },
+    close(id) {
+        let s = this.subs[id];
+        if (s) { s.undo.forEach(u => u()); delete this.subs[id]; }
+    }
+});
+""").strip("\n")
+
+
+class Subscription:
+    """Change events buffered in the browser by a watcher installed in the page
+        
+        
+        Events are kept in a browser-side ring buffer of `capacity` events, the
+        oldest events are dropped when it is full. `drain` transfers every
+        buffered event in one call, `poll` waits in the browser for the next
+        event. Subscriptions are lost when the page is unloaded.
+        
+        See `JavaScriptObject.subscribe` and `JQueryResponse.subscribe`.
+    """
+    
+    __slots__ = ("_active", "_dropped", "_id", "_jsexec", "_watched")
+    
+    def __init__(self, jsexec, subid: int, watched: list):
+        self._jsexec = jsexec
+        self._id = subid
+        self._watched = watched
+        self._dropped = 0
+        self._active = True
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __repr__(self):
+        return jio_repr(Subscription, self._id)
+    
+    @property
+    def active(self):
+        """Whether the watcher is still installed in the page"""
+        return self._active
+    
+    @property
+    def dropped(self):
+        """The number of events dropped because the buffer was full"""
+        return self._dropped
+    
+    @property
+    def watched(self):
+        """What is watched, property names or the number of observed elements"""
+        return self._watched
+    
+    def close(self):
+        """Removes the watcher from the page"""
+        if self._active:
+            self._active = False
+            self._jsexec.execute_script(
+                "if (window.__js2py_subs) window.__js2py_subs.close(arguments[0])", self._id)
+    
+    def drain(self):
+        """Transfers and clears the buffered events
+        
+        Returns:
+            A `list` of events in the order they occurred
+        """
+        return drainall([self])[0]
+    
+    def poll(self, timeout: float = 10.0):
+        """Waits in the browser for events, returning as soon as there is at least one
+        
+        The executor must support `execute_async_script` and its script timeout
+        must be longer than `timeout`.
+        
+        Parameters:
+            timeout: Seconds to wait for an event
+        
+        Returns:
+            A `list` of events, empty if none occurred in time
+        """
+        if not hasattr(self._jsexec, "execute_async_script"):
+            raise JS2PyException("Polling requires `execute_async_script`.")
+        elif not self._active:
+            return []
+        
+        stmt = textwrap.dedent("""
+        let done = arguments[arguments.length - 1];
+        let s = window.__js2py_subs && window.__js2py_subs.subs[arguments[0]];
+        if (!s) done(null);
+        else if (s.len) done(s.take());
+        else {
+            let t = setTimeout(() => { s.waiter = null; done(s.take()); }, arguments[1]);
+            s.waiter = () => { clearTimeout(t); done(s.take()); };
+        }
+        """).strip("\n")
+        
+        return self._collect(
+            self._jsexec.execute_async_script(stmt, self._id, int(timeout * 1000)))
+    
+    def _collect(self, res):
+        if res is None:
+            self._active = False
+            return []
+        
+        events, dropped = res
+        self._dropped += dropped
+        return events
+
+
+def drainall(subscriptions: Iterable[Subscription]):
+    """Drains many subscriptions of the same executor in one call
+    
+    Parameters:
+        subscriptions: The subscriptions
+    
+    Returns:
+        A `list` of events per subscription
+    """
+    subscriptions = list(subscriptions)
+    
+    if not subscriptions:
+        return []
+    
+    active = [sub for sub in subscriptions if sub.active]
+    results = {}
+    
+    if active:
+        res = active[0]._jsexec.execute_script(
+            "let hub = window.__js2py_subs;"
+            "return arguments[0].map(id => hub && hub.subs[id] ? hub.subs[id].take() : null)",
+            [sub._id for sub in active])
+        
+        results = {id(sub): sub._collect(events) for sub, events in zip(active, res)}
+    
+    return [results.get(id(sub), []) for sub in subscriptions]
+
+
+def _subscribe(jsexec, stmt: str, *args, capacity: int = 1024):
+    """Installs a watcher, `stmt` is run with `sub` (the subscription) and `capacity` in scope
+    and returns what is watched
+    """
+    script = textwrap.dedent(f"""
+    {_HUB}
+    let [id, sub] = hub.create({max(int(capacity), 1)});
+    let watched = (() => {{
+    {stmt}
+    }})();
+    return [id, watched];
+    """)
+    
+    subid, watched = jsexec.execute_script(script, *args)
+    return Subscription(jsexec, subid, watched)
+
+
+def _propertywatcher(jsdef: str, names: Iterable[str] = None):
+    """The statement watching the properties `names` (all own, non-function properties if
+    `None`) of `jsdef`
+    """
+    names = "null" if names is None else json.dumps(list(names))
+    
+    return textwrap.dedent(f"""
+    let obj = {jsdef};
+    let names = {names} || Object.getOwnPropertyNames(obj).filter(p => {{
+        try {{ return typeof(obj[p]) !== "function"; }} catch (e) {{ return false; }}
+    }});
+    let watched = [];
+    for (let name of names) {{
+        let desc = Object.getOwnPropertyDescriptor(obj, name);
+        if (desc && !desc.configurable) continue;
+        let get, set;
+        if (desc && (desc.get || desc.set)) {{
+            get = function () {{ return desc.get ? desc.get.call(this) : undefined; }};
+            set = function (v) {{
+                let old = get.call(this);
+                if (desc.set) desc.set.call(this, v);
+                let value = get.call(this);
+                if (value !== old) sub.push({{name: name, value: value, oldValue: old}});
+            }};
+        }} else {{
+            let value = desc ? desc.value : undefined;
+            get = () => value;
+            set = v => {{
+                if (v !== value) {{
+                    let old = value;
+                    value = v;
+                    sub.push({{name: name, value: v, oldValue: old}});
+                }}
+            }};
+        }}
+        Object.defineProperty(obj, name, {{
+            get: get, set: set, configurable: true,
+            enumerable: desc ? desc.enumerable : true
+        }});
+        sub.undo.push(() => {{
+            if (desc && (desc.get || desc.set)) Object.defineProperty(obj, name, desc);
+            else if (desc) Object.defineProperty(obj, name, {{...desc, value: get()}});
+            else {{ let v = get(); delete obj[name]; if (v !== undefined) obj[name] = v; }}
+        }});
+        watched.push(name);
+    }}
+    return watched;
+    """).strip("\n")
+
+
+def _mutationwatcher(elements: str, options: dict):
+    """The statement observing the mutations of `elements` (a JavaScript expression of a list of
+    elements) with `MutationObserver` options `options`
+    """
+    return textwrap.dedent(f"""
+    let elements = [].concat({elements});
+    let element = n => n && n.nodeType === 1 ? n : (n ? n.parentElement : null);
+    let observer = new MutationObserver(records => records.forEach(r => sub.push({{
+        type: r.type,
+        target: element(r.target),
+        name: r.attributeName,
+        oldValue: r.oldValue,
+        value: r.type === "attributes" ? r.target.getAttribute(r.attributeName)
+             : r.type === "characterData" ? r.target.data : null,
+        added: r.addedNodes.length,
+        removed: r.removedNodes.length
+    }})));
+    elements.forEach(e => observer.observe(e, {json.dumps(options)}));
+    sub.undo.push(() => observer.disconnect());
+    return elements.length;
+    """).strip("\n")
@@ -0,0 +1,252 @@
+import base64
+import json
+from itertools import count, islice
+
+from ._algae import jio_repr
+from .javascript import JavaScriptExecutor
+
+__all__ = [
+    "Chunked",
+    "ChunkedExecutor"
+]
+
+_TOKENS = count()
+
+_PUSH = """let u = window.__js2py_uploads || (window.__js2py_uploads = {});
+(u[arguments[0]] || (u[arguments[0]] = []))[arguments[1]] = arguments[2]"""
+
+_TAKE = """let __js2py_bytes = b64 => {
+    let bin = atob(b64), buf = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; i++) buf[i] = bin.charCodeAt(i);
+    return buf;
+};
+let __js2py_take = (t, kind) => {
+    let u = window.__js2py_uploads, data = u[t].join("");
+    delete u[t];
+    return kind === "b" ? __js2py_bytes(data) : kind === "j" ? JSON.parse(data) : data;
+};"""
+
+
+class Chunked:
+    """Marks an argument to be uploaded in chunks whatever its size
+    
+    Parameters:
+        value: A `str`, `bytes`-like object or JSON serializable value
+    """
+    
+    __slots__ = ("value",)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __repr__(self):
+        return jio_repr(Chunked, type(self.value).__name__)
+
+
+class ChunkedExecutor(JavaScriptExecutor):
+    """Wraps an executor, uploading large arguments to a buffer in the browser in bounded
+    chunks before the script that uses them
+        
+        
+        Arguments whose serialized size exceeds `threshold` (and arguments
+        wrapped in `Chunked`) are sent as chunks of at most `chunksize`
+        characters, assembled in the browser and bound in place of the
+        original argument, so no single request carries the whole value
+            
+            * `str`
+                
+                * Bound as a string
+            
+            * `bytes`, `bytearray`, `memoryview`
+                
+                * Sent as base64, bound as a `Uint8Array` (also below `threshold`)
+            
+            * `list`, `tuple`, `dict`
+                
+                * Sent as JSON, bound as the parsed value, values holding
+                    `WebElement`s cannot be chunked and are sent as usual
+                
+                * Small values are only walked, not serialized, to tell
+                    that they are below `threshold`
+        
+        Every script goes through the wrapped executor, e.g. `set`, `new` and
+        wrapped functions of objects created with this executor. Chunks are
+        sliced as they are sent and pipelined `window` at a time when the
+        wrapped executor supports `execute_many` (see `CDPExecutor` and
+        `GridExecutor`), so at most `window` chunks are held at once.
+    """
+    
+    def __init__(self,
+                 jsexec,
+                 threshold: int = 1 << 20,
+                 chunksize: int = 256 << 10,
+                 window: int = 8):
+        """Wraps the executor
+        
+        Parameters:
+            jsexec: The `JavaScriptExecutor` or `WebDriver` to run scripts
+            
+            threshold: The serialized size in characters above which an argument is chunked
+            
+            chunksize: The maximum size in characters of a chunk
+            
+            window: The maximum number of chunks in flight with `execute_many`
+        """
+        self._jsexec = jsexec
+        self._threshold = threshold
+        self._chunksize = max(int(chunksize), 1)
+        self._window = max(int(window), 1)
+        self._uploads = 0
+        self._chunks = 0
+    
+    def __getattr__(self, name):
+        return getattr(self._jsexec, name)
+    
+    def __repr__(self):
+        return jio_repr(ChunkedExecutor, self._jsexec)
+    
+    @property
+    def javascript_executor(self):
+        """The wrapped executor"""
+        return self._jsexec
+    
+    @property
+    def stats(self):
+        """The number of chunked arguments and of chunks sent"""
+        return {"uploads": self._uploads, "chunks": self._chunks}
+    
+    def execute_async_script(self, script: str, *args):
+        """Executes asynchronous JavaScript, uploading large arguments first
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self._jsexec.execute_async_script(*self._prepare(script, args))
+    
+    def execute_script(self, script: str, *args):
+        """Executes JavaScript, uploading large arguments first
+        
+        Parameters:
+            script: The JavaScript to execute
+            
+            args: Any applicable args to the `script`
+        """
+        return self._jsexec.execute_script(*self._prepare(script, args))
+    
+    def upload(self, value):
+        """Uploads a value to the browser buffer in chunks
+        
+        Parameters:
+            value: A `str`, `bytes`-like object or JSON serializable value
+        
+        Returns:
+            The `(token, kind)` of the buffer, consumed by the first script binding it
+        """
+        kind, data = self._serialize(value)
+        
+        if data is None:
+            raise TypeError(f"{type(value).__name__} cannot be uploaded.")
+        
+        return self._upload(kind, data)
+    
+    def _prepare(self, script, args):
+        bindings = []
+        args = list(args)
+        
+        for i, arg in enumerate(args):
+            if isinstance(arg, Chunked):
+                kind, data = self._serialize(arg.value)
+                
+                if data is None:
+                    args[i] = arg.value
+                    continue
+            elif isinstance(arg, (bytes, bytearray, memoryview)):
+                kind, data = self._serialize(arg)
+                
+                if len(data) <= self._threshold:
+                    args[i] = data
+                    bindings.append(f"""arguments[{i}] = __js2py_bytes(arguments[{i}]);""")
+                    continue
+            elif isinstance(arg, (str, list, tuple, dict)):
+                if isinstance(arg, str) and len(arg) <= self._threshold:
+                    continue
+                elif not isinstance(arg, str) and self._estimate(arg) <= self._threshold:
+                    continue
+                
+                kind, data = self._serialize(arg)
+                
+                if data is None or len(data) <= self._threshold:
+                    continue
+            else:
+                continue
+            
+            token, kind = self._upload(kind, data)
+            args[i] = None
+            bindings.append(f"""arguments[{i}] = __js2py_take("{token}", "{kind}");""")
+        
+        if bindings:
+            script = "\n".join((_TAKE, *bindings, script))
+        
+        return (script, *args)
+    
+    def _upload(self, kind, data):
+        token = f"u{next(_TOKENS)}"
+        size = self._chunksize
+        chunks = ((_PUSH, token, i, data[start:start + size])
+                  for i, start in enumerate(range(0, max(len(data), 1), size)))
+        
+        if hasattr(self._jsexec, "execute_many"):
+            while batch := list(islice(chunks, self._window)):
+                self._jsexec.execute_many(batch)
+                self._chunks += len(batch)
+        else:
+            for chunk in chunks:
+                self._jsexec.execute_script(*chunk)
+                self._chunks += 1
+        
+        self._uploads += 1
+        return token, kind
+    
+    def _estimate(self, value, budget: int = 256):
+        """A lower bound of the serialized size of a value holding at most `budget` values
+        
+        
+            Values holding more are reported above `threshold` without being
+            walked, their serialization costs little next to sending them.
+        """
+        size, stack = 0, [value]
+        
+        while stack and size <= self._threshold:
+            value = stack.pop()
+            
+            if isinstance(value, str):
+                size += len(value) + 2
+                continue
+            elif not isinstance(value, (list, tuple, dict)):
+                size += 1
+                continue
+            elif (budget := budget - len(value)) < 0:
+                return self._threshold + 1
+            elif isinstance(value, dict):
+                size += len(value) * 2 + 1
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            else:
+                size += len(value) + 1
+                stack.extend(value)
+        
+        return size
+    
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, str):
+            return "s", value
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            return "b", base64.b64encode(value).decode("ascii")
+        
+        try:
+            return "j", json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return "j", None
@@ -0,0 +1,278 @@
+import base64
+import hashlib
+import json
+import queue
+import socketserver
+import threading
+
+import pytest
+
+from selenium_js2py.cdp import CDPExecutor, RemoteObject
+from selenium_js2py.javascript import JS2PyException
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class FakePage:
+    """Answers CDP messages like a page whose scripts return their body and arguments
+    
+    Responses to `Runtime.callFunctionOn` are held until `hold` of them were
+    received, then sent in reverse order.
+    """
+    
+    def __init__(self):
+        self.sent = []
+        self.context = 1
+        self.hold = 0
+        self._held = []
+        self._responses = queue.Queue()
+        self._lock = threading.Lock()
+    
+    def navigate(self, event=True):
+        with self._lock:
+            self.context += 1
+        
+        if event:
+            self._responses.put({"method": "Runtime.executionContextsCleared", "params": {}})
+    
+    def close(self):
+        self._responses.put(None)
+    
+    def recv(self):
+        if (msg := self._responses.get()) is None:
+            raise ConnectionError("closed")
+        
+        return json.dumps(msg)
+    
+    def send(self, raw):
+        msg = json.loads(raw)
+        
+        with self._lock:
+            self.sent.append(msg)
+            res = self._answer(msg["method"], msg["params"])
+            
+            if msg["method"] == "Runtime.callFunctionOn" and self.hold:
+                self._held.append((msg["id"], res))
+                
+                if len(self._held) < self.hold:
+                    return
+                
+                held, self._held, self.hold = self._held, [], 0
+            else:
+                held = [(msg["id"], res)]
+        
+        for msgid, res in reversed(held):
+            self._responses.put({"id": msgid, **res})
+    
+    def _answer(self, method, params):
+        if method == "Runtime.evaluate" and params["expression"] == "globalThis":
+            return {"result": {"result": {"type": "object", "objectId": f"global{self.context}"}}}
+        elif method == "Runtime.evaluate":
+            return {"result": {"result": {"type": "string", "value": params["expression"]}}}
+        elif method != "Runtime.callFunctionOn":
+            return {"result": {}}
+        elif params["objectId"] != f"global{self.context}":
+            return {"error": {"code": -32000, "message": "Cannot find context with specified id"}}
+        
+        body = params["functionDeclaration"][len("function() {\n"):-len("\n}")]
+        
+        if body == "throw":
+            return {"result": {
+                "result"          : {"type": "object"},
+                "exceptionDetails": {"text": "Uncaught", "exception": {"description": "Error: thrown"}}
+            }}
+        elif not params["returnByValue"]:
+            return {"result": {"result": {"type": "object", "objectId": "obj1", "description": "Object"}}}
+        
+        args = [arg.get("value", arg.get("objectId")) for arg in params["arguments"]]
+        return {"result": {"result": {"type": "object", "value": [body, args]}}}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves the `FakePage` of the server over a websocket, text frames only"""
+    
+    disable_nagle_algorithm = True
+    
+    def handle(self):
+        headers = {}
+        self.rfile.readline()
+        
+        while line := self.rfile.readline().strip():
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + _GUID).encode("ascii")).digest())
+        self.wfile.write(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        
+        page = self.server.page
+        writer = threading.Thread(target=self._write, args=(page,), daemon=True)
+        writer.start()
+        
+        while (frame := self._read()) is not None and frame[0] != 0x8:
+            if frame[0] == 0x1:
+                page.send(frame[1].decode("utf-8"))
+        
+        page.close()
+        writer.join(5)
+    
+    def _read(self):
+        if len(head := self.rfile.read(2)) < 2:
+            return None
+        
+        size = head[1] & 0x7F
+        
+        if size > 125:
+            size = int.from_bytes(self.rfile.read(2 if size == 126 else 8), "big")
+        
+        mask = self.rfile.read(4) if head[1] & 0x80 else bytes(4)
+        data = self.rfile.read(size)
+        return head[0] & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    
+    def _write(self, page):
+        try:
+            while True:
+                self._frame(0x1, page.recv().encode("utf-8"))
+        except ConnectionError:
+            pass
+        
+        try:
+            self._frame(0x8, b"")
+        except OSError:
+            pass
+    
+    def _frame(self, opcode, payload):
+        if (size := len(payload)) < 126:
+            header = bytes((0x80 | opcode, size))
+        elif size < 1 << 16:
+            header = bytes((0x80 | opcode, 126)) + size.to_bytes(2, "big")
+        else:
+            header = bytes((0x80 | opcode, 127)) + size.to_bytes(8, "big")
+        
+        self.wfile.write(header + payload)
+
+
+@pytest.fixture
+def server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.page = FakePage()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    
+    yield server
+    
+    server.page.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def page(server):
+    return server.page
+
+
+def url(server):
+    return f"ws://127.0.0.1:{server.server_address[1]}/devtools/page/1"
+
+
+@pytest.fixture
+def cdp(server):
+    with CDPExecutor(url(server), timeout=5) as cdp:
+        yield cdp
+
+
+def calls(page):
+    return [msg for msg in page.sent if msg["method"] == "Runtime.callFunctionOn"]
+
+
+def test_runtime_domain_is_enabled(cdp, page):
+    cdp.execute_script("return 1")
+    
+    assert page.sent[0]["method"] == "Runtime.enable"
+
+
+def test_scripts_run_on_the_global_object(cdp, page):
+    assert cdp.execute_script("return arguments[0]", 1, "a") == ["return arguments[0]", [1, "a"]]
+    assert cdp.execute_script("return 2") == ["return 2", []]
+    assert [msg["params"]["expression"] for msg in page.sent
+            if msg["method"] == "Runtime.evaluate"] == ["globalThis"]
+
+
+def test_pipelined_results_keep_the_order_of_the_scripts(cdp, page):
+    cdp.execute_script("warm up")
+    page.hold = 5
+    scripts = [(f"return {i}", i) for i in range(5)]
+    
+    assert cdp.execute_many(scripts) == [[f"return {i}", [i]] for i in range(5)]
+    assert [msg["params"]["functionDeclaration"] for msg in calls(page)[1:]] == [
+        f"function() {{\nreturn {i}\n}}" for i in range(5)
+    ]
+
+
+def test_submit_does_not_wait_for_previous_responses(cdp, page):
+    cdp.execute_script("warm up")
+    page.hold = 2
+    first = cdp.submit("return 1")
+    
+    assert not first.done()
+    
+    second = cdp.submit("return 2")
+    
+    assert second.result(5) == ["return 2", []]
+    assert first.result(5) == ["return 1", []]
+
+
+def test_navigation_looks_up_the_global_object_again(cdp, page):
+    cdp.execute_script("return 1")
+    page.navigate()
+    
+    assert cdp.execute_script("return 2") == ["return 2", []]
+    assert [msg["params"]["objectId"] for msg in calls(page)][-1] == "global2"
+
+
+def test_stale_context_is_retried_once(cdp, page):
+    cdp.execute_script("return 1")
+    page.navigate(event=False)
+    
+    assert cdp.execute_script("return 2") == ["return 2", []]
+    assert [msg["params"]["objectId"] for msg in calls(page)] == ["global1", "global1", "global2"]
+
+
+def test_exceptions_are_raised(cdp):
+    with pytest.raises(JS2PyException, match="Error: thrown"):
+        cdp.execute_script("throw")
+    
+    assert cdp.execute_script("return 1") == ["return 1", []]
+
+
+def test_remote_objects_are_passed_by_reference(cdp, page):
+    remote = cdp.execute_remote("return {}")
+    
+    assert isinstance(remote, RemoteObject)
+    assert cdp.execute_script("return arguments[0]", remote) == ["return arguments[0]", ["obj1"]]
+    
+    remote.release()
+    cdp.execute_script("return 1")
+    
+    assert page.sent[-2] == {
+        "id": page.sent[-2]["id"], "method": "Runtime.releaseObject", "params": {"objectId": "obj1"}
+    }
+    assert remote.objectid is None
+
+
+def test_evaluate(cdp):
+    assert cdp.evaluate("document.title") == "document.title"
+
+
+def test_close_fails_pending_scripts(server, page):
+    cdp = CDPExecutor(url(server), timeout=5)
+    cdp.execute_script("warm up")
+    page.hold = 2
+    pending = cdp.submit("return 1")
+    cdp.close()
+    
+    with pytest.raises(JS2PyException):
+        pending.result(5)
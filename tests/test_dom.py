@@ -0,0 +1,145 @@
+import gc
+
+import pytest
+
+from selenium_js2py.dom import DOMSnapshot, snapshot
+from selenium_js2py.javascript import JS2PyException, JavaScriptExecutor
+
+# [parent, tag, attrs, contents] as serialized by the browser
+_TREE = [
+    [None, "html", {}, [1]],
+    [0, "body", {}, [2, 7]],
+    [1, "ul", {"id": "list", "class": "items"}, [3, 4, 5, 6]],
+    [2, "li", {"class": "item first", "data-k": "a b", "lang": "en"}, ["one"]],
+    [2, "li", {"class": "item", "lang": "en-US", "href": "https://example.com/a.pdf"}, ["two"]],
+    [2, "li", {"class": "item", "title": ""}, []],
+    [2, "li", {"class": "item last"}, ["four ", 8]],
+    [1, "p", {"class": "note"}, ["Hello world"]],
+    [6, "span", {}, ["inner"]],
+]
+
+
+class FakeExecutor(JavaScriptExecutor):
+    """Answers the snapshot script with `_TREE` and records the scripts it runs"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def execute_script(self, script: str, *args):
+        self.calls.append((script, args))
+        return _TREE if "walk(root" in script else None
+
+
+@pytest.fixture
+def dom():
+    return DOMSnapshot(FakeExecutor(), _TREE, "token")
+
+
+def tags(nodes):
+    return [f"{node.tag}{node.index}" for node in nodes]
+
+
+def test_tree_is_built_in_document_order(dom):
+    assert len(dom) == 9
+    assert dom.root.tag == "html"
+    assert tags(dom.byid("list").children) == ["li3", "li4", "li5", "li6"]
+    assert dom.byid("list").parent.tag == "body"
+    assert dom.query("li.last")[0].textcontent == "four inner"
+    assert dom.query("li.last")[0].text == "four "
+
+
+def test_type_id_and_class_selectors(dom):
+    assert tags(dom.query("li")) == ["li3", "li4", "li5", "li6"]
+    assert tags(dom.query("#list")) == ["ul2"]
+    assert tags(dom.query(".item.first")) == ["li3"]
+    assert tags(dom.query("ul.items")) == ["ul2"]
+    assert tags(dom.query("*")) == tags(dom)
+    assert dom.query("#missing") == []
+
+
+def test_combinators(dom):
+    assert tags(dom.query("body li")) == ["li3", "li4", "li5", "li6"]
+    assert tags(dom.query("body > li")) == []
+    assert tags(dom.query("ul > li > span")) == ["span8"]
+    assert tags(dom.query("html span")) == ["span8"]
+    assert tags(dom.query(".first + li")) == ["li4"]
+    assert tags(dom.query(".first ~ li")) == ["li4", "li5", "li6"]
+    assert tags(dom.query("li ~ .first")) == []
+    assert tags(dom.query("ul + p")) == ["p7"]
+    assert tags(dom.query("p, span, ul")) == ["ul2", "p7", "span8"]
+
+
+def test_nth_child(dom):
+    assert tags(dom.query("li:nth-child(2)")) == ["li4"]
+    assert tags(dom.query("li:nth-child(odd)")) == ["li3", "li5"]
+    assert tags(dom.query("li:nth-child(even)")) == ["li4", "li6"]
+    assert tags(dom.query("li:nth-child(2n+1)")) == ["li3", "li5"]
+    assert tags(dom.query("li:nth-child(-n+2)")) == ["li3", "li4"]
+    assert tags(dom.query("li:nth-child(n+3)")) == ["li5", "li6"]
+    assert tags(dom.query("li:nth-last-child(1)")) == ["li6"]
+    assert tags(dom.query("li:first-child, li:last-child")) == ["li3", "li6"]
+    assert tags(dom.query("span:only-child")) == ["span8"]
+
+
+def test_attribute_operators(dom):
+    assert tags(dom.query("[lang]")) == ["li3", "li4"]
+    assert tags(dom.query("[lang=en]")) == ["li3"]
+    assert tags(dom.query("[data-k~=b]")) == ["li3"]
+    assert tags(dom.query("[lang|='en']")) == ["li3", "li4"]
+    assert tags(dom.query('[href^="https://"]')) == ["li4"]
+    assert tags(dom.query("[href$='.pdf']")) == ["li4"]
+    assert tags(dom.query("[href*=example]")) == ["li4"]
+    assert tags(dom.query("[title]")) == ["li5"]
+    assert tags(dom.query("[title^='']")) == []
+
+
+def test_not_empty_and_contains(dom):
+    assert tags(dom.query("li:not(.first)")) == ["li4", "li5", "li6"]
+    assert tags(dom.query("li:not(.first, .last)")) == ["li4", "li5"]
+    assert tags(dom.query("li:not([lang])")) == ["li5", "li6"]
+    assert tags(dom.query("li:empty")) == ["li5"]
+    assert tags(dom.query("li:contains(inner)")) == ["li6"]
+
+
+def test_queries_within_a_node(dom):
+    ul = dom.byid("list")
+    
+    assert tags(ul.query("span")) == ["span8"]
+    assert tags(ul.query("p")) == []
+    assert dom.queryone("li", ul).index == 3
+
+
+def test_unsupported_selectors_raise(dom):
+    with pytest.raises(JS2PyException):
+        dom.query("li:hover")
+    
+    with pytest.raises(JS2PyException):
+        dom.query("li::before")
+
+
+def test_release_and_context_manager(dom):
+    with dom:
+        pass
+    
+    assert dom._jsexec.calls[-1][1] == ("token",)
+    
+    with pytest.raises(JS2PyException, match="released"):
+        dom.root.element()
+
+
+def test_collected_snapshots_are_freed_by_the_next_one():
+    jsexec = FakeExecutor()
+    first = snapshot(jsexec)
+    token = jsexec.calls[0][1][1]
+    del first
+    gc.collect()
+    second = snapshot(jsexec)
+    
+    assert jsexec.calls[1][1][-1] == [token]
+    
+    second.release()
+    del second
+    gc.collect()
+    snapshot(jsexec)
+    
+    assert jsexec.calls[-1][1][-1] == []
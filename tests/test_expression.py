@@ -0,0 +1,89 @@
+import pytest
+
+from selenium_js2py import JavaScriptObject
+from selenium_js2py.javascript import InvalidJavaScriptAttribute, JavaScriptExecutor
+
+
+class EchoExecutor(JavaScriptExecutor):
+    """Returns the scripts it runs and their arguments"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def execute_script(self, script: str, *args):
+        self.calls.append((script, args))
+        return script, args
+
+
+@pytest.fixture
+def jsexec():
+    return EchoExecutor()
+
+
+def test_identifier_steps_are_inlined(jsexec):
+    app = JavaScriptObject("app", jsexec)
+    
+    assert app.chain().store.items[0].count.compile() == ("return app.store.items[0].count", ())
+    assert app.chain()[-1].compile() == ("return app[-1]", ())
+
+
+def test_other_steps_are_bound_as_arguments(jsexec):
+    app = JavaScriptObject("app", jsexec)
+    script, args = app.chain()["a-b"][1.5]["key"][True]["value"].compile()
+    
+    assert script == "return app[arguments[0]][arguments[1]][arguments[2]][arguments[3]][arguments[4]]"
+    assert args == ("a-b", 1.5, "key", True, "value")
+
+
+def test_calls_bind_their_arguments(jsexec):
+    app = JavaScriptObject("app", jsexec)
+    
+    assert app.chain().store.format("%d", 2)["x y"]().compile() == (
+        "return app.store.format(arguments[0], arguments[1])[arguments[2]]()", ("%d", 2, "x y"))
+    assert app.chain().now().compile() == ("return app.now()", ())
+
+
+def test_arguments_follow_the_object_arguments(jsexec):
+    app = JavaScriptObject("arguments[0].app[arguments[1]]", jsexec, "frame", lambda: "key")
+    
+    assert app.chain().find("q")["a b"].compile() == (
+        "return arguments[0].app[arguments[1]].find(arguments[2])[arguments[3]]",
+        ("frame", "key", "q", "a b"))
+
+
+def test_arguments_follow_a_passed_object(jsexec):
+    obj = {"x": 1}
+    
+    assert JavaScriptObject(obj, jsexec).chain().add(1, 2).sum.compile() == (
+        "return arguments[0].add(arguments[1], arguments[2]).sum", (obj, 1, 2))
+    assert JavaScriptObject(obj, jsexec, "extra").chain()["a b"](3).compile() == (
+        "return arguments[0][arguments[2]](arguments[3])", (obj, "extra", "a b", 3))
+
+
+def test_global_expressions_start_from_the_first_attribute(jsexec):
+    window = JavaScriptObject(None, jsexec)
+    
+    assert window.chain().document.title.compile() == ("return document.title", ())
+    assert window.chain().parseInt("7", 8).compile() == (
+        "return parseInt(arguments[0], arguments[1])", ("7", 8))
+    
+    with pytest.raises(InvalidJavaScriptAttribute):
+        window.chain()["not an identifier"].compile()
+
+
+def test_value_runs_one_script(jsexec):
+    app = JavaScriptObject("app", jsexec)
+    expr = app.chain().store["a b"].format("%d")
+    
+    assert expr.value() == expr.compile()
+    assert jsexec.calls == [expr.compile()]
+
+
+def test_expression_attributes_are_reached_by_indexing(jsexec):
+    app = JavaScriptObject("app", jsexec)
+    
+    assert app.chain()["value"].steps == (("item", "value"),)
+    assert app.chain()["value"].compile() == ("return app[arguments[0]]", ("value",))
+    
+    with pytest.raises(AttributeError):
+        app.chain()._private
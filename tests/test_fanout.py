@@ -0,0 +1,179 @@
+import threading
+
+import pytest
+
+from selenium_js2py.fanout import FanOut
+from selenium_js2py.javascript import JS2PyException, JavaScriptExecutor
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def window(self, handle):
+        self.driver.window, self.driver.path = handle, []
+        self.driver.log.append(("window", handle))
+    
+    def frame(self, frame):
+        self.driver.path.append(frame)
+        self.driver.log.append(("frame", frame))
+    
+    def parent_frame(self):
+        self.driver.path.pop()
+        self.driver.log.append(("parent",))
+    
+    def default_content(self):
+        self.driver.path = []
+        self.driver.log.append(("default",))
+
+
+class FakeDriver(JavaScriptExecutor):
+    """A session whose scripts return the current `(window, frames)`, switches are logged"""
+    
+    def __init__(self, handles, window=None, path=()):
+        self.window_handles = list(handles)
+        self.window = window or handles[0]
+        self.path = list(path)
+        self.log = []
+        self.switch_to = FakeSwitch(self)
+    
+    @property
+    def current_window_handle(self):
+        return self.window
+    
+    def execute_script(self, script: str, *args):
+        if "frames.length" in script:
+            return list(self.path)
+        
+        return self.window, tuple(self.path)
+
+
+def where(factory):
+    return factory.javascript_executor.execute_script("return location")
+
+
+def test_contexts_are_normalized_and_ordered():
+    fanout = FanOut(FakeDriver(["w1", "w2"]))
+    contexts = ["w2", ("w1", [0, 1]), ("w1", 0), ("w2", None), ("w1", [0]), "w1", ("w1", (1,))]
+    
+    assert fanout.order(contexts) == [
+        ("w2", ()), ("w1", ()), ("w1", (0,)), ("w1", (0, 1)), ("w1", (1,))
+    ]
+
+
+def test_each_window_is_switched_to_once_starting_with_the_current_one():
+    driver = FakeDriver(["w1", "w2", "w3"], window="w2")
+    fanout = FanOut(driver)
+    results = fanout.run(["w1", "w3", "w2", ("w1", 0)], where)
+    
+    assert results == {
+        ("w1", ()): ("w1", ()), ("w1", (0,)): ("w1", (0,)),
+        ("w3", ()): ("w3", ()), ("w2", ()): ("w2", ())
+    }
+    assert list(results) == [("w2", ()), ("w1", ()), ("w1", (0,)), ("w3", ())]
+    assert [entry for entry in driver.log if entry[0] == "window"] == [
+        ("window", "w1"), ("window", "w3"), ("window", "w2")
+    ]
+    assert fanout.switches == len(driver.log) == 4
+
+
+def test_sibling_frames_switch_through_their_parent():
+    driver = FakeDriver(["w1"])
+    fanout = FanOut(driver)
+    fanout.run([("w1", [0, 0]), ("w1", [0, 1]), ("w1", [0, 1, 2])], where)
+    
+    assert driver.log == [
+        ("frame", 0), ("frame", 0),
+        ("parent",), ("frame", 1),
+        ("frame", 2),
+        ("default",)
+    ]
+    assert driver.path == []
+
+
+def test_distant_frames_switch_from_the_top():
+    driver = FakeDriver(["w1"])
+    fanout = FanOut(driver)
+    fanout.run([("w1", [0, 1, 2]), ("w1", [3])], where)
+    
+    assert driver.log == [
+        ("frame", 0), ("frame", 1), ("frame", 2),
+        ("default",), ("frame", 3),
+        ("default",)
+    ]
+
+
+def test_the_original_window_and_frame_are_restored():
+    driver = FakeDriver(["w1", "w2"], path=[1, 0])
+    fanout = FanOut(driver)
+    fanout.run(["w2", ("w1", [2])], where)
+    
+    assert driver.window == "w1"
+    assert driver.path == [1, 0]
+    assert driver.log[-3:] == [("default",), ("frame", 1), ("frame", 0)]
+
+
+def test_the_original_frame_is_restored_after_an_error():
+    driver = FakeDriver(["w1", "w2"], path=[1])
+    fanout = FanOut(driver)
+    
+    def fail(factory):
+        raise ValueError(where(factory))
+    
+    with pytest.raises(ValueError):
+        fanout.run(["w2"], fail)
+    
+    assert (driver.window, driver.path) == ("w1", [1])
+    
+    results = fanout.run(["w2", ("w1", [0])], fail, capture=True)
+    
+    assert [type(exc) for exc in results.values()] == [ValueError, ValueError]
+    assert (driver.window, driver.path) == ("w1", [1])
+
+
+def test_factories_are_kept_per_context():
+    driver = FakeDriver(["w1", "w2"])
+    fanout = FanOut(driver)
+    first = fanout.run(["w1", "w2"], lambda factory: factory)
+    second = fanout.run(["w2", "w1"], lambda factory: factory)
+    
+    assert first == second
+    assert first[("w1", ())] is not first[("w2", ())]
+    
+    fanout.clearcache()
+    
+    assert fanout.factory("w1") is not first[("w1", ())]
+
+
+def test_concurrent_lookups_share_one_factory():
+    fanout = FanOut(FakeDriver(["w1"]))
+    barrier = threading.Barrier(8)
+    factories = []
+    
+    def lookup():
+        barrier.wait(5)
+        factories.append(fanout.factory(("w1", 0)))
+    
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    
+    for thread in threads:
+        thread.start()
+    
+    for thread in threads:
+        thread.join(5)
+    
+    assert len(factories) == 8
+    assert all(factory is factories[0] for factory in factories)
+
+
+def test_contexts_run_in_the_session_owning_their_window():
+    drivers = FakeDriver(["a1", "a2"]), FakeDriver(["b1"])
+    fanout = FanOut(*drivers)
+    results = fanout.run(["b1", "a2", "a1"], where)
+    
+    assert results == {("b1", ()): ("b1", ()), ("a2", ()): ("a2", ()), ("a1", ()): ("a1", ())}
+    assert drivers[0].log == [("window", "a2"), ("window", "a1")]
+    assert drivers[1].log == []
+    
+    with pytest.raises(JS2PyException, match="No session"):
+        fanout.run(["c1"], where)
@@ -0,0 +1,123 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from selenium_js2py.grid import GridExecutor
+from selenium_js2py.javascript import JS2PyException
+
+_ELEMENT = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests.append((self.path, body))
+        
+        if body["script"] == "throw":
+            status, value = 500, {"error": "javascript error", "message": "thrown"}
+        elif body["script"] == "wait":
+            server.gate.wait(5)
+            status, value = 200, None
+        else:
+            status, value = 200, body["args"]
+        
+        data = json.dumps({"value": value}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.gate = threading.Event()
+    server.connections = set()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    
+    yield server
+    
+    server.gate.set()
+    server.shutdown()
+    server.server_close()
+
+
+def executor(server, **options):
+    return GridExecutor(f"http://127.0.0.1:{server.server_port}/wd/hub", "abc", **options)
+
+
+def test_sequential_scripts_reuse_one_connection(server):
+    with executor(server) as grid:
+        for i in range(20):
+            assert grid.execute_script("return arguments", i) == [i]
+        
+        assert grid.metrics["connections"] == 1
+        assert grid.metrics["reused"] == 19
+    
+    assert len(server.connections) == 1
+    assert {path for path, _ in server.requests} == {"/wd/hub/session/abc/execute/sync"}
+
+
+def test_overlapped_scripts_are_bounded_by_the_pool(server):
+    with executor(server, maxsize=2) as grid:
+        results = grid.execute_many([("return arguments", i) for i in range(10)])
+        
+        assert results == [[i] for i in range(10)]
+        assert grid.metrics["requests"] == 10
+        
+        grid.execute_many([("return arguments", i) for i in range(10)])
+    
+    assert len(server.connections) <= 2
+
+
+def test_scripts_in_flight_do_not_block_others(server):
+    with executor(server, maxsize=2) as grid:
+        waiting = grid.submit("wait")
+        
+        assert grid.execute_script("return arguments", 1) == [1]
+        assert not waiting.done()
+        
+        server.gate.set()
+        
+        assert waiting.result(5) is None
+    
+    assert len(server.connections) == 2
+
+
+def test_elements_are_converted(server):
+    with executor(server) as grid:
+        element = Element(grid, "e1")
+        res = grid.execute_script("return arguments", element, {"nested": [element]})
+    
+    assert server.requests[0][1]["args"] == [{_ELEMENT: "e1"}, {"nested": [{_ELEMENT: "e1"}]}]
+    assert isinstance(res[0], Element) and res[0].id == "e1" and res[0].parent is grid
+    assert res[1]["nested"][0].id == "e1"
+
+
+def test_errors_are_raised_and_counted(server):
+    with executor(server) as grid:
+        with pytest.raises(JS2PyException, match="thrown"):
+            grid.execute_script("throw")
+        
+        assert grid.execute_script("return arguments", 1) == [1]
+        assert grid.metrics["errors"] == 1
+    
+    assert len(server.connections) == 1
@@ -0,0 +1,205 @@
+import threading
+
+import pytest
+
+from selenium_js2py.javascript import JS2PyException, JavaScriptExecutor
+from selenium_js2py.queued import QueuedExecutor
+
+
+class GatedExecutor(JavaScriptExecutor):
+    """Records the scripts it runs, the first script waits for `gate`"""
+    
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.threads = set()
+    
+    def execute_script(self, script: str, *args):
+        self.threads.add(threading.get_ident())
+        
+        if not self.calls:
+            self.calls.append((script, args))
+            self.gate.wait(5)
+        else:
+            self.calls.append((script, args))
+        
+        if script == "return app.fail":
+            raise ValueError("thrown")
+        
+        return script, args
+
+
+@pytest.fixture
+def gated():
+    jsexec = GatedExecutor()
+    queued = QueuedExecutor(jsexec)
+    
+    yield jsexec, queued
+    
+    jsexec.gate.set()
+    queued.close()
+
+
+def test_scripts_run_in_order_on_one_thread(gated):
+    jsexec, queued = gated
+    blocker = queued.submit("block")
+    futures = [queued.submit(f"app.set({i})", i) for i in range(20)]
+    
+    jsexec.gate.set()
+    
+    assert blocker.result(5) == ("block", ())
+    assert [future.result(5) for future in futures] == [(f"app.set({i})", (i,)) for i in range(20)]
+    assert [script for script, _ in jsexec.calls] == ["block", *(f"app.set({i})" for i in range(20))]
+    assert len(jsexec.threads) == 1
+
+
+def test_scripts_from_many_threads_are_serialized(gated):
+    jsexec, queued = gated
+    jsexec.gate.set()
+    results = {}
+    
+    def worker(n):
+        results[n] = [queued.execute_script("app.add(arguments[0])", n * 10 + i) for i in range(10)]
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    
+    for thread in threads:
+        thread.start()
+    
+    for thread in threads:
+        thread.join(5)
+    
+    assert len(jsexec.calls) == 80
+    assert len(jsexec.threads) == 1
+    
+    for n, values in results.items():
+        assert [args for _, args in values] == [(n * 10 + i,) for i in range(10)]
+
+
+def test_identical_reads_are_coalesced(gated):
+    jsexec, queued = gated
+    queued.submit("block")
+    first = queued.submit("return app.state")
+    second = queued.submit("return app.state")
+    other = queued.submit("return app.other")
+    
+    jsexec.gate.set()
+    
+    assert first is not second
+    assert first.result(5) == second.result(5) == ("return app.state", ())
+    assert other.result(5) == ("return app.other", ())
+    assert [script for script, _ in jsexec.calls] == ["block", "return app.state", "return app.other"]
+    assert queued.stats == {"calls": 3, "coalesced": 1, "inflight": 0}
+
+
+def test_writes_and_different_arguments_are_not_coalesced(gated):
+    jsexec, queued = gated
+    queued.submit("block")
+    writes = [queued.submit("app.add(1)") for _ in range(2)]
+    reads = [queued.submit("return app.state", i) for i in range(2)]
+    
+    jsexec.gate.set()
+    
+    for future in (*writes, *reads):
+        future.result(5)
+    
+    assert len(jsexec.calls) == 5
+    assert queued.stats["coalesced"] == 0
+
+
+def test_execute_readonly_coalesces_any_script(gated):
+    jsexec, queued = gated
+    queued.submit("block")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(queued.execute_readonly("app.compute()")))
+        for _ in range(4)
+    ]
+    
+    for thread in threads:
+        thread.start()
+    
+    while queued.stats["coalesced"] < 3:
+        threading.Event().wait(0.01)
+    
+    jsexec.gate.set()
+    
+    for thread in threads:
+        thread.join(5)
+    
+    assert results == [("app.compute()", ())] * 4
+    assert [script for script, _ in jsexec.calls] == ["block", "app.compute()"]
+
+
+def test_cancelling_one_caller_does_not_cancel_the_others(gated):
+    jsexec, queued = gated
+    queued.submit("block")
+    first = queued.submit("return app.state")
+    second = queued.submit("return app.state")
+    
+    assert first.cancel()
+    
+    jsexec.gate.set()
+    
+    assert second.result(5) == ("return app.state", ())
+    assert first.cancelled()
+
+
+def test_a_read_every_caller_cancelled_is_skipped(gated):
+    jsexec, queued = gated
+    blocker = queued.submit("block")
+    futures = [queued.submit("return app.state") for _ in range(3)]
+    
+    assert all(future.cancel() for future in futures)
+    
+    jsexec.gate.set()
+    blocker.result(5)
+    queued.submit("return app.other").result(5)
+    
+    assert [script for script, _ in jsexec.calls] == ["block", "return app.other"]
+
+
+def test_errors_reach_every_coalesced_caller(gated):
+    jsexec, queued = gated
+    queued.submit("block")
+    futures = [queued.submit("return app.fail") for _ in range(2)]
+    
+    jsexec.gate.set()
+    
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(5)
+    
+    assert queued.stats["coalesced"] == 1
+
+
+def test_closed_executor_rejects_scripts(gated):
+    jsexec, queued = gated
+    jsexec.gate.set()
+    future = queued.submit("app.add(1)")
+    queued.close()
+    
+    assert future.done()
+    
+    with pytest.raises(JS2PyException):
+        queued.execute_script("app.add(1)")
+
+
+def test_driver_methods_run_on_the_worker(gated):
+    jsexec, queued = gated
+    threads = set()
+    jsexec.get = lambda url: threads.add(threading.get_ident()) or url
+    jsexec.title = "page"
+    blocker = queued.submit("block")
+    getter = threading.Thread(target=lambda: queued.get("http://example.com"))
+    getter.start()
+    getter.join(0.2)
+    
+    assert getter.is_alive() and not threads
+    
+    jsexec.gate.set()
+    getter.join(5)
+    
+    assert blocker.result(5) == ("block", ())
+    assert threads == jsexec.threads
+    assert queued.title == "page"
@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+
+import pytest
+
+from selenium_js2py import readcache
+from selenium_js2py.javascript import _READONLY, JavaScriptExecutor
+from selenium_js2py.readcache import ReadCacheExecutor
+
+_READ = _READONLY + "return app.state"
+
+
+class FakeExecutor(JavaScriptExecutor):
+    """Answers every script with the number of scripts run so far, in the current document"""
+    
+    def __init__(self):
+        self.calls = []
+        self.document = "doc1"
+        self.navigations = 0
+    
+    def execute_script(self, script: str, *args):
+        if script == readcache._DOCUMENT:
+            self.calls.append("document")
+            return self.document
+        
+        self.calls.append(script)
+        
+        if script.startswith(readcache._MARKDOCUMENT):
+            return [self.document, (len(self.calls), *args)]
+        
+        return len(self.calls), *args
+    
+    def execute_async_script(self, script: str, *args):
+        self.calls.append(script)
+    
+    def get(self, url):
+        self.navigate()
+    
+    def navigate(self):
+        self.navigations += 1
+        self.document = f"doc{self.navigations + 1}"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(readcache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def reads(jsexec):
+    return sum(call.startswith(readcache._MARKDOCUMENT) for call in jsexec.calls)
+
+
+def test_readonly_scripts_are_cached_by_arguments(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec)
+    first = cached.execute_script(_READ, 1)
+    
+    assert cached.execute_script(_READ, 1) == first
+    assert cached.execute_script(_READ, 2) != first
+    assert reads(jsexec) == 2
+    assert cached.stats == {"hits": 1, "misses": 2, "invalidations": 0, "size": 2}
+
+
+def test_plain_member_reads_are_only_cached_with_memberreads(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec)
+    
+    assert cached.execute_script("return app.state") != cached.execute_script("return app.state")
+    
+    cached = ReadCacheExecutor(jsexec, memberreads=True)
+    
+    assert cached.execute_script("return app.state") == cached.execute_script("return app.state")
+
+
+def test_results_expire_after_the_ttl(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec, ttl=5, navcheck=None)
+    first = cached.execute_script(_READ)
+    clock.now += 4.9
+    
+    assert cached.execute_script(_READ) == first
+    
+    clock.now += 0.2
+    
+    assert cached.execute_script(_READ) != first
+    assert reads(jsexec) == 2
+
+
+def test_results_without_ttl_are_kept_until_invalidated(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec, ttl=None, navcheck=None)
+    first = cached.execute_script(_READ)
+    clock.now += 1e6
+    
+    assert cached.execute_script(_READ) == first
+    
+    cached.invalidate()
+    
+    assert cached.execute_script(_READ) != first
+
+
+def test_writes_clear_the_cache(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec)
+    first = cached.execute_script(_READ)
+    cached.execute_script("app.add(1)")
+    
+    assert len(cached) == 0
+    assert cached.execute_script(_READ) != first
+    
+    second = cached.execute_script(_READ)
+    cached.execute_async_script("arguments[0]()")
+    
+    assert cached.execute_script(_READ) != second
+
+
+def test_navigation_through_the_wrapper_clears_the_cache(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec)
+    first = cached.execute_script(_READ)
+    cached.get("http://example.com")
+    
+    assert jsexec.navigations == 1
+    assert len(cached) == 0
+    assert cached.execute_script(_READ) != first
+
+
+def test_the_document_marker_is_checked_after_navcheck(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec, navcheck=1)
+    first = cached.execute_script(_READ)
+    clock.now += 0.5
+    
+    assert cached.execute_script(_READ) == first
+    assert "document" not in jsexec.calls
+    
+    clock.now += 1
+    
+    assert cached.execute_script(_READ) == first
+    assert jsexec.calls.count("document") == 1
+    
+    clock.now += 0.5
+    
+    assert cached.execute_script(_READ) == first
+    assert jsexec.calls.count("document") == 1
+
+
+def test_navigation_outside_the_wrapper_is_detected_by_the_marker(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec, navcheck=1)
+    first = cached.execute_script(_READ)
+    other = cached.execute_script(_READ, 1)
+    jsexec.navigate()
+    clock.now += 2
+    
+    assert cached.execute_script(_READ) != first
+    assert jsexec.calls[-2:] == ["document", jsexec.calls[-1]]
+    assert cached.stats["invalidations"] == 1
+    assert cached.execute_script(_READ, 1) != other
+
+
+def test_a_marker_change_seen_by_a_read_drops_older_results(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec, navcheck=None)
+    first = cached.execute_script(_READ)
+    jsexec.navigate()
+    cached.execute_script(_READ, 1)
+    
+    assert len(cached) == 1
+    assert cached.execute_script(_READ) != first
+
+
+def test_the_least_recently_used_results_are_evicted(clock):
+    jsexec = FakeExecutor()
+    cached = ReadCacheExecutor(jsexec, maxsize=2)
+    first = cached.execute_script(_READ, 1)
+    cached.execute_script(_READ, 2)
+    cached.execute_script(_READ, 1)
+    cached.execute_script(_READ, 3)
+    
+    assert len(cached) == 2
+    assert cached.execute_script(_READ, 1) == first
+    assert reads(jsexec) == 3
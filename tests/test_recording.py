@@ -0,0 +1,155 @@
+import json
+
+import pytest
+from selenium.webdriver.remote.webelement import WebElement as Element
+
+from selenium_js2py import JavaScriptObject
+from selenium_js2py.javascript import JS2PyException, JavaScriptExecutor
+from selenium_js2py.recording import RecordingExecutor, ReplayExecutor
+
+
+class FakeExecutor(JavaScriptExecutor):
+    """Answers scripts from a `dict`, scripts missing from it raise"""
+    
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+    
+    def create_web_element(self, element_id: str):
+        return Element(self, element_id)
+    
+    def execute_script(self, script: str, *args):
+        self.calls.append((script, args))
+        
+        if script not in self.answers:
+            raise ValueError(f"unknown script {script}")
+        
+        answer = self.answers[script]
+        return answer(*args) if callable(answer) else answer
+
+
+@pytest.fixture
+def recording(tmp_path):
+    return str(tmp_path / "session.jsonl")
+
+
+def record(path, answers, scripts):
+    jsexec = FakeExecutor(answers)
+    results = []
+    
+    with RecordingExecutor(jsexec, path) as recorder:
+        for script, *args in scripts:
+            try:
+                results.append(recorder.execute_script(script, *args))
+            except ValueError as exc:
+                results.append(exc)
+    
+    return jsexec, results
+
+
+def test_replay_serves_the_recorded_results_in_order(recording):
+    answers = {
+        "return app.state": {"a": 1, "b": [1, 2]},
+        "return app.add(arguments[0], arguments[1])": lambda a, b: a + b,
+    }
+    scripts = [
+        ("return app.state",),
+        ("return app.add(arguments[0], arguments[1])", 1, 2),
+        ("return app.add(arguments[0], arguments[1])", 3, 4),
+    ]
+    _, results = record(recording, answers, scripts)
+    replay = ReplayExecutor(recording)
+    
+    assert [replay.execute_script(*script) for script in scripts] == results
+    assert replay.stats["calls"] == 3
+    assert replay.remaining == 0
+    
+    with pytest.raises(JS2PyException):
+        replay.execute_script("return app.state")
+
+
+def test_scripts_are_written_once(recording):
+    record(recording, {"return 1": 1}, [("return 1",)] * 5)
+    
+    with open(recording, "r", encoding="utf-8") as fp:
+        records = [json.loads(line) for line in fp]
+    
+    assert sum("d" in record for record in records) == 1
+    assert [record["s"] for record in records if "d" not in record] == [0] * 5
+
+
+def test_ordered_replay_rejects_a_diverging_script(recording):
+    record(recording, {"return 1": 1, "return 2": 2}, [("return 1",), ("return 2",)])
+    replay = ReplayExecutor(recording)
+    
+    with pytest.raises(JS2PyException, match="diverges"):
+        replay.execute_script("return 2")
+
+
+def test_unordered_replay_matches_scripts_and_arguments(recording):
+    double = "return arguments[0] * 2"
+    record(recording, {double: lambda x: x * 2}, [(double, 1), (double, 2), (double, 2)])
+    replay = ReplayExecutor(recording, ordered=False)
+    
+    assert replay.execute_script(double, 2) == 4
+    assert replay.execute_script(double, 1) == 2
+    assert replay.execute_script(double, 2) == 4
+    
+    with pytest.raises(JS2PyException, match="not recorded"):
+        replay.execute_script(double, 2)
+
+
+def test_errors_are_replayed(recording):
+    _, results = record(recording, {}, [("return missing",)])
+    replay = ReplayExecutor(recording)
+    
+    assert isinstance(results[0], ValueError)
+    
+    with pytest.raises(JS2PyException, match="ValueError: unknown script"):
+        replay.execute_script("return missing")
+
+
+def test_elements_round_trip(recording):
+    jsexec = FakeExecutor({})
+    element = Element(jsexec, "e1")
+    jsexec.answers["return arguments[0].parentElement"] = lambda elmt: Element(jsexec, "e0")
+    
+    with RecordingExecutor(jsexec, recording) as recorder:
+        recorder.execute_script("return arguments[0].parentElement", element)
+    
+    replay = ReplayExecutor(recording)
+    parent = replay.execute_script("return arguments[0].parentElement", element)
+    
+    assert isinstance(parent, Element)
+    assert parent.id == "e0"
+    assert parent.parent is replay
+
+
+def test_recordings_are_extended_by_later_sessions(recording):
+    record(recording, {"return 1": 1}, [("return 1",)])
+    record(recording, {"return 1": 1, "return 2": 2}, [("return 1",), ("return 2",)])
+    
+    with open(recording, "r", encoding="utf-8") as fp:
+        definitions = [json.loads(line) for line in fp if '"d"' in line]
+    
+    assert [definition["d"] for definition in definitions] == [0, 1]
+    
+    replay = ReplayExecutor(recording)
+    
+    scripts = "return 1", "return 1", "return 2"
+    
+    assert [replay.execute_script(script) for script in scripts] == [1, 1, 2]
+
+
+def test_objects_replay_without_a_browser(recording):
+    class AppExecutor(JavaScriptExecutor):
+        def execute_script(self, script: str, *args):
+            return ["function", 2] if "typeof(app.add)" in script else sum(args)
+    
+    with RecordingExecutor(AppExecutor(), recording) as recorder:
+        assert JavaScriptObject("app", recorder).add(1, 2) == 3
+    
+    replay = ReplayExecutor(recording)
+    
+    assert JavaScriptObject("app", replay).add(1, 2) == 3
+    assert replay.remaining == 0